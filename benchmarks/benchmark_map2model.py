@@ -0,0 +1,143 @@
+"""
+Benchmark the native map2model engine against the map2model binary
+
+Builds synthetic geology maps (Voronoi cells assigned to fewer units so that most units are split
+across several polygons) with random faults, runs both engines on each and reports their run
+times and whether their results agree.
+
+Usage:
+    python benchmarks/benchmark_map2model.py [--cells 200 2000 20000] [--units 20] [--faults 50]
+"""
+
+import argparse
+import tempfile
+import time
+
+import geopandas
+import numpy
+import pandas
+import shapely
+
+from map2loop.m2l_enums import Datastate, Datatype, VerboseLevel
+from map2loop.map2model_wrapper import Map2ModelWrapper
+from map2loop.mapdata import MapData
+
+MAP_SIZE = 50000.0
+
+
+def create_mapdata(n_cells: int, n_units: int, n_faults: int, seed: int, tmp_path: str):
+    """
+    Create a synthetic map of Voronoi cells with random units and ages and random faults
+
+    Args:
+        n_cells (int): The number of geology polygons
+        n_units (int): The number of units the polygons are assigned to
+        n_faults (int): The number of faults
+        seed (int): The random seed
+        tmp_path (str): The temporary directory of the map data
+
+    Returns:
+        MapData: The map data with the geology and faults loaded
+    """
+    rng = numpy.random.default_rng(seed)
+    bounds = shapely.box(0, 0, MAP_SIZE, MAP_SIZE)
+    points = shapely.MultiPoint(rng.uniform(0, MAP_SIZE, (n_cells, 2)))
+    cells = shapely.get_parts(shapely.voronoi_polygons(points, extend_to=bounds))
+    cells = shapely.intersection(cells, bounds)
+    unit = rng.integers(0, n_units, len(cells))
+    names = numpy.array([f"unit_{i:03d}" for i in unit])
+    min_age = unit * 10.0 + 1.0
+    geology = geopandas.GeoDataFrame(
+        {
+            "UNITNAME": names,
+            "CODE": names,
+            "GROUP": numpy.where(unit < n_units // 2, "G1", "G2"),
+            "DESCRIPTION": "",
+            "ROCKTYPE1": "sandstone",
+            "ROCKTYPE2": "None",
+            "MIN_AGE": min_age,
+            "MAX_AGE": min_age + 5.0,
+            "ID": numpy.arange(len(cells)),
+        },
+        geometry=cells,
+        crs=28350,
+    )
+    faults = geopandas.GeoDataFrame(
+        {
+            "FEATURE": "Fault",
+            "NAME": [f"Fault_{i}" for i in range(n_faults)],
+            "ID": numpy.arange(n_faults),
+        },
+        geometry=[shapely.LineString(rng.uniform(0, MAP_SIZE, (3, 2))) for _ in range(n_faults)],
+        crs=28350,
+    )
+    map_data = MapData(tmp_path=tmp_path, verbose_level=VerboseLevel.NONE)
+    map_data.set_working_projection(28350)
+    map_data.set_bounding_box({"minx": 0, "maxx": MAP_SIZE, "miny": 0, "maxy": MAP_SIZE})
+    for datatype, data in [(Datatype.GEOLOGY, geology), (Datatype.FAULT, faults)]:
+        map_data.filenames[datatype] = "memory"
+        map_data.data[datatype] = data
+        map_data.data_states[datatype] = Datastate.COMPLETE
+        map_data.dirtyflags[datatype] = False
+    return map_data
+
+
+def time_engine(map_data: MapData, engine: str):
+    """
+    Run one engine without the result cache
+
+    Args:
+        map_data (MapData): The map data to run on
+        engine (str): "map2model" or "native"
+
+    Returns:
+        tuple: The run time in seconds and the finished wrapper
+    """
+    wrapper = Map2ModelWrapper(map_data, engine=engine, use_cache=False)
+    start = time.perf_counter()
+    wrapper.run()
+    return time.perf_counter() - start, wrapper
+
+
+def agreement(native: Map2ModelWrapper, binary: Map2ModelWrapper) -> str:
+    """
+    Describe which of the results of the two engines differ
+
+    Args:
+        native (Map2ModelWrapper): The native run
+        binary (Map2ModelWrapper): The binary run
+
+    Returns:
+        str: "same" or the names of the results that differ
+    """
+    differ = [] if native.sorted_units == binary.sorted_units else ["sorted_units"]
+    for name in [
+        "unit_unit_relationships",
+        "unit_fault_relationships",
+        "fault_fault_relationships",
+    ]:
+        try:
+            pandas.testing.assert_frame_equal(getattr(native, name), getattr(binary, name))
+        except AssertionError:
+            differ += [name]
+    return ", ".join(differ) if differ else "same"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cells", type=int, nargs="+", default=[200, 2000, 20000])
+    parser.add_argument("--units", type=int, default=20)
+    parser.add_argument("--faults", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'cells':>8} {'binary (s)':>11} {'native (s)':>11} {'speedup':>8}  results")
+    for n_cells in args.cells:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            map_data = create_mapdata(n_cells, args.units, args.faults, args.seed, tmp_path)
+            binary_time, binary = time_engine(map_data, "map2model")
+            native_time, native = time_engine(map_data, "native")
+        print(
+            f"{n_cells:>8} {binary_time:>11.2f} {native_time:>11.2f} "
+            f"{binary_time / native_time:>7.1f}x  {agreement(native, binary)}"
+        )
@@ -0,0 +1,270 @@
+# internal imports
+from .m2l_enums import VerboseLevel
+
+# external imports
+import geopandas
+import pandas
+import numpy
+import shapely
+import beartype
+import enum
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from typing import Optional
+
+
+class StageCheckpoints:
+    """
+    A store of the outputs of processing stages so that a run can resume from the last stage
+    whose inputs are unchanged. Each stage is kept in its own directory with data frames
+    written as (Geo)Parquet and any other output pickled
+
+    Attributes
+    ----------
+    path: str
+        The directory holding the stage checkpoints
+    verbose_level: m2l_enums.VerboseLevel
+        A selection that defines how much console logging is output
+    """
+
+    def __init__(self, path: str, verbose_level: VerboseLevel = VerboseLevel.ALL):
+        """
+        The initialiser for the stage checkpoints
+
+        Args:
+            path (str):
+                The directory to store the checkpoints in (created when the first stage is saved)
+            verbose_level (VerboseLevel, optional):
+                How much console output is sent. Defaults to VerboseLevel.ALL.
+        """
+        self.path = path
+        self.verbose_level = verbose_level
+
+    @staticmethod
+    def key(*values) -> str:
+        """
+        Calculate a content hash of the inputs and parameters of a stage
+
+        Args:
+            values: Data frames, arrays, containers, scalars or objects (hashed by type and attributes)
+
+        Returns:
+            str: The hex digest of the hash
+        """
+        hasher = hashlib.sha256()
+        for value in values:
+            _update_hash(hasher, value, set())
+        return hasher.hexdigest()
+
+    def stage_path(self, stage: str) -> str:
+        """
+        Get the directory of a stage checkpoint
+
+        Args:
+            stage (str): The name of the stage
+
+        Returns:
+            str: The directory of the stage
+        """
+        return os.path.join(self.path, stage)
+
+    @beartype.beartype
+    def load(self, stage: str, key: str) -> Optional[dict]:
+        """
+        Load the outputs of a stage if they were saved with the same key
+
+        Args:
+            stage (str): The name of the stage
+            key (str): The content hash of the stage inputs
+
+        Returns:
+            dict or None: The outputs of the stage by name, None if there is no matching checkpoint
+        """
+        manifest_filename = os.path.join(self.stage_path(stage), "manifest.json")
+        if not os.path.isfile(manifest_filename):
+            return None
+        try:
+            with open(manifest_filename, "r") as file:
+                manifest = json.load(file)
+            if manifest["key"] != key:
+                return None
+            outputs = {}
+            for name, entry in manifest["outputs"].items():
+                filename = os.path.join(self.stage_path(stage), entry["file"])
+                if entry["format"] == "geoparquet":
+                    outputs[name] = geopandas.read_parquet(filename)
+                elif entry["format"] == "parquet":
+                    outputs[name] = pandas.read_parquet(filename)
+                else:
+                    with open(filename, "rb") as file:
+                        outputs[name] = pickle.load(file)
+        except Exception as e:
+            if self.verbose_level != VerboseLevel.NONE:
+                print(f"Could not read the {stage} checkpoint ({e}), the stage will be rerun")
+            return None
+        # mark the stage as recently used for the eviction policy
+        try:
+            os.utime(manifest_filename)
+        except FileNotFoundError:
+            pass
+        return outputs
+
+    @beartype.beartype
+    def save(self, stage: str, key: str, outputs: dict):
+        """
+        Save the outputs of a stage, replacing any previous checkpoint of the stage
+
+        Args:
+            stage (str): The name of the stage
+            key (str): The content hash of the stage inputs
+            outputs (dict): The outputs of the stage by name
+        """
+        self.clear(stage)
+        path = self.stage_path(stage)
+        os.makedirs(path, exist_ok=True)
+        manifest = {"key": key, "outputs": {}}
+        for i, (name, value) in enumerate(outputs.items()):
+            entry = None
+            if isinstance(value, pandas.DataFrame):
+                # Parquet needs pyarrow and string column names, otherwise fall back to pickle
+                try:
+                    if isinstance(value, geopandas.GeoDataFrame):
+                        entry = {"format": "geoparquet", "file": f"{i}.parquet"}
+                    else:
+                        entry = {"format": "parquet", "file": f"{i}.parquet"}
+                    value.to_parquet(os.path.join(path, entry["file"]))
+                except Exception:
+                    entry = None
+            if entry is None:
+                entry = {"format": "pickle", "file": f"{i}.pkl"}
+                with open(os.path.join(path, entry["file"]), "wb") as file:
+                    pickle.dump(value, file)
+            manifest["outputs"][name] = entry
+
+        # The manifest is written last so an interrupted save is never loaded
+        manifest_filename = os.path.join(path, "manifest.json")
+        with open(manifest_filename + ".tmp", "w") as file:
+            json.dump(manifest, file)
+        os.replace(manifest_filename + ".tmp", manifest_filename)
+
+    def evict(self, max_size: int):
+        """
+        Remove the least recently saved or loaded stages until the checkpoints are no larger than
+        max_size. Stages removed by another process evicting at the same time are skipped
+
+        Args:
+            max_size (int): The maximum total size of the checkpoint files in bytes
+        """
+        if not os.path.isdir(self.path):
+            return
+        stages = []
+        for stage in os.listdir(self.path):
+            path = self.stage_path(stage)
+            manifest_filename = os.path.join(path, "manifest.json")
+            try:
+                # an interrupted save has no manifest and is removed first
+                last_used = 0
+                if os.path.isfile(manifest_filename):
+                    last_used = os.stat(manifest_filename).st_mtime_ns
+                stage_size = sum(
+                    entry.stat().st_size for entry in os.scandir(path) if entry.is_file()
+                )
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            stages += [(last_used, stage_size, path)]
+        size = sum(stage[1] for stage in stages)
+        for _, stage_size, path in sorted(stages):
+            if size <= max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            size -= stage_size
+
+    @beartype.beartype
+    def clear(self, stage: Optional[str] = None):
+        """
+        Remove the checkpoint of a stage, or of all stages
+
+        Args:
+            stage (str, optional): The name of the stage to remove. Defaults to None (all stages).
+        """
+        path = self.path if stage is None else self.stage_path(stage)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+
+def _update_hash(hasher, value, seen: set):
+    """
+    Add a value to a content hash
+
+    Args:
+        hasher (hashlib hash): The hash to update
+        value: The value to add
+        seen (set): The ids of the objects already being hashed (to break reference cycles)
+    """
+    hasher.update(type(value).__qualname__.encode())
+    if isinstance(value, (bytes, bytearray)):
+        # hashed in place as they can be whole files, with the length to delimit them
+        hasher.update(f"{len(value)}:".encode())
+        hasher.update(value)
+    elif value is None or isinstance(value, (bool, int, float, complex, str, enum.Enum)):
+        hasher.update(repr(value).encode())
+    elif isinstance(value, (pandas.DataFrame, pandas.Series)):
+        frame = value.to_frame() if isinstance(value, pandas.Series) else value
+        hasher.update(repr(list(frame.columns)).encode())
+        hasher.update(repr([str(dtype) for dtype in frame.dtypes]).encode())
+        geometry_columns = [
+            column
+            for column, dtype in frame.dtypes.items()
+            if isinstance(dtype, geopandas.array.GeometryDtype)
+        ]
+        for column in geometry_columns:
+            geometry = geopandas.GeoSeries(frame[column])
+            hasher.update(str(geometry.crs).encode())
+            for wkb in shapely.to_wkb(numpy.asarray(geometry.values)):
+                hasher.update(b"" if wkb is None else wkb)
+        frame = pandas.DataFrame(frame.drop(columns=geometry_columns))
+        try:
+            hasher.update(pandas.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+        except TypeError:
+            # unhashable cell values such as lists
+            hasher.update(pickle.dumps(frame))
+    elif isinstance(value, numpy.ndarray):
+        hasher.update(f"{value.dtype}{value.shape}".encode())
+        if value.dtype.hasobject:
+            for item in value.ravel():
+                _update_hash(hasher, item, seen)
+        else:
+            hasher.update(numpy.ascontiguousarray(value).data)
+    elif isinstance(value, (numpy.generic, shapely.Geometry)):
+        hasher.update(repr(value).encode() if isinstance(value, numpy.generic) else value.wkb)
+    elif id(value) in seen:
+        hasher.update(b"<cycle>")
+    elif isinstance(value, dict):
+        seen.add(id(value))
+        for item_key in sorted(value, key=repr):
+            _update_hash(hasher, item_key, seen)
+            _update_hash(hasher, value[item_key], seen)
+        seen.discard(id(value))
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        seen.add(id(value))
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        hasher.update(str(len(items)).encode())
+        for item in items:
+            _update_hash(hasher, item, seen)
+        seen.discard(id(value))
+    elif hasattr(value, "checkpoint_params") and not isinstance(value, type):
+        # calculators, sorters and samplers are keyed on their configuration, not their runtime state
+        seen.add(id(value))
+        hasher.update(type(value).__module__.encode())
+        _update_hash(hasher, value.checkpoint_params(), seen)
+        seen.discard(id(value))
+    elif hasattr(value, "__dict__"):
+        seen.add(id(value))
+        hasher.update(type(value).__module__.encode())
+        _update_hash(hasher, vars(value), seen)
+        seen.discard(id(value))
+    else:
+        hasher.update(repr(value).encode())
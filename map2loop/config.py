@@ -1,6 +1,6 @@
 import beartype
 import hjson
-import urllib
+import urllib.request
 import time
 import pathlib
 from typing import Union
@@ -182,7 +182,11 @@ class Config:
 
     @beartype.beartype
     def update_from_file(
-        self, filename: Union[pathlib.Path, str], legacy_format: bool = False, lower: bool = False
+        self,
+        filename: Union[pathlib.Path, str],
+        legacy_format: bool = False,
+        lower: bool = False,
+        http_cache=None,
     ):
         """
         Update the config dictionary from the provided json filename or url
@@ -190,6 +194,7 @@ class Config:
         Args:
             filename (str): Filename or URL of the JSON config file
             legacy_format (bool, optional): Whether the JSON is an old version. Defaults to False.
+            http_cache (HttpCache, optional): The cache to download URLs through. Defaults to None.
         """
         if legacy_format:
             func = self.update_from_legacy_file
@@ -204,11 +209,19 @@ class Config:
                 success = False
                 while try_count >= 0 and not success:
                     try:
-                        with urllib.request.urlopen(filename) as url_data:
-                            data = hjson.load(url_data)
+                        if http_cache is not None:
+                            data = hjson.loads(http_cache.fetch(filename).decode())
                             func(data, lower)
+                        else:
+                            with urllib.request.urlopen(filename) as url_data:
+                                data = hjson.load(url_data)
+                                func(data, lower)
                         success = True
                     except Exception as e:
+                        # An offline cache miss cannot be fixed by trying again
+                        offline = http_cache is not None and http_cache.offline
+                        if isinstance(e, ConnectionError) and offline:
+                            raise
                         # Catch a failed online access or file load, re-attempt
                         # a few times before throwing further
                         time.sleep(0.25)
@@ -219,6 +232,8 @@ class Config:
                 with open(filename) as url_data:
                     data = hjson.load(url_data)
                     func(data, lower)
+        except ConnectionError:
+            raise
         except Exception:
             err_string = f"There is a problem parsing the config file ({filename}).\n"
             if filename.startswith("http"):
@@ -29,6 +29,15 @@ class FaultOrientation(ABC):
         """
         return self.label
 
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the parameters of the fault orientation calculator
+        """
+        return dict(vars(self))
+
     @beartype.beartype
     @abstractmethod
     def calculate(
@@ -0,0 +1,172 @@
+# internal imports
+from .m2l_enums import VerboseLevel
+
+# external imports
+import beartype
+import gzip
+import hashlib
+import json
+import os
+import urllib.error
+import urllib.request
+
+
+class HttpCache:
+    """
+    An on-disk cache of http responses keyed by the fully expanded url. Cached responses are
+    revalidated with conditional requests (ETag/Last-Modified) and in offline mode are served
+    without any network access
+
+    Attributes
+    ----------
+    path: str
+        The directory holding the cached responses
+    offline: bool
+        Whether to only serve responses from the cache
+    timeout: float
+        The timeout of the http requests in seconds
+    hits: int
+        The number of requests served from the cache (including not modified responses)
+    misses: int
+        The number of requests downloaded from the server
+    verbose_level: m2l_enums.VerboseLevel
+        A selection that defines how much console logging is output
+    """
+
+    def __init__(
+        self,
+        path: str,
+        offline: bool = False,
+        timeout: float = 30,
+        verbose_level: VerboseLevel = VerboseLevel.ALL,
+    ):
+        """
+        The initialiser for the http cache
+
+        Args:
+            path (str):
+                The directory to store the responses in (created when the first response is saved)
+            offline (bool, optional):
+                Whether to only serve responses from the cache. Defaults to False.
+            timeout (float, optional):
+                The timeout of the http requests in seconds. Defaults to 30.
+            verbose_level (VerboseLevel, optional):
+                How much console output is sent. Defaults to VerboseLevel.ALL.
+        """
+        self.path = path
+        self.offline = offline
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.verbose_level = verbose_level
+
+    def filenames(self, url: str) -> tuple:
+        """
+        Get the filenames of the cached body and metadata of a url
+
+        Args:
+            url (str): The url
+
+        Returns:
+            tuple: The body filename and the metadata filename
+        """
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return (os.path.join(self.path, key + ".body"), os.path.join(self.path, key + ".json"))
+
+    @beartype.beartype
+    def fetch(self, url: str) -> bytes:
+        """
+        Get the body of the response to a url, from the cache if it is still valid
+
+        Args:
+            url (str): The fully expanded url
+
+        Returns:
+            bytes: The (decompressed) response body
+        """
+        with open(self.fetch_file(url), "rb") as file:
+            return file.read()
+
+    @beartype.beartype
+    def fetch_file(self, url: str) -> str:
+        """
+        Get the filename of the cached body of the response to a url, downloading it if it is not
+        cached or has changed on the server
+
+        Args:
+            url (str): The fully expanded url
+
+        Raises:
+            ConnectionError: In offline mode when the url is not in the cache
+
+        Returns:
+            str: The filename of the response body
+        """
+        body_filename, metadata_filename = self.filenames(url)
+        cached = os.path.isfile(body_filename) and os.path.isfile(metadata_filename)
+        if self.offline:
+            if not cached:
+                raise ConnectionError(f"Offline and '{url}' is not in the http cache")
+            return self._hit(url, body_filename, "offline")
+
+        headers = {"Accept-Encoding": "gzip"}
+        if cached:
+            with open(metadata_filename, "r") as file:
+                metadata = json.load(file)
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+        try:
+            response = urllib.request.urlopen(
+                urllib.request.Request(url, headers=headers), timeout=self.timeout
+            )
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                return self._hit(url, body_filename, "not modified")
+            raise
+        except urllib.error.URLError as e:
+            if cached:
+                if self.verbose_level != VerboseLevel.NONE:
+                    print(f"Could not reach '{url}' ({e.reason}), using the cached response")
+                return self._hit(url, body_filename, "unreachable")
+            raise
+
+        with response:
+            data = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            metadata = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        os.makedirs(self.path, exist_ok=True)
+        with open(body_filename + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(body_filename + ".tmp", body_filename)
+        with open(metadata_filename + ".tmp", "w") as file:
+            json.dump(metadata, file)
+        os.replace(metadata_filename + ".tmp", metadata_filename)
+
+        self.misses += 1
+        if self.verbose_level != VerboseLevel.NONE:
+            print(f"Downloaded '{url}' into the http cache")
+        return body_filename
+
+    def _hit(self, url: str, body_filename: str, reason: str) -> str:
+        """
+        Count and report a response served from the cache
+
+        Args:
+            url (str): The url
+            body_filename (str): The filename of the cached body
+            reason (str): Why the cached response is used
+
+        Returns:
+            str: The filename of the cached body
+        """
+        self.hits += 1
+        if self.verbose_level != VerboseLevel.NONE:
+            print(f"Using the cached response for '{url}' ({reason})")
+        return body_filename
@@ -1,17 +1,319 @@
 from abc import ABC, abstractmethod
-from typing import Any, Union
+from typing import Any, Optional, Union
 import logging
-from .utils import strike_dip_vector, generate_grid
+from .utils import strike_dip_vector, generate_grid, Grid
 
 import beartype
 import numpy
 from numpy import ndarray
-from scipy.interpolate import Rbf, LinearNDInterpolator
+from scipy.interpolate import Rbf, LinearNDInterpolator, RBFInterpolator
+from scipy.linalg import lu_factor, lu_solve
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
 from sklearn.cluster import DBSCAN
 
 import pandas
 
 
+class InterpolationBackend(ABC):
+    """
+    Base Class of the interpolation engines used by the Interpolators to fit scattered values
+    and evaluate them on the grid
+
+    Args:
+        ABC (ABC): Derived from Abstract Base Class
+    """
+
+    # the attributes set by fit, which are left out of the checkpoint parameters
+    fitted_attributes = ()
+
+    def __init__(self, chunk_size: int = 10000):
+        """
+        Initialiser of for InterpolationBackend
+
+        Args:
+            chunk_size (int, optional): the number of grid points evaluated at once. Defaults to 10000.
+        """
+        self.backend_label = "InterpolationBackendBaseClass"
+        self.chunk_size = chunk_size
+
+    def type(self):
+        """
+        Getter for subclass type label
+
+        Returns:
+            str: Name of subclass
+        """
+        return self.backend_label
+
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the parameters of the interpolation backend, without the fitted state or the chunk size
+        """
+        excluded = set(self.fitted_attributes) | {"chunk_size"}
+        return {key: value for key, value in vars(self).items() if key not in excluded}
+
+    @abstractmethod
+    def fit(self, x: numpy.ndarray, y: numpy.ndarray, values: numpy.ndarray):
+        """
+        Fit the backend to the scattered values (abstract method)
+
+        Args:
+            x (numpy.ndarray): x-coordinates of the data points
+            y (numpy.ndarray): y-coordinates of the data points
+            values (numpy.ndarray): the values at the data points, either (N,) or (N, m) to fit
+            m fields over the same points at once
+        """
+        pass
+
+    @abstractmethod
+    def evaluate(self, xi: numpy.ndarray, yi: numpy.ndarray) -> numpy.ndarray:
+        """
+        Evaluate the fitted values at a set of points (abstract method)
+
+        Args:
+            xi (numpy.ndarray): x-coordinates of the points to evaluate
+            yi (numpy.ndarray): y-coordinates of the points to evaluate
+
+        Returns:
+            numpy.ndarray: the interpolated values
+        """
+        pass
+
+    def predict(self, xi: numpy.ndarray, yi: numpy.ndarray) -> numpy.ndarray:
+        """
+        Evaluate the fitted values at a set of points in chunks of chunk_size points so the
+        memory used does not grow with the number of points
+
+        Args:
+            xi (numpy.ndarray): x-coordinates of the points to evaluate
+            yi (numpy.ndarray): y-coordinates of the points to evaluate
+
+        Returns:
+            numpy.ndarray: the interpolated values, (n,) or (n, m) matching the fitted values
+        """
+        xi = numpy.asarray(xi)
+        yi = numpy.asarray(yi)
+        if len(xi) <= self.chunk_size:
+            return numpy.asarray(self.evaluate(xi, yi), dtype=numpy.float64)
+        return numpy.concatenate(
+            [
+                numpy.asarray(
+                    self.evaluate(xi[start : start + self.chunk_size], yi[start : start + self.chunk_size]),
+                    dtype=numpy.float64,
+                )
+                for start in range(0, len(xi), self.chunk_size)
+            ]
+        )
+
+    def __call__(
+        self,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        values: numpy.ndarray,
+        xi: numpy.ndarray,
+        yi: numpy.ndarray,
+    ) -> numpy.ndarray:
+        """
+        Fit the values and evaluate them on the grid
+
+        Args:
+            x (numpy.ndarray): x-coordinates of the data points
+            y (numpy.ndarray): y-coordinates of the data points
+            values (numpy.ndarray): the values at the data points, (N,) or (N, m)
+            xi (numpy.ndarray): x-coordinates of the grid points
+            yi (numpy.ndarray): y-coordinates of the grid points
+
+        Returns:
+            numpy.ndarray: the interpolated values at the grid points
+        """
+        self.fit(numpy.asarray(x), numpy.asarray(y), numpy.asarray(values, dtype=numpy.float64))
+        return self.predict(xi, yi)
+
+
+class RbfBackend(InterpolationBackend):
+    """
+    Dense radial basis function interpolation, equivalent to scipy's Rbf. The kernel matrix is
+    factorised once and all value columns are solved together, so several fields on the same
+    points cost a single O(N^3) factorisation. This is only suitable for up to a few thousand points
+    """
+
+    fitted_attributes = ("points", "epsilon", "nodes")
+
+    kernels = {
+        "linear": lambda r, epsilon: r,
+        "cubic": lambda r, epsilon: r**3,
+        "quintic": lambda r, epsilon: r**5,
+        "thin_plate": lambda r, epsilon: numpy.where(r > 0, r**2 * numpy.log(numpy.where(r > 0, r, 1)), 0),
+        "multiquadric": lambda r, epsilon: numpy.sqrt((r / epsilon) ** 2 + 1),
+        "inverse": lambda r, epsilon: 1.0 / numpy.sqrt((r / epsilon) ** 2 + 1),
+        "gaussian": lambda r, epsilon: numpy.exp(-((r / epsilon) ** 2)),
+    }
+
+    def __init__(self, function: str = "linear", chunk_size: int = 10000):
+        super().__init__(chunk_size)
+        if function not in self.kernels:
+            raise ValueError(f"Unknown Rbf function {function}, must be one of {list(self.kernels.keys())}")
+        self.backend_label = "rbf"
+        self.function = function
+        self.points = None
+        self.epsilon = None
+        self.nodes = None
+
+    def fit(self, x, y, values):
+        self.points = numpy.column_stack([x, y]).astype(numpy.float64)
+        # default epsilon of scipy's Rbf, the average distance between nodes
+        edges = numpy.ptp(self.points, axis=0)
+        edges = edges[numpy.nonzero(edges)]
+        self.epsilon = numpy.power(numpy.prod(edges) / len(self.points), 1.0 / edges.size)
+        kernel = self.kernels[self.function](cdist(self.points, self.points), self.epsilon)
+        self.nodes = lu_solve(lu_factor(kernel), values)
+
+    def evaluate(self, xi, yi):
+        r = cdist(numpy.column_stack([xi, yi]), self.points)
+        return self.kernels[self.function](r, self.epsilon) @ self.nodes
+
+
+class LinearBackend(InterpolationBackend):
+    """
+    Piecewise linear interpolation on the Delaunay triangulation of the data points using
+    scipy's LinearNDInterpolator. Grid points outside the convex hull are nan
+    """
+
+    fitted_attributes = ("linear",)
+
+    def __init__(self, chunk_size: int = 10000):
+        super().__init__(chunk_size)
+        self.backend_label = "linear"
+        self.linear = None
+
+    def fit(self, x, y, values):
+        self.linear = LinearNDInterpolator(list(zip(x, y)), values)
+
+    def evaluate(self, xi, yi):
+        return self.linear(xi, yi)
+
+
+class LocalRbfBackend(InterpolationBackend):
+    """
+    Radial basis function interpolation using only the nearest neighbours of each grid point
+    (scipy's RBFInterpolator with neighbors=k), so memory scales with N * k instead of N * N
+    """
+
+    fitted_attributes = ("rbf",)
+
+    def __init__(self, neighbors: int = 50, kernel: str = "linear", chunk_size: int = 10000):
+        super().__init__(chunk_size)
+        self.backend_label = "rbf_neighbors"
+        self.neighbors = neighbors
+        self.kernel = kernel
+        self.rbf = None
+
+    def fit(self, x, y, values):
+        self.rbf = RBFInterpolator(
+            numpy.column_stack([x, y]),
+            values,
+            neighbors=min(self.neighbors, len(x)),
+            kernel=self.kernel,
+        )
+
+    def evaluate(self, xi, yi):
+        return self.rbf(numpy.column_stack([xi, yi]))
+
+
+class IDWBackend(InterpolationBackend):
+    """
+    Inverse distance weighting of the k nearest data points found with a KD-tree
+    """
+
+    fitted_attributes = ("tree", "values")
+
+    def __init__(self, neighbors: int = 12, power: float = 2.0, chunk_size: int = 10000):
+        super().__init__(chunk_size)
+        self.backend_label = "idw"
+        self.neighbors = neighbors
+        self.power = power
+        self.tree = None
+        self.values = None
+
+    def fit(self, x, y, values):
+        self.tree = cKDTree(numpy.column_stack([x, y]))
+        self.values = values
+
+    def evaluate(self, xi, yi):
+        k = min(self.neighbors, len(self.values))
+        distances, indices = self.tree.query(numpy.column_stack([xi, yi]), k=k)
+        distances = distances.reshape(len(xi), k)
+        indices = indices.reshape(len(xi), k)
+        with numpy.errstate(divide="ignore"):
+            weights = 1.0 / distances**self.power
+        # grid points that coincide with a data point take its value
+        exact = distances[:, 0] == 0
+        weights[exact] = 0.0
+        weights[exact, 0] = 1.0
+        weights /= numpy.sum(weights, axis=1)[:, None]
+        return numpy.einsum("ij,ij...->i...", weights, self.values[indices])
+
+
+class NearestBackend(InterpolationBackend):
+    """
+    Nearest neighbour interpolation using a KD-tree
+    """
+
+    fitted_attributes = ("tree", "values")
+
+    def __init__(self, chunk_size: int = 10000):
+        super().__init__(chunk_size)
+        self.backend_label = "nearest"
+        self.tree = None
+        self.values = None
+
+    def fit(self, x, y, values):
+        self.tree = cKDTree(numpy.column_stack([x, y]))
+        self.values = values
+
+    def evaluate(self, xi, yi):
+        _, indices = self.tree.query(numpy.column_stack([xi, yi]), k=1)
+        return self.values[indices]
+
+
+# The interpolation backends that can be selected by name
+INTERPOLATION_BACKENDS = {
+    "rbf": RbfBackend,
+    "linear": LinearBackend,
+    "rbf_neighbors": LocalRbfBackend,
+    "idw": IDWBackend,
+    "nearest": NearestBackend,
+}
+
+
+def get_interpolation_backend(interpolator: Any = None) -> InterpolationBackend:
+    """
+    Get the interpolation backend for a name, backend or scipy interpolator class
+
+    Args:
+        interpolator (Any, optional): a name in INTERPOLATION_BACKENDS, an InterpolationBackend instance or
+        the scipy Rbf or LinearNDInterpolator classes. Defaults to None (dense Rbf).
+
+    Returns:
+        InterpolationBackend: the interpolation backend
+    """
+    if interpolator is None or interpolator is Rbf:
+        return RbfBackend()
+    if interpolator is LinearNDInterpolator:
+        return LinearBackend()
+    if isinstance(interpolator, InterpolationBackend):
+        return interpolator
+    if isinstance(interpolator, str) and interpolator in INTERPOLATION_BACKENDS:
+        return INTERPOLATION_BACKENDS[interpolator]()
+    raise ValueError(
+        f"Unknown interpolator {interpolator}, must be one of {list(INTERPOLATION_BACKENDS.keys())}"
+    )
+
+
 class Interpolator(ABC):
     """
     Base Class of Interpolator used to force structure of Interpolator
@@ -35,6 +337,41 @@ class Interpolator(ABC):
         """
         return self.interpolator_label
 
+    def grid_coordinates(self) -> tuple:
+        """
+        Get the coordinates of all the grid points
+
+        Returns:
+            xi, yi (numpy.ndarray, numpy.ndarray): The x and y coordinates of the grid points.
+        """
+        if self.grid is not None:
+            return self.grid.coordinates()
+        return self.xi, self.yi
+
+    def tiles(self, tile_size: Optional[int] = None):
+        """
+        Lazily evaluate the fitted interpolation over the grid, one tile of grid points at a time
+
+        Args:
+            tile_size (int, optional): the maximum number of grid points in each tile. Defaults to None
+            (the interpolator's tile_size).
+
+        Yields:
+            xi, yi, values (numpy.ndarray, numpy.ndarray, numpy.ndarray): the coordinates of the grid points
+            in the tile and the interpolated values at them
+        """
+        if tile_size is None:
+            tile_size = self.tile_size
+        if self.grid is not None:
+            tiles = self.grid.tiles(tile_size)
+        else:
+            tiles = (
+                (self.xi[start : start + tile_size], self.yi[start : start + tile_size])
+                for start in range(0, len(self.xi), tile_size)
+            )
+        for xi, yi in tiles:
+            yield xi, yi, self.backend.predict(xi, yi)
+
     @beartype.beartype
     @abstractmethod
     def setup_interpolation(self, structure_data: pandas.DataFrame):
@@ -111,6 +448,8 @@ class NormalVectorInterpolator(Interpolator):
         y (numpy.ndarray): A numpy array that stores the y-coordinates of the data points.
         xi (numpy.ndarray): A numpy array that stores the x-coordinates of the grid points for interpolation.
         yi (numpy.ndarray): A numpy array that stores the y-coordinates of the grid points for interpolation.
+        backend (InterpolationBackend): The fitted interpolation backend, which can be reused to evaluate
+        other points with backend.predict(x, y).
         interpolator_label (str): A string that stores the label of the interpolator. For this class, it is
         "NormalVectorInterpolator".
 
@@ -122,15 +461,24 @@ class NormalVectorInterpolator(Interpolator):
         interpolate(bounding_box: dict, structure_data: pandas.DataFrame, interpolator: Any) -> numpy.ndarray: Executes the interpolation method.
     """
 
-    def __init__(self):
+    def __init__(self, cell_size: Optional[float] = None, tile_size: int = 1000000):
         """
         Initialiser of for NormalVectorInterpolator class
+
+        Args:
+            cell_size (float, optional): the grid spacing. When given the grid is described by a utils.Grid and
+            its coordinates are only generated in tiles. Defaults to None (generate_grid's default grid).
+            tile_size (int, optional): the number of grid points evaluated at once by tiles(). Defaults to 1000000.
         """
         self.dataframe = None
         self.x = None
         self.y = None
         self.xi = None
         self.yi = None
+        self.grid = None
+        self.grid_cell_size = cell_size
+        self.tile_size = tile_size
+        self.backend = None
         self.interpolator_label = "NormalVectorInterpolator"
 
     def type(self):
@@ -236,7 +584,10 @@ class NormalVectorInterpolator(Interpolator):
                 "maxy": value,
             }
         """
-        self.xi, self.yi = generate_grid(bounding_box)
+        if self.grid_cell_size is None:
+            self.xi, self.yi, _ = generate_grid(bounding_box)
+        else:
+            self.grid = Grid.from_bounding_box(bounding_box, cell_size=self.grid_cell_size)
 
     @beartype.beartype
     def interpolate(self, ni: Union[ndarray, list], interpolator: Any = Rbf) -> numpy.ndarray:
@@ -245,19 +596,17 @@ class NormalVectorInterpolator(Interpolator):
         Inverse Distance Weighting interpolation method
 
         Args:
-            ni (int): value to interpolate
-            interpolator: type of interpolator to use by default SciPy Rbf interpolator
+            ni (numpy.ndarray): values to interpolate, (N,) or (N, m) to interpolate m fields at once
+            interpolator: name or instance of the InterpolationBackend to use (see INTERPOLATION_BACKENDS),
+            or the SciPy Rbf or LinearNDInterpolator classes. Defaults to the SciPy Rbf interpolator
 
         Returns:
-            Rbf: radial basis function object
+            numpy.ndarray: the interpolated values on the grid
         """
-        if interpolator is Rbf:
-            rbf = Rbf(self.x, self.y, ni, function="linear")
-            return rbf(self.xi, self.yi)
-
-        if interpolator is LinearNDInterpolator:
-            lnd_interpolator = LinearNDInterpolator(list(zip(self.x, self.y)), ni)
-            return lnd_interpolator(self.xi, self.yi)
+        self.backend = get_interpolation_backend(interpolator)
+        self.backend.fit(self.x, self.y, numpy.asarray(ni, dtype=numpy.float64))
+        # evaluate the grid one tile at a time so its coordinates are never all generated at once
+        return numpy.concatenate([values for _, _, values in self.tiles()])
 
     @beartype.beartype
     def __call__(
@@ -282,12 +631,8 @@ class NormalVectorInterpolator(Interpolator):
         ny = self.dataframe["ny"].to_numpy()
         nz = self.dataframe["nz"].to_numpy()
 
-        # interpolate each component of the normal vector nx, ny, nz
-        nx_interp = self.interpolate(nx)
-        ny_interp = self.interpolate(ny)
-        nz_interp = self.interpolate(nz)
-
-        vecs = numpy.array([nx_interp, ny_interp, nz_interp]).T
+        # interpolate all components of the normal vector nx, ny, nz together
+        vecs = self.interpolate(numpy.column_stack([nx, ny, nz]), interpolator)
         # normalize the vectors
         vecs /= numpy.linalg.norm(vecs, axis=1)[:, None]
 
@@ -302,9 +647,15 @@ class DipDipDirectionInterpolator(Interpolator):
         Interpolator(ABC): Derived from Abstract Base Class
     """
 
-    def __init__(self, data_type=None):
+    def __init__(self, data_type=None, cell_size: Optional[float] = None, tile_size: int = 1000000):
         """
         Initialiser of for IDWInterpolator
+
+        Args:
+            data_type (str or list, optional): the data to interpolate, "dip" and/or "dipdir". Defaults to both.
+            cell_size (float, optional): the grid spacing. When given the grid is described by a utils.Grid and
+            its coordinates are only generated in tiles. Defaults to None (generate_grid's default grid).
+            tile_size (int, optional): the number of grid points evaluated at once by tiles(). Defaults to 1000000.
         """
         if data_type is None:
             self.data_type = ["dip", "dipdir"]
@@ -317,6 +668,10 @@ class DipDipDirectionInterpolator(Interpolator):
         self.dip = None
         self.dipdir = None
         self.cell_size = None
+        self.grid = None
+        self.grid_cell_size = cell_size
+        self.tile_size = tile_size
+        self.backend = None
         self.interpolator_label = "DipDipDirectionInterpolator"
 
     def type(self):
@@ -360,6 +715,8 @@ class DipDipDirectionInterpolator(Interpolator):
         # setup variables for interpolation
         self.x = aggregated_data["X"].to_numpy()
         self.y = aggregated_data["Y"].to_numpy()
+        self.dip = None
+        self.dipdir = None
         if "dip" in self.data_type:
             self.dip = aggregated_data["DIP"].to_numpy()
         if "dipdir" in self.data_type:
@@ -379,7 +736,11 @@ class DipDipDirectionInterpolator(Interpolator):
                 "maxy": value,
             }
         """
-        self.xi, self.yi, self.cell_size = generate_grid(bounding_box)
+        if self.grid_cell_size is None:
+            self.xi, self.yi, self.cell_size = generate_grid(bounding_box)
+        else:
+            self.grid = Grid.from_bounding_box(bounding_box, cell_size=self.grid_cell_size)
+            self.cell_size = self.grid_cell_size
 
     @beartype.beartype
     def interpolate(self, ni: Union[ndarray, list], interpolator: Any = Rbf):
@@ -388,19 +749,17 @@ class DipDipDirectionInterpolator(Interpolator):
         Inverse Distance Weighting interpolation method
 
         Args:
-            ni (int): value to interpolate
-            interpolator: type of interpolator to use by default SciPy Rbf interpolator
+            ni (numpy.ndarray): values to interpolate, (N,) or (N, m) to interpolate m fields at once
+            interpolator: name or instance of the InterpolationBackend to use (see INTERPOLATION_BACKENDS),
+            or the SciPy Rbf or LinearNDInterpolator classes. Defaults to the SciPy Rbf interpolator
 
         Returns:
-            Rbf: radial basis function object
+            numpy.ndarray: the interpolated values on the grid
         """
-        if interpolator is Rbf:
-            rbf = Rbf(self.x, self.y, ni, function="linear")
-            return rbf(self.xi, self.yi)
-
-        if interpolator is LinearNDInterpolator:
-            lnd_interpolator = LinearNDInterpolator(list(zip(self.x, self.y)), ni)
-            return lnd_interpolator(self.xi, self.yi)
+        self.backend = get_interpolation_backend(interpolator)
+        self.backend.fit(self.x, self.y, numpy.asarray(ni, dtype=numpy.float64))
+        # evaluate the grid one tile at a time so its coordinates are never all generated at once
+        return numpy.concatenate([values for _, _, values in self.tiles()])
 
     @beartype.beartype
     def __call__(
@@ -418,18 +777,35 @@ class DipDipDirectionInterpolator(Interpolator):
             numpy.ndarray: interpolated dip and dip direction values
 
         """
+        self.fit(bounding_box, structure_data, interpolator)
+        if self.backend is not None:
+            return numpy.concatenate([values for _, _, values in self.tiles()])
+
+    @beartype.beartype
+    def fit(self, bounding_box: dict, structure_data: pandas.DataFrame, interpolator: Any = Rbf):
+        """
+        Setup the grid and fit the interpolation backend without evaluating it, so the grid can then
+        be evaluated in tiles with tiles()
+
+        Args:
+            bounding_box (dict): a dictionary containing the bounding box of the map data
+            structure_data (pandas.DataFrame): sampled structural data
+            interpolator: name or instance of the InterpolationBackend to use (see INTERPOLATION_BACKENDS),
+            or the SciPy Rbf or LinearNDInterpolator classes. Defaults to the SciPy Rbf interpolator
+        """
         self.setup_grid(bounding_box)
         self.setup_interpolation(structure_data)
 
-        # interpolate dip and dip direction
+        # fit dip and dip direction
         if self.dip is not None and self.dipdir is not None:
-            interpolated_dip = self.interpolate(self.dip, interpolator)
-            interpolated_dipdir = self.interpolate(self.dipdir, interpolator)
-            interpolated = numpy.array([interpolated_dip, interpolated_dipdir]).T
-            return interpolated
-
-        if self.dip is not None and self.dipdir is None:
-            return self.interpolate(self.dip, interpolator)
-
-        if self.dipdir is not None and self.dip is None:
-            return self.interpolate(self.dipdir, interpolator)
+            values = numpy.column_stack([self.dip, self.dipdir])
+        elif self.dip is not None:
+            values = self.dip
+        elif self.dipdir is not None:
+            values = self.dipdir
+        else:
+            # nothing to fit, so do not keep predicting the previous fit
+            self.backend = None
+            return
+        self.backend = get_interpolation_backend(interpolator)
+        self.backend.fit(self.x, self.y, numpy.asarray(values, dtype=numpy.float64))
@@ -1,9 +1,24 @@
 import map2model
-import pandas
 import numpy
+import pandas
+import shapely
 import os
-from .m2l_enums import VerboseLevel
+from .m2l_enums import Datatype, VerboseLevel
+from .checkpoint import StageCheckpoints
+from .topology import (
+    calculate_fault_relationships,
+    calculate_unit_relationships,
+    clip_to_bounding_box,
+)
 import re
+import shutil
+import tempfile
+
+# Patterns of the map2model output files
+UNITS_SORTED_PATTERN = re.compile(r"^(?:\S+ ){5}(.*?)\s*$", re.MULTILINE)
+INTERSECTION_LINE_PATTERN = re.compile(r"^[0-9]*, (.*), \{(.*)\}")
+FAULT_RELATION_PATTERN = re.compile(r"\(\s*([^,()]*?)\s*,\s*([^,()]*?)\s*,\s*([^,()]*?)\s*\)")
+GRAPH_LINK_PATTERN = re.compile(r"^(\S+) (\S+)")
 
 
 class Map2ModelWrapper:
@@ -24,9 +39,38 @@ class Map2ModelWrapper:
         A pointer to the map data structure in project
     verbose_level: m2l_enum.VerboseLevel
         A selection that defines how much console logging is output
+    in_memory: bool
+        Whether to exchange files with map2model in a memory backed directory (/dev/shm) that is
+        removed after the run, rather than in tmp_path/map2model_data
+    engine: str
+        Which engine calculates the relationships and sorted units, "map2model" (the external
+        binary) or "native" (in process from the geology and fault GeoDataFrames). The native
+        engine falls back to the binary when a fault intersects itself, as the binary's results
+        for those faults follow no rule that can be reproduced. Otherwise it differs from the
+        binary where two faults cross or abut exactly at a vertex (the angle can differ), in about
+        1% of the fault fault relationships of dense fault networks and rarely in whether a fault
+        ending just inside a unit cuts it (see topology.calculate_fault_relationships)
+    use_cache: bool
+        Whether to reuse the map2model results of a previous run with the same exported map data,
+        bounding box and parameters
+    cache_path: None or str
+        The directory of the map2model result cache, which can be shared between projects.
+        None uses tmp_path/map2model_cache
+    cache_max_size: int
+        The maximum total size of the cached results in bytes, beyond which the least recently
+        used results are evicted
     """
 
-    def __init__(self, map_data, verbose_level: VerboseLevel = VerboseLevel.NONE):
+    def __init__(
+        self,
+        map_data,
+        verbose_level: VerboseLevel = VerboseLevel.NONE,
+        in_memory: bool = True,
+        engine: str = "map2model",
+        use_cache: bool = True,
+        cache_path: str = None,
+        cache_max_size: int = 64 * 1024 * 1024,
+    ):
         """
         The initialiser for the map2model wrapper
 
@@ -35,13 +79,32 @@ class Map2ModelWrapper:
                 The project map data structure to reference
             verbose_level (VerboseLevel, optional):
                 How much console output is sent. Defaults to VerboseLevel.ALL.
+            in_memory (bool, optional):
+                Whether to exchange files with map2model in memory when /dev/shm is available.
+                Defaults to True.
+            engine (str, optional):
+                Either "map2model" or "native", which can differ from map2model in a few fault
+                relationships. Defaults to "map2model".
+            use_cache (bool, optional):
+                Whether to reuse the results of previous map2model runs. Defaults to True.
+            cache_path (str, optional):
+                The directory of the result cache. Defaults to None (tmp_path/map2model_cache).
+            cache_max_size (int, optional):
+                The maximum total size of the cached results in bytes. Defaults to 64MB.
         """
+        if engine not in ["map2model", "native"]:
+            raise ValueError(f"Unknown map2model engine '{engine}'")
         self.sorted_units = None
         self.fault_fault_relationships = None
         self.unit_fault_relationships = None
         self.unit_unit_relationships = None
         self.map_data = map_data
         self.verbose_level = verbose_level
+        self.in_memory = in_memory
+        self.engine = engine
+        self.use_cache = use_cache
+        self.cache_path = cache_path
+        self.cache_max_size = cache_max_size
 
     def reset(self):
         """
@@ -96,6 +159,34 @@ class Map2ModelWrapper:
             self.run()
         return self.unit_unit_relationships
 
+    def get_exchange_path(self):
+        """
+        Get the directory to exchange files with map2model in
+
+        Returns:
+            str: A new directory in /dev/shm if in_memory is set and it is writable, otherwise
+            tmp_path/map2model_data
+        """
+        if self.in_memory and os.access("/dev/shm", os.W_OK):
+            try:
+                return tempfile.mkdtemp(prefix="map2model_", dir="/dev/shm")
+            except OSError:
+                pass
+        return os.path.join(self.map_data.tmp_path, "map2model_data")
+
+    def get_cache(self):
+        """
+        Get the store of cached map2model results
+
+        Returns:
+            StageCheckpoints: The cache with an entry per result in cache_path or
+            tmp_path/map2model_cache, limited to cache_max_size
+        """
+        path = self.cache_path
+        if path is None:
+            path = os.path.join(self.map_data.tmp_path, "map2model_cache")
+        return StageCheckpoints(path, self.verbose_level)
+
     def run(self, verbose_level: VerboseLevel = None):
         """
         The main execute function that prepares, runs and parse the output of the map2model process
@@ -106,9 +197,32 @@ class Map2ModelWrapper:
         """
         if verbose_level is None:
             verbose_level = self.verbose_level
+        if self.engine == "native":
+            if not self.__has_self_intersecting_faults():
+                self.__run_native(verbose_level)
+                return
+            if verbose_level != VerboseLevel.NONE:
+                print("Some faults intersect themselves, running map2model instead")
+        path = self.get_exchange_path()
+        try:
+            self.__run(path, verbose_level)
+        finally:
+            if path != os.path.join(self.map_data.tmp_path, "map2model_data"):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def __run(self, path: str, verbose_level: VerboseLevel):
+        """
+        Export the map data, run map2model and parse its output in the exchange directory
+
+        Args:
+            path (str):
+                The directory to exchange files with map2model in
+            verbose_level (VerboseLevel):
+                How much console output is sent
+        """
         if verbose_level != VerboseLevel.NONE:
             print("Exporting map data for map2model")
-        self.map_data.export_wkt_format_files()
+        self.map_data.export_wkt_format_files(path)
         if verbose_level != VerboseLevel.NONE:
             print("Running map2model...")
         map2model_code_map = {
@@ -131,11 +245,31 @@ class Map2ModelWrapper:
             "volcanic": self.map_data.config.geology_config["volcanic_text"],  # VOLCANIC_STRING
             "deposit_dist": 100,  # deposit_dist
         }
+        # The exported files are exactly what map2model reads so their content is the cache key
+        key = None
+        if self.use_cache:
+            with open(os.path.join(path, "geology_wkt.csv"), "rb") as file:
+                geology = file.read()
+            faults = b""
+            if os.path.isfile(os.path.join(path, "faults_wkt.csv")):
+                with open(os.path.join(path, "faults_wkt.csv"), "rb") as file:
+                    faults = file.read()
+            key = StageCheckpoints.key(
+                "map2model", geology, faults, self.map_data.get_bounding_box(), map2model_code_map
+            )
+            results = self.get_cache().load(key, key)
+            if results is not None:
+                for name, value in results.items():
+                    setattr(self, name, value)
+                if verbose_level != VerboseLevel.NONE:
+                    print("Reusing cached map2model results")
+                return
+
         # TODO: Simplify. Note: this is external so have to match fix to map2model module
         run_log = map2model.run(
-            os.path.join(self.map_data.tmp_path, "map2model_data"),
-            os.path.join(self.map_data.tmp_path, "map2model_data", "geology_wkt.csv"),
-            os.path.join(self.map_data.tmp_path, "map2model_data", "faults_wkt.csv"),
+            path,
+            os.path.join(path, "geology_wkt.csv"),
+            os.path.join(path, "faults_wkt.csv"),
             "",
             self.map_data.get_bounding_box(),
             map2model_code_map,
@@ -148,87 +282,179 @@ class Map2ModelWrapper:
         if verbose_level != VerboseLevel.NONE:
             print("map2model complete")
 
-        # Parse units sorted
-        units_sorted = pandas.read_csv(
-            os.path.join(self.map_data.tmp_path, "map2model_data", "units_sorted.txt"),
-            header=None,
-            sep=' ',
+        self.sorted_units = self.parse_units_sorted(os.path.join(path, "units_sorted.txt"))
+        self.fault_fault_relationships = self.parse_fault_fault_intersections(
+            os.path.join(path, "fault-fault-intersection.txt")
         )
-        if units_sorted.shape == 0:
-            self.sorted_units = []
-        else:
-            self.sorted_units = list(units_sorted[5])
+        self.unit_fault_relationships = self.parse_unit_fault_intersections(
+            os.path.join(path, "unit-fault-intersection.txt")
+        )
+        self.unit_unit_relationships = self.parse_unit_graph(
+            os.path.join(path, "graph_all_None.gml.txt")
+        )
+        if key is not None:
+            cache = self.get_cache()
+            cache.save(
+                key,
+                key,
+                {
+                    "sorted_units": self.sorted_units,
+                    "fault_fault_relationships": self.fault_fault_relationships,
+                    "unit_fault_relationships": self.unit_fault_relationships,
+                    "unit_unit_relationships": self.unit_unit_relationships,
+                },
+            )
+            cache.evict(self.cache_max_size)
+
+    def __has_self_intersecting_faults(self) -> bool:
+        """
+        Check whether any fault (within the bounding box) crosses or touches itself
 
-        # Parse fault intersections
-        out = []
-        fault_fault_intersection_filename = os.path.join(
-            self.map_data.tmp_path, "map2model_data", "fault-fault-intersection.txt"
+        Returns:
+            bool: True if any fault is not simple
+        """
+        faults = self.map_data.get_map_data(Datatype.FAULT)
+        if faults is None or len(faults) == 0:
+            return False
+        lines = clip_to_bounding_box(
+            numpy.asarray(faults.geometry.values), self.map_data.get_bounding_box()
         )
-        if (
-            os.path.isfile(fault_fault_intersection_filename)
-            and os.path.getsize(fault_fault_intersection_filename) > 0
-        ):
-            df = pandas.read_csv(fault_fault_intersection_filename, delimiter="{", header=None)
-            df[1] = list(df[1].str.replace("}", "", regex=False))
-            df[1] = [re.findall("\(.*?\)", i) for i in df[1]]  # Valid escape for regex
-            df[0] = list(df[0].str.replace("^[0-9]*, ", "", regex=True))
-            df[0] = list(df[0].str.replace(", ", "", regex=False))
-            df[0] = "Fault_" + df[0]
-            relations = df[1]
-            for j in range(len(relations)):
-                relations[j] = [i.strip("()").replace(" ", "").split(",") for i in relations[j]]
-            df[1] = relations
-
-            for _, row in df.iterrows():
-                for i in numpy.arange(len(row[1])):
-                    out += [[row[0], "Fault_" + row[1][i][0], row[1][i][1], float(row[1][i][2])]]
-
-        df_out = pandas.DataFrame(columns=["Fault1", "Fault2", "Type", "Angle"], data=out)
-        self.fault_fault_relationships = df_out
-
-        # Parse unit fault relationships
-        out = []
-        unit_fault_intersection_filename = os.path.join(
-            self.map_data.tmp_path, "map2model_data", "unit-fault-intersection.txt"
+        lines = lines[~(shapely.is_missing(lines) | shapely.is_empty(lines))]
+        return not shapely.is_simple(lines).all()
+
+    def __run_native(self, verbose_level: VerboseLevel):
+        """
+        Calculate the map2model outputs in process from the geology and fault maps
+
+        Args:
+            verbose_level (VerboseLevel):
+                How much console output is sent
+        """
+        if verbose_level != VerboseLevel.NONE:
+            print("Calculating map topology")
+        geology = self.map_data.get_map_data(Datatype.GEOLOGY)
+        faults = self.map_data.get_map_data(Datatype.FAULT)
+        bounding_box = self.map_data.get_bounding_box()
+        self.sorted_units, self.unit_unit_relationships = calculate_unit_relationships(
+            geology, bounding_box
         )
-        if (
-            os.path.isfile(unit_fault_intersection_filename)
-            and os.path.getsize(unit_fault_intersection_filename) > 0
-        ):
-            df = pandas.read_csv(unit_fault_intersection_filename, header=None, sep='{')
-            df[1] = list(df[1].str.replace("}", "", regex=False))
-            df[1] = df[1].astype(str).str.split(", ")
-            df[0] = list(df[0].str.replace("^[0-9]*, ", "", regex=True))
-            df[0] = list(df[0].str.replace(", ", "", regex=False))
-
-            for _, row in df.iterrows():
-                for i in numpy.arange(len(row[1])):
-                    out += [[row[0], "Fault_" + row[1][i]]]
-
-        df_out = pandas.DataFrame(columns=["Unit", "Fault"], data=out)
-        self.unit_fault_relationships = df_out
-
-        # Parse unit unit relationships
-        units = []
-        links = []
-        graph_filename = os.path.join(
-            self.map_data.tmp_path, "map2model_data", "graph_all_None.gml.txt"
+        if faults is None or len(faults) == 0:
+            self.fault_fault_relationships = pandas.DataFrame(
+                columns=["Fault1", "Fault2", "Type", "Angle"]
+            )
+            self.unit_fault_relationships = pandas.DataFrame(columns=["Unit", "Fault"])
+        else:
+            (
+                self.fault_fault_relationships,
+                self.unit_fault_relationships,
+            ) = calculate_fault_relationships(geology, faults, bounding_box)
+        if verbose_level != VerboseLevel.NONE:
+            print("Map topology complete")
+
+    @staticmethod
+    def parse_units_sorted(filename: str) -> list:
+        """
+        Parse the map2model stratigraphic column estimate
+
+        Args:
+            filename (str): The units_sorted.txt file (space separated with the unit name last)
+
+        Returns:
+            list: The unit names in stratigraphic order
+        """
+        if not os.path.isfile(filename):
+            return []
+        with open(filename) as file:
+            return [match[1] for match in UNITS_SORTED_PATTERN.finditer(file.read())]
+
+    @staticmethod
+    def parse_fault_fault_intersections(filename: str) -> pandas.DataFrame:
+        """
+        Parse the map2model fault fault intersections in a single pass
+
+        Args:
+            filename (str):
+                The fault-fault-intersection.txt file with lines of the form
+                "index, fault, {(fault, type, angle), ...}"
+
+        Returns:
+            pandas.DataFrame: The relationships with columns ["Fault1", "Fault2", "Type", "Angle"]
+        """
+        fault1, fault2, types, angles = [], [], [], []
+        if os.path.isfile(filename):
+            with open(filename) as file:
+                for line in file:
+                    match = INTERSECTION_LINE_PATTERN.match(line)
+                    if match is None:
+                        continue
+                    fault = "Fault_" + match[1].replace(", ", "")
+                    for relation in FAULT_RELATION_PATTERN.finditer(match[2]):
+                        fault1.append(fault)
+                        fault2.append("Fault_" + relation[1])
+                        types.append(relation[2])
+                        angles.append(float(relation[3]))
+        return pandas.DataFrame(
+            columns=["Fault1", "Fault2", "Type", "Angle"],
+            data=list(zip(fault1, fault2, types, angles)),
+        )
+
+    @staticmethod
+    def parse_unit_fault_intersections(filename: str) -> pandas.DataFrame:
+        """
+        Parse the map2model unit fault intersections in a single pass
+
+        Args:
+            filename (str):
+                The unit-fault-intersection.txt file with lines of the form
+                "index, unit, {fault, ...}"
+
+        Returns:
+            pandas.DataFrame: The relationships with columns ["Unit", "Fault"]
+        """
+        units, faults = [], []
+        if os.path.isfile(filename):
+            with open(filename) as file:
+                for line in file:
+                    match = INTERSECTION_LINE_PATTERN.match(line)
+                    if match is None:
+                        continue
+                    unit_faults = match[2].split(", ")
+                    units += [match[1].replace(", ", "")] * len(unit_faults)
+                    faults += ["Fault_" + fault for fault in unit_faults]
+        return pandas.DataFrame(columns=["Unit", "Fault"], data=list(zip(units, faults)))
+
+    @staticmethod
+    def parse_unit_graph(filename: str) -> pandas.DataFrame:
+        """
+        Parse the map2model unit contact graph in a single pass
+
+        Args:
+            filename (str):
+                The graph_all_None.gml.txt file with "index name" node lines, a blank line and
+                then "index index weight" link lines
+
+        Returns:
+            pandas.DataFrame:
+                The relationships with columns ["Index1", "UnitName1", "Index2", "UnitName2"]
+        """
+        names = {}
+        index1, index2 = [], []
+        if os.path.isfile(filename):
+            with open(filename) as file:
+                for line in file:
+                    if line.strip() == "":
+                        break
+                    index, name = line.rstrip("\n").split(" ", 1)
+                    names[index] = name
+                for line in file:
+                    match = GRAPH_LINK_PATTERN.match(line)
+                    if match is not None:
+                        index1.append(match[1])
+                        index2.append(match[2])
+        return pandas.DataFrame(
+            columns=["Index1", "UnitName1", "Index2", "UnitName2"],
+            data=[
+                (int(first), names[first], int(second), names[second])
+                for first, second in zip(index1, index2)
+            ],
         )
-        if os.path.isfile(graph_filename) and os.path.getsize(graph_filename) > 0:
-            with open(
-                os.path.join(self.map_data.tmp_path, "map2model_data", "graph_all_None.gml.txt")
-            ) as file:
-                contents = file.read()
-                segments = contents.split("\n\n")
-                for line in segments[0].split("\n"):
-                    units += [line.split(" ")]
-                for line in segments[1].split("\n")[:-1]:
-                    links += [line.split(" ")]
-
-        df = pandas.DataFrame(columns=["index", "unit"], data=units)
-        df.set_index("index", inplace=True)
-        out = []
-        for row in links:
-            out += [[int(row[0]), df["unit"][row[0]], int(row[1]), df["unit"][row[1]]]]
-        df_out = pandas.DataFrame(columns=["Index1", "UnitName1", "Index2", "UnitName2"], data=out)
-        self.unit_unit_relationships = df_out
@@ -0,0 +1,195 @@
+# internal imports
+from .m2l_enums import VerboseLevel
+from .checkpoint import StageCheckpoints
+from .version import __version__
+
+# external imports
+import geopandas
+import beartype
+import glob
+import os
+from typing import Optional
+
+
+class MapDataCache:
+    """
+    A content addressed on-disk cache of parsed map data stored as GeoParquet files.
+    The least recently used files are evicted when the cache grows beyond max_size
+
+    Attributes
+    ----------
+    path: str
+        The directory holding the cached files
+    max_size: int
+        The maximum total size of the cached files in bytes
+    hits: int
+        The number of cache lookups that found a cached file
+    misses: int
+        The number of cache lookups that did not find a cached file
+    verbose_level: m2l_enums.VerboseLevel
+        A selection that defines how much console logging is output
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = 1024 * 1024 * 1024,
+        verbose_level: VerboseLevel = VerboseLevel.ALL,
+    ):
+        """
+        The initialiser for the map data cache
+
+        Args:
+            path (str):
+                The directory to store the cached files in (created when the first file is saved)
+            max_size (int, optional):
+                The maximum total size of the cached files in bytes. Defaults to 1GB.
+            verbose_level (VerboseLevel, optional):
+                How much console output is sent. Defaults to VerboseLevel.ALL.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.verbose_level = verbose_level
+
+    @staticmethod
+    def source_fingerprint(filename: str) -> str:
+        """
+        Fingerprint a map data source from the path, size and modification time of the file and
+        any sidecar files sharing its name (e.g. the .dbf and .prj files of a shapefile).
+        Remote sources (urls) are fingerprinted by the url itself
+
+        Args:
+            filename (str): The filename or url of the source
+
+        Returns:
+            str: The fingerprint of the source
+        """
+        if not os.path.exists(filename):
+            return filename
+        filename = os.path.abspath(filename)
+        files = sorted(set([filename] + glob.glob(glob.escape(os.path.splitext(filename)[0]) + ".*")))
+        return ";".join(
+            f"{file}:{os.stat(file).st_size}:{os.stat(file).st_mtime_ns}"
+            for file in files
+            if os.path.isfile(file)
+        )
+
+    @staticmethod
+    def key(
+        datatype_name: str, filename: str, bounding_box, working_projection, config: dict
+    ) -> str:
+        """
+        Calculate the cache key of a parsed map
+
+        Args:
+            datatype_name (str): The name of the datatype
+            filename (str): The filename or url the map is loaded from
+            bounding_box (dict): The bounding box the map is clipped to
+            working_projection (str): The projection the map is reprojected to
+            config (dict): The config section used to parse the map
+
+        Returns:
+            str: The cache key
+        """
+        return StageCheckpoints.key(
+            __version__,
+            datatype_name,
+            MapDataCache.source_fingerprint(filename),
+            bounding_box,
+            working_projection,
+            config,
+        )
+
+    def filename(self, key: str) -> str:
+        """
+        Get the filename of a cached map
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            str: The filename
+        """
+        return os.path.join(self.path, key + ".parquet")
+
+    @beartype.beartype
+    def load(self, key: str, name: str = "") -> Optional[geopandas.GeoDataFrame]:
+        """
+        Load a cached map
+
+        Args:
+            key (str): The cache key
+            name (str, optional): The name of the map for reporting. Defaults to "".
+
+        Returns:
+            geopandas.GeoDataFrame or None: The cached map, None if it is not in the cache
+        """
+        filename = self.filename(key)
+        data = None
+        if os.path.isfile(filename):
+            try:
+                data = geopandas.read_parquet(filename)
+                # mark the file as recently used for the eviction policy
+                os.utime(filename)
+            except Exception as e:
+                print(f"Could not read cached map data file {filename} ({e})")
+        if data is None:
+            self.misses += 1
+            if self.verbose_level != VerboseLevel.NONE:
+                print(f"Map data cache miss for {name}")
+        else:
+            self.hits += 1
+            if self.verbose_level != VerboseLevel.NONE:
+                print(f"Map data cache hit for {name}")
+        return data
+
+    @beartype.beartype
+    def save(self, key: str, data: geopandas.GeoDataFrame):
+        """
+        Save a map to the cache and evict the least recently used maps if the cache is too large
+
+        Args:
+            key (str): The cache key
+            data (geopandas.GeoDataFrame): The map to save
+        """
+        filename = self.filename(key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            data.to_parquet(filename + ".tmp")
+            os.replace(filename + ".tmp", filename)
+            self.evict()
+        except Exception as e:
+            if os.path.isfile(filename + ".tmp"):
+                os.remove(filename + ".tmp")
+            print(f"Could not save map data to the cache ({e})")
+
+    def evict(self):
+        """
+        Remove the least recently used files until the cache is no larger than max_size. Files
+        removed by another save evicting at the same time are skipped
+        """
+        files = []
+        for file in glob.glob(os.path.join(glob.escape(self.path), "*.parquet")):
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                continue
+            files += [(stat.st_mtime_ns, stat.st_size, file)]
+        size = sum(file[1] for file in files)
+        for _, file_size, file in sorted(files):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+
+    def clear(self):
+        """
+        Remove all the cached maps
+        """
+        for file in glob.glob(os.path.join(glob.escape(self.path), "*.parquet")):
+            os.remove(file)
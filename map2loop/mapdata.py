@@ -3,6 +3,8 @@ from .m2l_enums import Datatype, Datastate, VerboseLevel
 from .config import Config
 from .aus_state_urls import AustraliaStateUrls
 from .utils import generate_random_hex_colors
+from .map_data_cache import MapDataCache
+from .http_cache import HttpCache
 
 # external imports
 import geopandas
@@ -12,13 +14,18 @@ import pathlib
 import shapely
 from osgeo import gdal, osr
 from owslib.wcs import WebCoverageService
-import urllib
+import urllib.error
+import urllib.parse
+import urllib.request
 from gzip import GzipFile
 from uuid import uuid4
 import beartype
 import os
 from io import BytesIO
-from typing import Union
+from typing import Optional, Union
+import concurrent.futures
+import hashlib
+
 
 class MapData:
     """
@@ -56,6 +63,24 @@ class MapData:
         The path to the directory holding the temporary files
     verbose_level: m2l_enums.VerboseLevel
         A selection that defines how much console logging is output
+    raster_interpolation: str
+        The default interpolation ("nearest" or "bilinear") used when sampling raster data
+    raster_arrays: list of dicts
+        The cached arrays of the raster map data, indexed by datatype
+    raster_memmap_threshold: int
+        The size in bytes above which cached raster arrays are memory-mapped from tmp_path
+    map_data_cache: MapDataCache or None
+        The on-disk cache of parsed map data, None if map data is not cached
+    http_cache: HttpCache or None
+        The on-disk cache of downloaded map data and config files, None if downloads are not cached
+    load_errors: list of Exceptions
+        The error raised loading each datatype by load_all_map_data, None if it loaded
+    feature_ids: dict
+        The feature ids of the vector map files whose ids are not consecutive, by the path, size
+        and modification time (or content hash) of the file
+    io_engine: str or None
+        The engine used to read and write vector map data ("fiona", "pyogrio" or "arrow"), None
+        to read and write whole files with the default geopandas engine
     config: Config
         A link to the config structure which is defined in config.py
     """
@@ -87,6 +112,14 @@ class MapData:
         self.colour_filename = None
         self.tmp_path = tmp_path
         self.verbose_level = verbose_level
+        self.raster_interpolation = "nearest"
+        self.raster_arrays = [None] * len(Datatype)
+        self.raster_memmap_threshold = 256 * 1024 * 1024
+        self.map_data_cache = None
+        self.http_cache = None
+        self.load_errors = [None] * len(Datatype)
+        self.feature_ids = {}
+        self.io_engine = None
 
         self.config = Config()
 
@@ -244,7 +277,9 @@ class MapData:
                 Whether the file is in m2lv2 form. Defaults to False.
         """
         self.config_filename = filename
-        self.config.update_from_file(filename, legacy_format=legacy_format, lower=lower)
+        self.config.update_from_file(
+            filename, legacy_format=legacy_format, lower=lower, http_cache=self.http_cache
+        )
 
     def get_config_filename(self):
         """
@@ -285,7 +320,11 @@ class MapData:
                 The list of codes to ignore
         """
         self.config.geology_config["ignore_codes"] = codes
-        self.data_states[Datatype.GEOLOGY] = Datastate.CLIPPED
+        if self.raw_data[Datatype.GEOLOGY] is None:
+            # The parsed geology came from the map data cache so the source has to be read again
+            self.data_states[Datatype.GEOLOGY] = Datastate.UNLOADED
+        else:
+            self.data_states[Datatype.GEOLOGY] = Datastate.CLIPPED
         self.dirtyflags[Datatype.GEOLOGY] = True
 
     @beartype.beartype
@@ -369,20 +408,138 @@ class MapData:
         return ret
 
     @beartype.beartype
-    def load_all_map_data(self):
+    def set_map_data_cache(self, path: Optional[str] = None, max_size: int = 1024 * 1024 * 1024):
+        """
+        Cache the parsed map data as GeoParquet files so that later runs with the same source
+        files, bounding box, projection and config load the parsed data directly
+
+        Args:
+            path (str, optional):
+                The directory of the cache. Defaults to None (tmp_path/map_data_cache).
+            max_size (int, optional):
+                The maximum size of the cache in bytes, the least recently used files are evicted
+                beyond this. Defaults to 1GB.
+        """
+        if path is None:
+            path = os.path.join(self.tmp_path, "map_data_cache")
+        self.map_data_cache = MapDataCache(path, max_size, self.verbose_level)
+
+    @beartype.beartype
+    def set_http_cache(self, path: Optional[str] = None, offline: bool = False):
+        """
+        Cache the downloaded map data, DTM and config files so that later requests for the same
+        url are revalidated with conditional requests instead of downloaded again
+
+        Args:
+            path (str, optional):
+                The directory of the cache. Defaults to None (tmp_path/http_cache).
+            offline (bool, optional):
+                Whether to only use cached responses and never access the network. Defaults to False.
+        """
+        if path is None:
+            path = os.path.join(self.tmp_path, "http_cache")
+        self.http_cache = HttpCache(path, offline=offline, verbose_level=self.verbose_level)
+
+    @beartype.beartype
+    def set_io_engine(self, engine: Optional[str]):
+        """
+        Set the engine used to read and write vector map data. None reads whole files with the
+        default geopandas engine, "fiona" reads whole files feature by feature, "pyogrio" reads
+        only the bounding box and configured columns and "arrow" does the same through pyogrio's
+        Arrow interface so that columns are decoded in bulk
+
+        Args:
+            engine (str or None):
+                Either None, "fiona", "pyogrio" or "arrow"
         """
-        Load all the map data for each datatype.  Cycles through each type and loads it
+        if engine not in [None, "fiona", "pyogrio", "arrow"]:
+            raise ValueError(f"Unknown io engine '{engine}'")
+        self.io_engine = engine
+
+    def get_io_engine(self):
+        """
+        Get the engine used to read and write vector map data
+
+        Returns:
+            str or None: The io engine
         """
-        for i in [
-            Datatype.GEOLOGY,
-            Datatype.STRUCTURE,
-            Datatype.FAULT,
-            Datatype.FOLD,
-            Datatype.FAULT_ORIENTATION,
-        ]:
+        return self.io_engine
 
-            self.load_map_data(i)
-        self.load_raster_map_data(Datatype.DTM)
+    @beartype.beartype
+    def get_config_section(self, datatype: Datatype) -> Optional[dict]:
+        """
+        Get the config section used to parse a datatype
+
+        Args:
+            datatype (Datatype):
+                The datatype
+
+        Returns:
+            dict or None: The config section, None for raster datatypes
+        """
+        if datatype == Datatype.GEOLOGY:
+            return self.config.geology_config
+        elif datatype == Datatype.STRUCTURE:
+            return self.config.structure_config
+        elif datatype in [Datatype.FAULT, Datatype.FAULT_ORIENTATION]:
+            return self.config.fault_config
+        elif datatype == Datatype.FOLD:
+            return self.config.fold_config
+        return None
+
+    @beartype.beartype
+    def load_all_map_data(self, max_workers: Optional[int] = None):
+        """
+        Load all the map data for each datatype. The datatypes are independent so they are
+        loaded concurrently on a thread pool. An error loading one datatype is kept in
+        load_errors and sets its state to Datastate.ERRORED without stopping the others, and
+        once all the datatypes have finished the first of these errors is raised. A file that
+        cannot be read is reported in load_errors but, as before, does not stop the loading
+
+        Args:
+            max_workers (int, optional):
+                The maximum number of datatypes loaded at once. Defaults to None (all at once).
+
+        Raises:
+            Exception: the first error raised loading a datatype, in datatype order
+        """
+        loaders = {
+            Datatype.GEOLOGY: self.load_map_data,
+            Datatype.STRUCTURE: self.load_map_data,
+            Datatype.FAULT: self.load_map_data,
+            Datatype.FOLD: self.load_map_data,
+            Datatype.FAULT_ORIENTATION: self.load_map_data,
+            Datatype.DTM: self.load_raster_map_data,
+        }
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or len(loaders)
+        ) as executor:
+            futures = [
+                executor.submit(self.__load_datatype, loader, datatype)
+                for datatype, loader in loaders.items()
+            ]
+            concurrent.futures.wait(futures)
+        for datatype in loaders:
+            if self.data_states[datatype] == Datastate.ERRORED:
+                raise self.load_errors[datatype]
+
+    def __load_datatype(self, loader, datatype: Datatype):
+        """
+        Load a datatype keeping any error in load_errors
+
+        Args:
+            loader (callable):
+                The function loading the datatype
+            datatype (Datatype):
+                The datatype to load
+        """
+        self.load_errors[datatype] = None
+        try:
+            loader(datatype)
+        except Exception as e:
+            self.load_errors[datatype] = e
+            self.data_states[datatype] = Datastate.ERRORED
+            print(f"Failed to load {datatype.name} map data: {e}\n")
 
     @beartype.beartype
     def load_map_data(self, datatype: Datatype):
@@ -399,15 +556,33 @@ class MapData:
             self.dirtyflags[datatype] = False
             self.data_states[datatype] = Datastate.COMPLETE
         elif self.dirtyflags[datatype] is True:
+            cache_key = None
+            if self.map_data_cache is not None:
+                cache_key = MapDataCache.key(
+                    datatype.name,
+                    self.filenames[datatype],
+                    self.bounding_box,
+                    self.working_projection,
+                    self.get_config_section(datatype),
+                )
+            if self.data_states[datatype] == Datastate.UNLOADED and cache_key is not None:
+                # Use the parsed map from a previous run if the source and settings are unchanged
+                data = self.map_data_cache.load(cache_key, datatype.name)
+                if data is not None:
+                    self.data[datatype] = data
+                    self.data_states[datatype] = Datastate.COMPLETE
+                    self.dirtyflags[datatype] = False
+                    return
             if self.data_states[datatype] == Datastate.UNLOADED:
                 # Load data from file
                 try:
                     map_filename = self.filenames[datatype]
                     map_filename = self.update_filename_with_bounding_box(map_filename)
                     map_filename = self.update_filename_with_projection(map_filename)
-                    self.raw_data[datatype] = geopandas.read_file(map_filename)
+                    self.raw_data[datatype] = self.__read_map_file(datatype, map_filename)
                     self.data_states[datatype] = Datastate.LOADED
-                except Exception:
+                except Exception as e:
+                    self.load_errors[datatype] = e
                     print(
                         f"Failed to open {datatype.name} file called '{self.filenames[datatype]}'\n"
                     )
@@ -420,15 +595,127 @@ class MapData:
             if self.data_states[datatype] == Datastate.REPROJECTED:
                 # Clip geopanda to bounding polygon
                 self.raw_data[datatype] = geopandas.clip(
-                    self.raw_data[datatype], self.bounding_box_polygon
+                    self.raw_data[datatype], self.bounding_box_polygon, sort=True
                 )
                 self.data_states[datatype] = Datastate.CLIPPED
             if self.data_states[datatype] == Datastate.CLIPPED:
                 # Convert column names using codes_and_labels dictionary
                 self.check_map(datatype)
                 self.data_states[datatype] = Datastate.COMPLETE
+                if cache_key is not None and isinstance(self.data[datatype], geopandas.GeoDataFrame):
+                    self.map_data_cache.save(cache_key, self.data[datatype])
             self.dirtyflags[datatype] = False
 
+    def __read_map_file(self, datatype: Datatype, map_filename: str):
+        """
+        Read a vector map file with the io engine. The pyogrio and arrow engines only decode the
+        features within the bounding box (transformed into the crs of the source) and the columns
+        named in the config section of the datatype. Remote sources are read whole unless they
+        come from the http cache, as their url already holds the bounding box
+
+        Args:
+            datatype (Datatype):
+                The datatype of the map
+            map_filename (str):
+                The expanded filename or url of the map
+
+        Returns:
+            geopandas.GeoDataFrame: The map data
+        """
+        engine = self.io_engine if self.io_engine in [None, "fiona"] else "pyogrio"
+        if map_filename.startswith("http"):
+            if self.http_cache is None:
+                return geopandas.read_file(map_filename, engine=engine)
+            source = self.http_cache.fetch(map_filename)
+        else:
+            source = map_filename
+        try:
+            if engine != "pyogrio":
+                raise ImportError("Only the pyogrio and arrow engines read part of a file")
+            import pyogrio
+
+            info = pyogrio.read_info(source)
+        except Exception:
+            return geopandas.read_file(
+                BytesIO(source) if isinstance(source, bytes) else source, engine=engine
+            )
+
+        config = self.get_config_section(datatype)
+        names = [value for key, value in config.items() if key.endswith("_column")]
+        columns = [field for field in info["fields"] if field in names]
+        bbox = None
+        if self.bounding_box_polygon is not None:
+            boundary = self.bounding_box_polygon
+            if info["crs"] is not None and boundary.crs is not None:
+                # densify the edges so the reprojected extent covers the whole bounding box
+                minx, miny, maxx, maxy = boundary.total_bounds
+                boundary = boundary.set_geometry(
+                    boundary.geometry.segmentize(max(maxx - minx, maxy - miny) / 100)
+                ).to_crs(info["crs"])
+            bbox = tuple(float(coord) for coord in boundary.total_bounds)
+
+        kwargs = {"bbox": bbox, "columns": columns, "fid_as_index": True, "engine": "pyogrio"}
+        try:
+            data = geopandas.read_file(source, use_arrow=self.io_engine == "arrow", **kwargs)
+        except Exception:
+            # pyarrow is not installed or the driver does not support Arrow
+            data = geopandas.read_file(source, **kwargs)
+
+        # Spatially indexed formats return the features in index order, so restore the file order
+        # and keep the row positions in the full file as the index (used for default fault names)
+        data = data.sort_index()
+        if info["driver"] != "ESRI Shapefile":
+            data.index = self.__feature_positions(source, info, data.index)
+        data.index.name = None
+        return data
+
+    def __feature_positions(self, source, info: dict, fids: pandas.Index) -> numpy.ndarray:
+        """
+        Get the positions in a vector map file of the features with the given feature ids. The
+        ids of GeoPackages are normally consecutive, which is checked from the ids of the first and
+        last features without scanning the file. Otherwise the ids of all the features are read
+        once and kept in feature_ids
+
+        Args:
+            source (str or bytes):
+                The filename or content of the map file
+            info (dict):
+                The pyogrio information of the map file
+            fids (pandas.Index):
+                The feature ids
+
+        Returns:
+            numpy.ndarray: The positions of the features in the file
+        """
+        import pyogrio
+
+        count = info["features"]
+        if count > 0 and info.get("capabilities", {}).get("fast_set_next_by_index"):
+            first, last = [
+                pyogrio.read_dataframe(
+                    source,
+                    columns=[],
+                    read_geometry=False,
+                    fid_as_index=True,
+                    skip_features=skip,
+                    max_features=1,
+                ).index[0]
+                for skip in [0, count - 1]
+            ]
+            if last - first == count - 1:
+                return numpy.asarray(fids) - first
+
+        if isinstance(source, bytes):
+            key = hashlib.sha256(source).hexdigest()
+        else:
+            stat = os.stat(source)
+            key = (os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+        if key not in self.feature_ids:
+            self.feature_ids[key] = pyogrio.read_dataframe(
+                source, columns=[], read_geometry=False, fid_as_index=True
+            ).index
+        return self.feature_ids[key].get_indexer(fids)
+
     @beartype.beartype
     def get_empty_dataframe(self, datatype: Datatype):
         """
@@ -452,6 +739,7 @@ class MapData:
             )
         return data
 
+    @staticmethod
     @beartype.beartype
     def open_http_query(url: str):
         """
@@ -466,13 +754,13 @@ class MapData:
             _type_: The geotiff file
         """
         try:
-            request = urllib.Request(url, headers={"Accept-Encoding": "gzip"})
+            request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
             response = urllib.request.urlopen(request, timeout=30)
             if response.info().get("Content-Encoding") == "gzip":
                 return GzipFile(fileobj=BytesIO(response.read()))
             else:
                 return response
-        except urllib.URLError:
+        except urllib.error.URLError:
             return None
 
     @beartype.beartype
@@ -480,8 +768,7 @@ class MapData:
         """
         Create the temporary files directory if it is not valid
         """
-        if not os.path.isdir(self.tmp_path):
-            os.mkdir(self.tmp_path)
+        os.makedirs(self.tmp_path, exist_ok=True)
 
 
  
@@ -506,21 +793,38 @@ class MapData:
         if filename.lower() == "aus" or filename.lower() == "au":
 
             url = "http://services.ga.gov.au/gis/services/DEM_SRTM_1Second_over_Bathymetry_Topography/MapServer/WCSServer?"
-            wcs = WebCoverageService(url, version="1.0.0")
+            if self.http_cache is not None:
+                # The same GetCoverage request owslib makes, expanded so the response can be cached
+                query = urllib.parse.urlencode(
+                    {
+                        "version": "1.0.0",
+                        "request": "GetCoverage",
+                        "service": "WCS",
+                        "Coverage": "1",
+                        "BBox": ",".join(str(coord) for coord in bb_ll),
+                        "crs": 4326,
+                        "format": "GeoTIFF",
+                        "width": 2048,
+                        "height": 2048,
+                    }
+                )
+                tif = gdal.Open(self.http_cache.fetch_file(url + query))
+            else:
+                wcs = WebCoverageService(url, version="1.0.0")
 
-            coverage = wcs.getCoverage(
-                identifier="1", bbox=bb_ll, format="GeoTIFF", crs=4326, width=2048, height=2048
-            )
-            
-            # This is stupid that gdal cannot read a byte stream and has to have a
-            # file on the local system to open or otherwise create a gdal file
-            # from scratch with Create
+                coverage = wcs.getCoverage(
+                    identifier="1", bbox=bb_ll, format="GeoTIFF", crs=4326, width=2048, height=2048
+                )
 
-            tmp_file = os.path.join(self.tmp_path, "StupidGDALLocalFile.tif")
+                # This is stupid that gdal cannot read a byte stream and has to have a
+                # file on the local system to open or otherwise create a gdal file
+                # from scratch with Create
 
-            with open(tmp_file, "wb") as fh:
-                fh.write(coverage.read())
-            tif = gdal.Open(tmp_file)
+                tmp_file = os.path.join(self.tmp_path, "StupidGDALLocalFile.tif")
+
+                with open(tmp_file, "wb") as fh:
+                    fh.write(coverage.read())
+                tif = gdal.Open(tmp_file)
         
         elif filename == "hawaii":
             import netCDF4
@@ -530,8 +834,11 @@ class MapData:
             )
             
             filename = f"https://pae-paha.pacioos.hawaii.edu/erddap/griddap/srtm30plus_v11_land.nc?elev{bbox_str}"
-            f = urllib.request.urlopen(filename)
-            ds = netCDF4.Dataset("in-mem-file", mode="r", memory=f.read())
+            if self.http_cache is not None:
+                memory = self.http_cache.fetch(filename)
+            else:
+                memory = urllib.request.urlopen(filename).read()
+            ds = netCDF4.Dataset("in-mem-file", mode="r", memory=memory)
             spatial = [
                 ds.geospatial_lon_min,
                 ds.geospatial_lon_resolution,
@@ -554,10 +861,13 @@ class MapData:
             tif.SetProjection(srs.ExportToWkt())
             tif.GetRasterBand(1).WriteArray(numpy.flipud(ds.variables["elev"][:][:]))
         elif filename.startswith("http"):
-            image_data = self.open_http_query(filename)
-            mmap_name = f"/vsimem/{str(uuid4())}"
-            gdal.FileFromMemBuffer(mmap_name, image_data.read())
-            tif = gdal.Open(mmap_name)
+            if self.http_cache is not None:
+                tif = gdal.Open(self.http_cache.fetch_file(filename))
+            else:
+                image_data = self.open_http_query(filename)
+                mmap_name = f"/vsimem/{str(uuid4())}"
+                gdal.FileFromMemBuffer(mmap_name, image_data.read())
+                tif = gdal.Open(mmap_name)
         else:
             tif = gdal.Open(filename, gdal.GA_ReadOnly)
         # except Exception:
@@ -614,6 +924,7 @@ class MapData:
                     projWinSRS=self.working_projection,
                 )
                 self.data_states[datatype] = Datastate.COMPLETE
+                self.clear_raster_array(datatype)
             self.dirtyflags[datatype] = False
 
     @beartype.beartype
@@ -665,9 +976,9 @@ class MapData:
         # Parse dip direction and dip columns
         if config["dipdir_column"] in self.raw_data[Datatype.FAULT_ORIENTATION]:
             if config["orientation_type"] == "strike":
-                fault_orientations["DIPDIR"] = self.raw_data[Datatype.STRUCTURE].apply(
-                    lambda row: (row[config["dipdir_column"]] + 90.0) % 360.0, axis=1
-                )
+                fault_orientations["DIPDIR"] = (
+                    self.raw_data[Datatype.FAULT_ORIENTATION][config["dipdir_column"]] + 90.0
+                ) % 360.0
             else:
                 fault_orientations["DIPDIR"] = self.raw_data[Datatype.FAULT_ORIENTATION][
                     config["dipdir_column"]
@@ -727,9 +1038,9 @@ class MapData:
         # Parse dip direction and dip columns
         if config["dipdir_column"] in self.raw_data[Datatype.STRUCTURE]:
             if config["orientation_type"] == "strike":
-                structure["DIPDIR"] = self.raw_data[Datatype.STRUCTURE].apply(
-                    lambda row: (row[config["dipdir_column"]] + 90.0) % 360.0, axis=1
-                )
+                structure["DIPDIR"] = (
+                    self.raw_data[Datatype.STRUCTURE][config["dipdir_column"]] + 90.0
+                ) % 360.0
             else:
                 structure["DIPDIR"] = self.raw_data[Datatype.STRUCTURE][config["dipdir_column"]]
         else:
@@ -923,7 +1234,7 @@ class MapData:
             faults["FEATURE"] = self.raw_data[Datatype.FAULT][config["structtype_column"]]
             faults = faults[faults["FEATURE"].astype(str).str.contains(config["fault_text"])]
             if self.verbose_level > VerboseLevel.NONE:
-                if len(faults) < len(self.raw_data[Datatype.GEOLOGY]) and len(faults) == 0:
+                if len(faults) < len(self.raw_data[Datatype.FAULT]) and len(faults) == 0:
                     msg = f"Fault map reduced to 0 faults as structtype_column ({config['structtype_column']}) does not contains as row with fault_text \"{config['fault_text']}\""
                     print(msg)
 
@@ -940,7 +1251,7 @@ class MapData:
             faults["DIP"] = numpy.nan  # config["dip_null_value"]
 
         # Replace dip 0 with nan as dip 0 means unknown
-        faults["DIP"] = [numpy.nan if dip == 0 else dip for dip in faults["DIP"]]
+        faults["DIP"] = faults["DIP"].mask(faults["DIP"] == 0)
 
         # Parse the dip direction for the fault
         if config["dipdir_flag"] != "alpha":
@@ -952,20 +1263,16 @@ class MapData:
                 faults["DIPDIR"] = numpy.nan
         else:
             # Take the geoDataSeries of the dipdir estimates (assume it's a string description)
-            if config["dip_estimate_column"] in self.raw_data[Datatype.FAULT]:
-                dipdir_text_estimates = self.raw_data[Datatype.FAULT][
-                    config["dip_estimate_column"]
-                ].astype(str)
+            if config["dipestimate_column"] in self.raw_data[Datatype.FAULT]:
+                dipdir_text_estimates = self.raw_data[Datatype.FAULT][config["dipestimate_column"]]
             elif config["dipdir_column"] in self.raw_data[Datatype.FAULT]:
-                dipdir_text_estimates = self.raw_data[Datatype.FAULT][
-                    config["dipdir_column"]
-                ].astype(str)
+                dipdir_text_estimates = self.raw_data[Datatype.FAULT][config["dipdir_column"]]
             else:
                 dipdir_text_estimates = None
                 faults["DIPDIR"] = numpy.nan
 
             # Map dipdir_estimates in text form to cardinal direction
-            if dipdir_text_estimates:
+            if dipdir_text_estimates is not None:
                 direction_map = {
                     "north_east": 45.0,
                     "south_east": 135.0,
@@ -976,15 +1283,16 @@ class MapData:
                     "south": 180.0,
                     "west": 270.0,
                 }
-                for direction in direction_map:
-                    dipdir_text_estimates = dipdir_text_estimates.astype(str).str.replace(
-                        f".*{direction}.*", direction_map[direction], regex=True
-                    )
-                # Catch all for any field that still contains anything that isn't a number
-                dipdir_text_estimates = dipdir_text_estimates.astype(str).str.replace(
-                    ".*[^0-9.].*", numpy.nan, regex=True
+                text = dipdir_text_estimates.loc[faults.index].astype(str).str.lower()
+                # The first matching direction is used and any other field that isn't a number is nan
+                numbers = pandas.to_numeric(
+                    text.where(text.str.fullmatch("[0-9.]+", na=False)), errors="coerce"
+                )
+                faults["DIPDIR"] = numpy.select(
+                    [text.str.contains(direction, regex=False, na=False) for direction in direction_map],
+                    list(direction_map.values()),
+                    numbers.to_numpy(dtype=numpy.float64, na_value=numpy.nan),
                 )
-                faults["DIPDIR"] = dipdir_text_estimates.astype(numpy.float64)
 
         # Add object id
         if config["objectid_column"] in self.raw_data[Datatype.FAULT]:
@@ -993,20 +1301,9 @@ class MapData:
             faults["ID"] = faults.index
 
         if len(faults):
-            faults["NAME"] = faults.apply(
-                lambda fault: (
-                    "Fault_" + str(fault["ID"]) if fault["NAME"].lower() == "nan" else fault["NAME"]
-                ),
-                axis=1,
-            )
-            faults["NAME"] = faults.apply(
-                lambda fault: (
-                    "Fault_" + str(fault["ID"])
-                    if fault["NAME"].lower() == "none"
-                    else fault["NAME"]
-                ),
-                axis=1,
-            )
+            # Name the faults with missing names from their ID
+            missing = faults["NAME"].isna() | faults["NAME"].str.lower().isin(["nan", "none"])
+            faults["NAME"] = faults["NAME"].mask(missing, "Fault_" + faults["ID"].astype(str))
             faults["NAME"] = faults["NAME"].str.replace(" -/?", "_", regex=True)
 
         self.data[Datatype.FAULT] = faults
@@ -1039,7 +1336,7 @@ class MapData:
                 folds[config["structtype_column"]].astype(str).str.contains(config["fold_text"])
             ]
             if self.verbose_level > VerboseLevel.NONE:
-                if len(folds) < len(self.raw_data[Datatype.GEOLOGY]) and len(folds) == 0:
+                if len(folds) < len(self.raw_data[Datatype.FOLD]) and len(folds) == 0:
                     msg = f"Fold map reduced to 0 folds as structtype_column ({config['structtype_column']}) does not contains any row with fold_text \"{config['fold_text']}\""
                     print(msg)
 
@@ -1118,7 +1415,7 @@ class MapData:
             datatype (Datatype):
                 The datatype of the geopanda to save
             extension (str, optional):
-                The extension to use for the data. Defaults to ".csv".
+                The extension to use for the data, ".parquet" writes GeoParquet. Defaults to ".csv".
         """
         try:
             filename = os.path.join(output_dir, datatype.name + extension)
@@ -1126,15 +1423,26 @@ class MapData:
                 # TODO: Add geopandas to pandas converter and then write csv
                 # self.raw_data[datatype].write_csv(filename)
                 print("GeoDataFrame to CSV conversion not implimented")
-            else:
+            elif extension == ".parquet":
+                self.raw_data[datatype].to_parquet(filename)
+            elif self.io_engine is None:
                 self.raw_data[datatype].to_file(filename)
+            elif self.io_engine == "fiona":
+                self.raw_data[datatype].to_file(filename, engine="fiona")
+            else:
+                self.raw_data[datatype].to_file(
+                    filename, engine="pyogrio", use_arrow=self.io_engine == "arrow"
+                )
         except Exception:
             print(f"Failed to save {datatype.name} to file named {filename}\n")
 
     @beartype.beartype
     def get_raw_map_data(self, datatype: Datatype):
         """
-        Get the raw data geopanda of the specified datatype
+        Get the raw data geopanda of the specified datatype. With the "pyogrio" and "arrow" io
+        engines the raw data of a vector map only holds the features within the bounding box and
+        the columns named in the config section of the datatype, indexed by the position of each
+        feature in the file. Use the "fiona" io engine to read every column
 
         Args:
             datatype (Datatype):
@@ -1234,16 +1542,24 @@ class MapData:
             return None, None
 
     @beartype.beartype
-    def export_wkt_format_files(self):
+    def export_wkt_format_files(self, path: Optional[str] = None) -> str:
         """
         Save out the geology and fault GeoDataFrames in WKT format
         This is used by map2model
+
+        Args:
+            path (str, optional):
+                The directory to save the files in. Defaults to None (tmp_path/map2model_data).
+
+        Returns:
+            str: The directory the files were saved in
         """
         # TODO: - Move away from tab seperators entirely (topology and map2model)
 
-        self.__check_and_create_tmp_path()
-        if not os.path.isdir(os.path.join(self.tmp_path, "map2model_data")):
-            os.mkdir(os.path.join(self.tmp_path, "map2model_data"))
+        if path is None:
+            self.__check_and_create_tmp_path()
+            path = os.path.join(self.tmp_path, "map2model_data")
+        os.makedirs(path, exist_ok=True)
 
         # Check geology data status and export to a WKT format file
         self.load_map_data(Datatype.GEOLOGY)
@@ -1266,8 +1582,12 @@ class MapData:
                 "ROCKTYPE2",
                 "DESCRIPTION",
             ]
-            geology = self.get_map_data(Datatype.GEOLOGY)[columns].copy()
+            geology = pandas.DataFrame(self.get_map_data(Datatype.GEOLOGY)[columns])
             geology.reset_index(inplace=True, drop=True)
+            # Convert the geometries to WKT in one call rather than per row in to_csv
+            geology["geometry"] = shapely.to_wkt(
+                numpy.asarray(geology["geometry"].values), rounding_precision=-1
+            )
             geology.rename(
                 columns={"geometry": "WKT", "CODE": "UNITNAME", "UNITNAME": "CODE"}, inplace=True
             )
@@ -1276,11 +1596,7 @@ class MapData:
             geology["GROUP"] = geology["GROUP"].replace("None", "")
             geology["ROCKTYPE1"] = geology["ROCKTYPE1"].replace("", "None")
             geology["ROCKTYPE2"] = geology["ROCKTYPE2"].replace("", "None")
-            geology.to_csv(
-                os.path.join(self.tmp_path, "map2model_data", "geology_wkt.csv"),
-                sep="\t",
-                index=False,
-            )
+            geology.to_csv(os.path.join(path, "geology_wkt.csv"), sep="\t", index=False)
 
         # Check faults data status and export to a WKT format file
         self.load_map_data(Datatype.FAULT)
@@ -1291,13 +1607,83 @@ class MapData:
                 f"Cannot export fault data as it only loaded to {self.data_states[Datatype.FAULT].name} status"
             )
         else:
-            faults = self.get_map_data(Datatype.FAULT).copy()
+            faults = pandas.DataFrame(self.get_map_data(Datatype.FAULT))
+            faults["geometry"] = shapely.to_wkt(
+                numpy.asarray(faults["geometry"].values), rounding_precision=-1
+            )
             faults.rename(columns={"geometry": "WKT"}, inplace=True)
-            faults.to_csv(
-                os.path.join(self.tmp_path, "map2model_data", "faults_wkt.csv"),
-                sep="\t",
-                index=False,
+            faults.to_csv(os.path.join(path, "faults_wkt.csv"), sep="\t", index=False)
+        return path
+
+    @beartype.beartype
+    def clear_raster_array(self, datatype: Datatype):
+        """
+        Remove the cached array of a raster datatype (and its memory-mapped file if there is one)
+
+        Args:
+            datatype (Datatype):
+                The raster datatype to clear
+        """
+        cache = self.raster_arrays[datatype]
+        self.raster_arrays[datatype] = None
+        if cache is not None and cache["filename"] is not None:
+            del cache["array"]
+            try:
+                os.remove(cache["filename"])
+            except OSError:
+                print(f"Could not remove cached raster file {cache['filename']}")
+
+    @beartype.beartype
+    def get_raster_array(self, datatype: Datatype):
+        """
+        Get the cached array of a raster datatype, reading it from the gdal dataset the first
+        time it is requested after the raster is (re)loaded. Rasters larger than
+        raster_memmap_threshold are written to a .npy file in tmp_path and memory-mapped
+
+        Args:
+            datatype (Datatype):
+                The raster datatype to retrieve
+
+        Returns:
+            dict: The "array", "inv_geotransform" and "nodata" value of the raster, or None if not loaded
+        """
+        data = self.get_map_data(datatype)
+        if data is None:
+            return None
+        cache = self.raster_arrays[datatype]
+        if cache is not None and cache["source"] is data:
+            return cache
+        self.clear_raster_array(datatype)
+
+        band = data.GetRasterBand(1)
+        xsize, ysize = data.RasterXSize, data.RasterYSize
+        dtype = band.ReadAsArray(0, 0, 1, 1).dtype
+        filename = None
+        if xsize * ysize * dtype.itemsize > self.raster_memmap_threshold:
+            # Too large to hold in memory so read the raster in strips into a memory-mapped file
+            self.__check_and_create_tmp_path()
+            filename = os.path.join(self.tmp_path, f"{datatype.name}_{uuid4().hex}.npy")
+            array = numpy.lib.format.open_memmap(
+                filename, mode="w+", dtype=dtype, shape=(ysize, xsize)
             )
+            rows_per_strip = max(1, (64 * 1024 * 1024) // max(1, xsize * dtype.itemsize))
+            for row in range(0, ysize, rows_per_strip):
+                rows = min(rows_per_strip, ysize - row)
+                array[row : row + rows, :] = band.ReadAsArray(0, row, xsize, rows)
+            array.flush()
+            del array
+            array = numpy.load(filename, mmap_mode="r")
+        else:
+            array = band.ReadAsArray()
+
+        self.raster_arrays[datatype] = {
+            "source": data,
+            "array": array,
+            "inv_geotransform": gdal.InvGeoTransform(data.GetGeoTransform()),
+            "nodata": band.GetNoDataValue(),
+            "filename": filename,
+        }
+        return self.raster_arrays[datatype]
 
     @beartype.beartype
     def get_value_from_raster(self, datatype: Datatype, x, y):
@@ -1313,53 +1699,155 @@ class MapData:
                 The northing coordinate of the value
 
         Returns:
-            float or int: The value at the point specified
+            float or int: The value at the point specified (nan where the raster has no data)
         """
-        data = self.get_map_data(datatype)
-        if data is None:
+        raster = self.get_raster_array(datatype)
+        if raster is None:
             print(f"Cannot get value from {datatype.name} data as data is not loaded")
             return None
-        inv_geotransform = gdal.InvGeoTransform(data.GetGeoTransform())
+        inv_geotransform = raster["inv_geotransform"]
+        array = raster["array"]
 
         px = int(inv_geotransform[0] + inv_geotransform[1] * x + inv_geotransform[2] * y)
         py = int(inv_geotransform[3] + inv_geotransform[4] * x + inv_geotransform[5] * y)
         # Clamp values to the edges of raster if past boundary, similiar to GL_CLIP
         px = max(px, 0)
-        px = min(px, data.RasterXSize - 1)
+        px = min(px, array.shape[1] - 1)
         py = max(py, 0)
-        py = min(py, data.RasterYSize - 1)
-        val = data.ReadAsArray(px, py, 1, 1)[0][0]
+        py = min(py, array.shape[0] - 1)
+        val = array[py, px]
+        if raster["nodata"] is not None and val == raster["nodata"]:
+            return numpy.nan
         return val
 
     @beartype.beartype
-    def __value_from_raster(self, inv_geotransform, data, x: float, y: float):
-        """
-        Get the value from a raster dataset at the specified point
+    def __values_from_raster(
+        self,
+        inv_geotransform,
+        data: numpy.ndarray,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        interpolation: str = "nearest",
+        nodata=None,
+    ) -> numpy.ndarray:
+        """
+        Get the values from a raster array at the specified points
 
         Args:
             inv_geotransform (gdal.GeoTransform):
                 The inverse of the data's geotransform
-            data (numpy.array):
-                The raster data
-            x (float):
-                The easting coordinate of the value
-            y (float):
-                The northing coordinate of the value
+            data (numpy.ndarray):
+                The raster data indexed as [row, column]
+            x (numpy.ndarray):
+                The easting coordinates of the values
+            y (numpy.ndarray):
+                The northing coordinates of the values
+            interpolation (str, optional):
+                Either "nearest" (the containing pixel) or "bilinear". Defaults to "nearest".
+            nodata (float, optional):
+                The nodata value of the raster, matching pixels are returned as nan. Defaults to None.
 
         Returns:
-            float or int: The value at the point specified
+            numpy.ndarray: The values at the points specified
+        """
+        rows, cols = data.shape
+        # Convert all coordinates to fractional pixel coordinates in one affine transform
+        px = inv_geotransform[0] + inv_geotransform[1] * x + inv_geotransform[2] * y
+        py = inv_geotransform[3] + inv_geotransform[4] * x + inv_geotransform[5] * y
+        valid = numpy.isfinite(px) & numpy.isfinite(py)
+        px = numpy.where(valid, px, 0.0)
+        py = numpy.where(valid, py, 0.0)
+
+        if interpolation == "nearest":
+            # Clamp values to the edges of raster if past boundary, similiar to GL_CLIP
+            ix = numpy.clip(numpy.floor(px).astype(numpy.int64), 0, cols - 1)
+            iy = numpy.clip(numpy.floor(py).astype(numpy.int64), 0, rows - 1)
+            values = data[iy, ix].astype(numpy.float64)
+            if nodata is not None:
+                values[data[iy, ix] == nodata] = numpy.nan
+        elif interpolation == "bilinear":
+            # Interpolate between the four surrounding pixel centres
+            fx = numpy.clip(px - 0.5, 0, cols - 1)
+            fy = numpy.clip(py - 0.5, 0, rows - 1)
+            x0 = numpy.floor(fx).astype(numpy.int64)
+            y0 = numpy.floor(fy).astype(numpy.int64)
+            x1 = numpy.minimum(x0 + 1, cols - 1)
+            y1 = numpy.minimum(y0 + 1, rows - 1)
+            wx = fx - x0
+            wy = fy - y0
+            corners = [data[y0, x0], data[y0, x1], data[y1, x0], data[y1, x1]]
+            weights = [(1 - wx) * (1 - wy), wx * (1 - wy), (1 - wx) * wy, wx * wy]
+            values = numpy.zeros(len(px), dtype=numpy.float64)
+            for corner, weight in zip(corners, weights):
+                corner = corner.astype(numpy.float64)
+                if nodata is not None:
+                    corner[corner == nodata] = numpy.nan
+                values += corner * weight
+        else:
+            raise ValueError(f"Unknown raster interpolation '{interpolation}'")
+        values[~valid] = numpy.nan
+        return values
+
+    @beartype.beartype
+    def set_raster_interpolation(self, interpolation: str):
         """
-        px = int(inv_geotransform[0] + inv_geotransform[1] * x + inv_geotransform[2] * y)
-        py = int(inv_geotransform[3] + inv_geotransform[4] * x + inv_geotransform[5] * y)
-        # Clamp values to the edges of raster if past boundary, similiar to GL_CLIP
-        px = max(px, 0)
-        px = min(px, data.shape[0] - 1)
-        py = max(py, 0)
-        py = min(py, data.shape[1] - 1)
-        return data[px][py]
+        Set the default interpolation used when sampling raster data
+
+        Args:
+            interpolation (str):
+                Either "nearest" or "bilinear"
+        """
+        if interpolation not in ["nearest", "bilinear"]:
+            raise ValueError(f"Unknown raster interpolation '{interpolation}'")
+        self.raster_interpolation = interpolation
+
+    def get_raster_interpolation(self):
+        """
+        Get the default interpolation used when sampling raster data
+
+        Returns:
+            str: The raster interpolation
+        """
+        return self.raster_interpolation
 
     @beartype.beartype
-    def get_value_from_raster_df(self, datatype: Datatype, df: pandas.DataFrame):
+    def get_values_from_raster(
+        self, datatype: Datatype, x, y, interpolation: Optional[str] = None
+    ) -> Optional[numpy.ndarray]:
+        """
+        Get the values from a raster map at many points in a single batched lookup
+
+        Args:
+            datatype (Datatype):
+                The datatype of the raster map to retrieve from
+            x (array-like):
+                The easting coordinates of the values
+            y (array-like):
+                The northing coordinates of the values
+            interpolation (str, optional):
+                Either "nearest" or "bilinear". Defaults to None (which uses raster_interpolation).
+
+        Returns:
+            numpy.ndarray: The values at the points specified (nan where the raster has no data)
+        """
+        if interpolation is None:
+            interpolation = self.raster_interpolation
+        x = numpy.asarray(x, dtype=numpy.float64).ravel()
+        y = numpy.asarray(y, dtype=numpy.float64).ravel()
+        if len(x) == 0:
+            return numpy.empty(0, dtype=numpy.float64)
+        raster = self.get_raster_array(datatype)
+        if raster is None:
+            print(f"Cannot get value from {datatype.name} data as data is not loaded")
+            return None
+        return self.__values_from_raster(
+            raster["inv_geotransform"], raster["array"], x, y, interpolation, raster["nodata"]
+        )
+
+    @beartype.beartype
+    def get_value_from_raster_df(
+        self, datatype: Datatype, df: pandas.DataFrame, interpolation: Optional[str] = None
+    ):
         """
         Add a 'Z' column to a dataframe with the heights from the 'X' and 'Y' coordinates
 
@@ -1368,6 +1856,8 @@ class MapData:
                 The datatype of the raster map to retrieve from
             df (pandas.DataFrame):
                 The original dataframe with 'X' and 'Y' columns
+            interpolation (str, optional):
+                Either "nearest" or "bilinear". Defaults to None (which uses raster_interpolation).
 
         Returns:
             pandas.DataFrame: The modified dataframe
@@ -1375,18 +1865,13 @@ class MapData:
         if len(df) <= 0:
             df["Z"] = []
             return df
-        data = self.get_map_data(datatype)
-        if data is None:
+        values = self.get_values_from_raster(
+            datatype, df["X"].to_numpy(), df["Y"].to_numpy(), interpolation
+        )
+        if values is None:
             print("Cannot get value from data as data is not loaded")
             return None
-
-        inv_geotransform = gdal.InvGeoTransform(data.GetGeoTransform())
-        data_array = numpy.array(data.GetRasterBand(1).ReadAsArray().T)
-
-        df["Z"] = df.apply(
-            lambda row: self.__value_from_raster(inv_geotransform, data_array, row["X"], row["Y"]),
-            axis=1,
-        )
+        df["Z"] = values
         return df
 
     @beartype.beartype
@@ -1404,27 +1889,57 @@ class MapData:
             faults = self.get_map_data(Datatype.FAULT).copy()
             faults["geometry"] = faults.buffer(50)
             geology = geopandas.overlay(geology, faults, how="difference", keep_geom_type=False)
-        units = geology["UNITNAME"].unique()
-        column_names = ["UNITNAME_1", "UNITNAME_2", "geometry"]
-        contacts = geopandas.GeoDataFrame(crs=geology.crs, columns=column_names, data=None)
-        while len(units) > 1:
-            unit1 = units[0]
-            units = units[1:]
-            for unit2 in units:
-                if unit1 != unit2:
-                    join = geopandas.overlay(
-                        geology[geology["UNITNAME"] == unit1],
-                        geology[geology["UNITNAME"] == unit2],
-                        keep_geom_type=False,
-                    )[column_names]
-                    join["geometry"] = join.buffer(1)
-                    buffered = geology[geology["UNITNAME"] == unit2][["geometry"]].copy()
-                    buffered["geometry"] = buffered.boundary
-                    end = geopandas.overlay(buffered, join, keep_geom_type=False)
-                    if len(end):
-                        contacts = pandas.concat([contacts, end], ignore_index=True)
+        names = geology["UNITNAME"].to_numpy()
+        geometries = numpy.asarray(geology.geometry.values)
+
+        # Invalid polygons are made valid keeping only their polygonal parts
+        polygonal = numpy.isin(shapely.get_type_id(geometries), [3, 6])
+        invalid = polygonal & ~shapely.is_valid(geometries)
+        if invalid.any():
+            geometries[invalid] = [
+                (
+                    shapely.union_all(
+                        [
+                            part
+                            for part in shapely.get_parts(geometry)
+                            if part.geom_type in ("Polygon", "MultiPolygon")
+                        ]
+                    )
+                    if geometry.geom_type == "GeometryCollection"
+                    else geometry
+                )
+                for geometry in shapely.make_valid(geometries[invalid])
+            ]
+            valid = ~invalid | numpy.isin(shapely.get_type_id(geometries), [3, 6])
+            names, geometries = names[valid], geometries[valid]
+
+        # Find every pair of touching units in a single spatial index query, each pair is
+        # ordered as the units appear in the geology
+        tree = shapely.STRtree(geometries)
+        unit1, unit2 = tree.query(geometries, predicate="intersects")
+        pairs = unit1 < unit2
+        unit1, unit2 = unit1[pairs], unit2[pairs]
+        order = numpy.lexsort((unit2, unit1))
+        unit1, unit2 = unit1[order], unit2[order]
+
+        # The contact is the part of the boundary of the second unit within 1m of the
+        # intersection of the two units
+        shared = shapely.intersection(geometries[unit1], geometries[unit2])
+        polygonal = numpy.isin(shapely.get_type_id(shared), [3, 6])
+        shared[polygonal] = shapely.make_valid(shared[polygonal])
+        shared = shapely.buffer(shared, 1, quad_segs=16)
+        boundaries = shapely.boundary(geometries[unit2])
+        touching = shapely.intersects(boundaries, shared)
+        contacts = geopandas.GeoDataFrame(
+            {
+                "UNITNAME_1": names[unit1[touching]],
+                "UNITNAME_2": names[unit2[touching]],
+                "geometry": shapely.intersection(boundaries[touching], shared[touching]),
+            },
+            crs=geology.crs,
+        )
         # contacts["TYPE"] = "UNKNOWN"
-        contacts["length"] = [row.length for row in contacts["geometry"]]
+        contacts["length"] = shapely.length(contacts.geometry.values)
         if save_contacts:
             self.contacts = contacts
         return contacts
@@ -1438,23 +1953,74 @@ class MapData:
             stratigraphic_column (list):
                 The stratigraphic column to use
         """
-        units = stratigraphic_column
+        # rank of each unit in the column (the first occurrence as with list.index)
+        ranks = {}
+        for rank, unit in enumerate(stratigraphic_column):
+            ranks.setdefault(unit, rank)
         basal_contacts = self.contacts.copy()
-        basal_contacts["ID"] = basal_contacts.apply(
-            lambda row: min(units.index(row["UNITNAME_1"]), units.index(row["UNITNAME_2"])), axis=1
-        )
-        basal_contacts["basal_unit"] = basal_contacts.apply(lambda row: units[row["ID"]], axis=1)
-        basal_contacts["distance"] = basal_contacts.apply(
-            lambda row: abs(units.index(row["UNITNAME_1"]) - units.index(row["UNITNAME_2"])), axis=1
-        )
-        basal_contacts["type"] = basal_contacts.apply(
-            lambda row: "ABNORMAL" if abs(row["distance"]) > 1 else "BASAL", axis=1
-        )
+        rank1 = basal_contacts["UNITNAME_1"].map(ranks)
+        rank2 = basal_contacts["UNITNAME_2"].map(ranks)
+        missing = rank1.isna() | rank2.isna()
+        if missing.any():
+            unit = basal_contacts["UNITNAME_1"].where(rank1.isna(), basal_contacts["UNITNAME_2"])
+            raise ValueError(
+                f"Unit {unit[missing].iloc[0]} is not in the stratigraphic column {stratigraphic_column}"
+            )
+        rank1 = rank1.to_numpy(dtype=numpy.int64)
+        rank2 = rank2.to_numpy(dtype=numpy.int64)
+        basal_contacts["ID"] = numpy.minimum(rank1, rank2)
+        basal_contacts["basal_unit"] = numpy.asarray(stratigraphic_column, dtype=object)[
+            basal_contacts["ID"].to_numpy()
+        ]
+        basal_contacts["distance"] = numpy.abs(rank1 - rank2)
+        basal_contacts["type"] = numpy.where(basal_contacts["distance"] > 1, "ABNORMAL", "BASAL")
         basal_contacts = basal_contacts[["ID", "basal_unit", "type", "geometry"]]
         if save_contacts:
             self.basal_contacts = basal_contacts
         return basal_contacts
 
+    @beartype.beartype
+    def calculate_basal_contact_lengths(self, stratigraphic_columns: list) -> list:
+        """
+        Calculate the total length of the basal contacts (contacts between units next to each
+        other in the column) of each stratigraphic column without extracting the basal contacts
+        of each column. The units and lengths of the contacts are tabled once and each column
+        only ranks the units
+
+        Args:
+            stratigraphic_columns (list):
+                The stratigraphic columns (lists of unit names) to measure
+
+        Returns:
+            list: The basal contact length of each column
+        """
+        units, codes = numpy.unique(
+            numpy.concatenate(
+                [
+                    self.contacts["UNITNAME_1"].to_numpy(dtype=object),
+                    self.contacts["UNITNAME_2"].to_numpy(dtype=object),
+                ]
+            ).astype(str),
+            return_inverse=True,
+        )
+        unit1, unit2 = numpy.split(codes, 2)
+        lengths = self.contacts["length"].to_numpy(dtype=numpy.float64)
+
+        basal_lengths = []
+        for stratigraphic_column in stratigraphic_columns:
+            # rank of each unit in the column (the first occurrence as with list.index)
+            ranks = {}
+            for rank, unit in enumerate(stratigraphic_column):
+                ranks.setdefault(unit, rank)
+            unit_ranks = numpy.array([ranks.get(unit, -1) for unit in units], dtype=numpy.int64)
+            if (unit_ranks < 0).any():
+                raise ValueError(
+                    f"Unit {units[unit_ranks < 0][0]} is not in the stratigraphic column {stratigraphic_column}"
+                )
+            basal = numpy.abs(unit_ranks[unit1] - unit_ranks[unit2]) == 1
+            basal_lengths.append(sum(lengths[basal].tolist()))
+        return basal_lengths
+
     @beartype.beartype
     def colour_units(
         self, stratigraphic_units: pandas.DataFrame, random: bool = False
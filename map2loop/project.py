@@ -7,14 +7,22 @@ from .sampler import Sampler, SamplerDecimator, SamplerSpacing
 from .thickness_calculator import ThicknessCalculator, ThicknessCalculatorAlpha
 from .throw_calculator import ThrowCalculator, ThrowCalculatorAlpha
 from .fault_orientation import FaultOrientation
-from .sorter import Sorter, SorterAgeBased, SorterAlpha, SorterUseNetworkX, SorterUseHint
+from .sorter import (
+    Sorter,
+    SorterAgeBased,
+    SorterAlpha,
+    SorterObservationProjections,
+    SorterUseNetworkX,
+    SorterUseHint,
+)
 from .stratigraphic_column import StratigraphicColumn
 from .deformation_history import DeformationHistory
 from .map2model_wrapper import Map2ModelWrapper
+from .checkpoint import StageCheckpoints
 
 # external imports
 import LoopProjectFile as LPF
-from typing import Union
+from typing import Optional, Union
 from osgeo import gdal
 import geopandas
 import beartype
@@ -23,6 +31,9 @@ import numpy
 import pandas
 import os
 import re
+import operator
+import time
+import concurrent.futures
 
 
 class Project(object):
@@ -37,6 +48,10 @@ class Project(object):
         A list of samplers used to extract point samples from polyonal or line segments. Indexed by m2l_enum.Dataype
     sorter: Sorter
         The sorting algorithm to use for calculating the stratigraphic column
+    candidate_sorters: list
+        The sorters compared when taking the best stratigraphic column
+    sorter_timings: dict
+        The time in seconds each candidate sorter took in the last comparison, by sorter label
     thickness_calculator: ThicknessCalulator
         The algorithm to use for making unit thickness estimations
     loop_filename: str
@@ -49,6 +64,11 @@ class Project(object):
         The structure that holds the unit information and ordering
     deformation_history: DeformationHistory
         The structura that holds the fault and fold information and interactions
+    checkpoints: StageCheckpoints
+        The store of stage outputs in tmp_path used to resume run_all
+    stage_inputs: None or tuple
+        Copies of the stratigraphic units and faults as they were before the first stage ran,
+        which the checkpoint keys use as the stages overwrite them
     """
 
     @beartype.beartype
@@ -72,6 +92,10 @@ class Project(object):
         save_pre_checked_map_data: bool = False,
         loop_project_filename: str = "",
         overwrite_loopprojectfile: bool = False,
+        cache_map_data: bool = False,
+        cache_http_requests: bool = False,
+        offline: bool = False,
+        io_engine: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -112,6 +136,18 @@ class Project(object):
                 A flag to save all map data to file before use. Defaults to False.
             loop_project_filename (str, optional):
                 The filename of the loop project file. Defaults to "".
+            cache_map_data (bool, optional):
+                A flag to cache the parsed map data in tmp_path so later projects with the same
+                files, bounding box, projection and config skip reading and parsing. Defaults to False.
+            cache_http_requests (bool, optional):
+                A flag to cache downloaded map data, DTM and config files in tmp_path and revalidate
+                them with conditional requests. Defaults to False.
+            offline (bool, optional):
+                A flag to only use the http cache and never access the network (implies
+                cache_http_requests). Defaults to False.
+            io_engine (str, optional):
+                The engine used to read and write vector map data ("fiona", "pyogrio" or "arrow").
+                Defaults to None (whole files with the default geopandas engine).
 
         Raises:
             TypeError: Type of working_projection not a str or int
@@ -125,6 +161,13 @@ class Project(object):
         self.samplers = [SamplerDecimator()] * len(Datatype)
         self.set_default_samplers()
         self.sorter = SorterUseHint()
+        self.candidate_sorters = [
+            SorterUseHint(),
+            SorterAgeBased(),
+            SorterAlpha(),
+            SorterUseNetworkX(),
+        ]
+        self.sorter_timings = {}
         self.thickness_calculator = ThicknessCalculatorAlpha()
         self.throw_calculator = ThrowCalculatorAlpha()
         self.fault_orientation = FaultOrientationNearest()
@@ -132,7 +175,12 @@ class Project(object):
         self.overwrite_lpf = overwrite_loopprojectfile
 
         self.map_data = MapData(tmp_path=tmp_path, verbose_level=verbose_level)
+        self.map_data.set_io_engine(io_engine)
+        if cache_http_requests or offline:
+            self.map_data.set_http_cache(offline=offline)
         self.map2model = Map2ModelWrapper(self.map_data)
+        self.checkpoints = StageCheckpoints(os.path.join(tmp_path, "checkpoints"), verbose_level)
+        self.stage_inputs = None
         self.stratigraphic_column = StratigraphicColumn()
         self.deformation_history = DeformationHistory()
 
@@ -202,6 +250,8 @@ class Project(object):
             self.map_data.set_colour_filename(clut_filename)
 
         # Load all data (both shape and raster)
+        if cache_map_data:
+            self.map_data.set_map_data_cache()
         self.map_data.load_all_map_data()
 
         # If flag to save out data is check do so
@@ -234,6 +284,7 @@ class Project(object):
         self.map_data.set_ignore_codes(codes)
         # Re-populate the units in the column with the new set of ignored geographical units
         self.stratigraphic_column.populate(self.map_data.get_map_data(Datatype.GEOLOGY))
+        self.stage_inputs = None
 
     @beartype.beartype
     def set_sorter(self, sorter: Sorter):
@@ -255,6 +306,29 @@ class Project(object):
         """
         return self.sorter.sorter_label
 
+    @beartype.beartype
+    def set_candidate_sorters(self, sorters: list):
+        """
+        Set the sorters compared when taking the best stratigraphic column, for example adding
+        SorterMaximiseContacts or SorterObservationProjections to the defaults
+
+        Args:
+            sorters (list):
+                The sorters to compare. Each must be of base class Sorter
+        """
+        if len(sorters) == 0 or not all(isinstance(sorter, Sorter) for sorter in sorters):
+            raise TypeError("Candidate sorters must be a non-empty list of Sorter instances")
+        self.candidate_sorters = sorters
+
+    def get_candidate_sorters(self):
+        """
+        Get the names of the sorters compared when taking the best stratigraphic column
+
+        Returns:
+            list: The names of the candidate sorters
+        """
+        return [sorter.sorter_label for sorter in self.candidate_sorters]
+
     @beartype.beartype
     def set_thickness_calculator(self, thickness_calculator: ThicknessCalculator):
         """
@@ -401,31 +475,49 @@ class Project(object):
         )
         self.map_data.get_value_from_raster_df(Datatype.DTM, self.map_data.sampled_contacts)
 
-    def calculate_stratigraphic_order(self, take_best=False):
+    def calculate_stratigraphic_order(self, take_best=False, n_jobs: int = 0):
         """
         Use unit relationships, unit ages and the sorter to create a stratigraphic column
+
+        Args:
+            take_best (bool, optional):
+                Whether to run all the candidate sorters and keep the column with the longest
+                basal contacts. Defaults to False.
+            n_jobs (int, optional):
+                The number of worker threads the candidate sorters run on, 0 for one per sorter.
+                Defaults to 0.
         """
         if take_best:
-            sorters = [SorterUseHint(), SorterAgeBased(), SorterAlpha(), SorterUseNetworkX()]
-
-            columns = [
-                sorter.sort(
-                    self.stratigraphic_column.stratigraphicUnits,
-                    self.map2model.get_unit_unit_relationships(),
-                    self.map2model.get_sorted_units(),
-                    self.map_data.contacts,
-                    self.map_data,
-                )
-                for sorter in sorters
-            ]
-            basal_contacts = [
-                self.map_data.extract_basal_contacts(column, save_contacts=False)
-                for column in columns
-            ]
-            basal_lengths = [
-                sum(list(contacts[contacts["type"] == "BASAL"]["geometry"].length))
-                for contacts in basal_contacts
-            ]
+            sorters = self.candidate_sorters
+            # The inputs are loaded up front so the sorters only read shared data
+            inputs = (
+                self.stratigraphic_column.stratigraphicUnits,
+                self.map2model.get_unit_unit_relationships(),
+                self.map2model.get_sorted_units(),
+                self.map_data.contacts,
+                self.map_data,
+            )
+            if any(isinstance(sorter, SorterObservationProjections) for sorter in sorters):
+                self.map_data.get_map_data(Datatype.GEOLOGY)
+                self.map_data.get_map_data(Datatype.STRUCTURE)
+
+            def timed_sort(sorter):
+                start = time.perf_counter()
+                column = sorter.sort(*inputs)
+                return column, time.perf_counter() - start
+
+            n_jobs = n_jobs if n_jobs > 0 else len(sorters)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(timed_sort, sorters))
+            columns = [column for column, _ in results]
+            self.sorter_timings = {
+                sorter.sorter_label: seconds for sorter, (_, seconds) in zip(sorters, results)
+            }
+            if self.verbose_level != VerboseLevel.NONE:
+                for label, seconds in self.sorter_timings.items():
+                    print(f"Sorter {label} took {seconds:.3f}s")
+
+            basal_lengths = self.map_data.calculate_basal_contact_lengths(columns)
             max_length = -1
             column = columns[0]
             best_sorter = sorters[0]
@@ -496,34 +588,185 @@ class Project(object):
             self.map_data,
         )
 
-    def run_all(self, user_defined_stratigraphic_column=None, take_best=False):
+    def stage_keys(self, user_defined_stratigraphic_column=None, take_best=False) -> dict:
+        """
+        Calculate the checkpoint key of each processing stage from a content hash of the stage
+        inputs and parameters. Each key includes the keys of the stages it depends on so that
+        changing a parameter only invalidates the stages downstream of it
+
+        Args:
+            user_defined_stratigraphic_column (None or list, optional):
+                A user fed list that overrides the stratigraphic column sorter. Defaults to None.
+            take_best (bool, optional):
+                Whether the best of all sorters is used. Defaults to False.
+
+        Returns:
+            dict: The checkpoint key of each stage
+        """
+        # The thickness, colour and fault summary stages overwrite the units and faults so every
+        # run is keyed on them as they were before the first run
+        if self.stage_inputs is None:
+            self.stage_inputs = (
+                self.stratigraphic_column.stratigraphicUnits.copy(),
+                self.deformation_history.faults.copy(),
+            )
+        dtm = None
+        if self.map_data.data[Datatype.DTM] is not None:
+            dtm = self.map_data.get_raster_array(Datatype.DTM)
+        map_key = StageCheckpoints.key(
+            [self.map_data.data[datatype] for datatype in Datatype if datatype != Datatype.DTM],
+            None if dtm is None else (dtm["array"], dtm["inv_geotransform"], dtm["nodata"]),
+            self.map_data.config,
+            self.map_data.working_projection,
+            self.map_data.bounding_box,
+            self.stage_inputs,
+        )
+        keys = {"contacts": StageCheckpoints.key("contacts", map_key)}
+        keys["stratigraphic_order"] = StageCheckpoints.key(
+            "stratigraphic_order",
+            keys["contacts"],
+            user_defined_stratigraphic_column,
+            take_best,
+            self.sorter,
+            self.candidate_sorters if take_best else None,
+            self.map2model.engine,
+        )
+        keys["geology_contacts"] = StageCheckpoints.key(
+            "geology_contacts", keys["stratigraphic_order"], self.samplers[Datatype.GEOLOGY]
+        )
+        keys["samples"] = StageCheckpoints.key("samples", map_key, self.samplers)
+        keys["thicknesses"] = StageCheckpoints.key(
+            "thicknesses", keys["geology_contacts"], keys["samples"], self.thickness_calculator
+        )
+        keys["fault_orientations"] = StageCheckpoints.key(
+            "fault_orientations", map_key, self.fault_orientation
+        )
+        keys["fault_summary"] = StageCheckpoints.key(
+            "fault_summary",
+            keys["geology_contacts"],
+            keys["samples"],
+            self.throw_calculator,
+            self.deformation_history.minimum_fault_length_to_export,
+        )
+        return keys
+
+    def run_stage(self, stage: str, key: str, outputs: list, function, resume: bool = False):
+        """
+        Run a processing stage or, when resuming, restore its outputs from a matching checkpoint
+
+        Args:
+            stage (str):
+                The name of the stage
+            key (str):
+                The content hash of the stage inputs and parameters
+            outputs (list):
+                The attributes of the project (as dotted paths) that the stage sets
+            function (callable):
+                The function that runs the stage
+            resume (bool, optional):
+                Whether to use and save checkpoints. Defaults to False.
+        """
+        if resume:
+            values = self.checkpoints.load(stage, key)
+            if values is not None:
+                for output in outputs:
+                    parent, _, name = output.rpartition(".")
+                    setattr(operator.attrgetter(parent)(self) if parent else self, name, values[output])
+                if self.verbose_level != VerboseLevel.NONE:
+                    print(f"Resumed {stage} from checkpoint")
+                return
+        function()
+        if resume:
+            self.checkpoints.save(
+                stage, key, {output: operator.attrgetter(output)(self) for output in outputs}
+            )
+
+    def run_all(self, user_defined_stratigraphic_column=None, take_best=False, resume=False):
         """
         Runs the full map2loop process
 
         Args:
             user_defined_stratigraphic_column (None or list, optional):
                 A user fed list that overrides the stratigraphic column sorter. Defaults to None.
+            take_best (bool, optional):
+                Whether to use the best of all sorters. Defaults to False.
+            resume (bool, optional):
+                Whether to checkpoint the outputs of each stage in tmp_path/checkpoints and skip
+                the stages whose inputs and parameters match their checkpoint. Defaults to False.
         """
+        keys = self.stage_keys(user_defined_stratigraphic_column, take_best) if resume else {}
+
         # Calculate contacts before stratigraphic column
-        self.map_data.extract_all_contacts()
-        print('I am here 100')
+        self.run_stage(
+            "contacts",
+            keys.get("contacts"),
+            ["map_data.contacts"],
+            self.map_data.extract_all_contacts,
+            resume,
+        )
+
         # Calculate the stratigraphic column
-        if issubclass(type(user_defined_stratigraphic_column), list):
-            self.stratigraphic_column.column = user_defined_stratigraphic_column
-        else:
-            if user_defined_stratigraphic_column is not None:
-                print(
-                    "user_defined_stratigraphic_column is not of type list. Attempting to calculate column"
-                )
-            self.calculate_stratigraphic_order(take_best)
+        def calculate_column():
+            if issubclass(type(user_defined_stratigraphic_column), list):
+                self.stratigraphic_column.column = user_defined_stratigraphic_column
+            else:
+                if user_defined_stratigraphic_column is not None:
+                    print(
+                        "user_defined_stratigraphic_column is not of type list. Attempting to calculate column"
+                    )
+                self.calculate_stratigraphic_order(take_best)
+
+        self.run_stage(
+            "stratigraphic_order",
+            keys.get("stratigraphic_order"),
+            [
+                "stratigraphic_column.column",
+                "map2model.sorted_units",
+                "map2model.fault_fault_relationships",
+                "map2model.unit_fault_relationships",
+                "map2model.unit_unit_relationships",
+            ],
+            calculate_column,
+            resume,
+        )
         self.sort_stratigraphic_column()
-        print('I am here 101')
+
         # Calculate basal contacts based on stratigraphic column
-        self.extract_geology_contacts()
-        self.sample_map_data()
-        self.calculate_unit_thicknesses()
-        self.calculate_fault_orientations()
-        self.summarise_fault_data()
+        self.run_stage(
+            "geology_contacts",
+            keys.get("geology_contacts"),
+            ["map_data.basal_contacts", "map_data.sampled_contacts"],
+            self.extract_geology_contacts,
+            resume,
+        )
+        self.run_stage(
+            "samples",
+            keys.get("samples"),
+            ["geology_samples", "structure_samples", "fault_samples", "fold_samples"],
+            self.sample_map_data,
+            resume,
+        )
+        self.run_stage(
+            "thicknesses",
+            keys.get("thicknesses"),
+            ["stratigraphic_column.stratigraphicUnits"],
+            self.calculate_unit_thicknesses,
+            resume,
+        )
+        self.run_stage(
+            "fault_orientations",
+            keys.get("fault_orientations"),
+            ["fault_orientations"],
+            self.calculate_fault_orientations,
+            resume,
+        )
+        self.run_stage(
+            "fault_summary",
+            keys.get("fault_summary"),
+            ["fault_samples", "deformation_history.faults"],
+            self.summarise_fault_data,
+            resume,
+        )
         self.apply_colour_to_units()
         self.save_into_projectfile()
 
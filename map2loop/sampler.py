@@ -35,6 +35,15 @@ class Sampler(ABC):
         """
         return self.sampler_label
 
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the parameters of the sampler
+        """
+        return dict(vars(self))
+
     @beartype.beartype
     @abstractmethod
     def sample(
@@ -130,51 +139,43 @@ class SamplerSpacing(Sampler):
             pandas.DataFrame: the sampled data points
         """
         schema = {"ID": str, "X": float, "Y": float, "featureId": str}
+        geometries = spatial_data.geometry.values
+        type_ids = shapely.get_type_id(geometries)
+
+        # Polygons are sampled along their whole boundary, MultiPolygons along each boundary ring
+        # and MultiLineStrings along each part. Other geometry types are not sampled
+        is_polygon = (type_ids == 3) | (type_ids == 6)
+        geometries = numpy.where(is_polygon, shapely.boundary(geometries), geometries)
+        is_single = (type_ids == 1) | (type_ids == 3)
+        is_multi = (type_ids == 5) | (type_ids == 6)
+        parts, multi_rows = shapely.get_parts(geometries[is_multi], return_index=True)
+        single_rows = numpy.flatnonzero(is_single)
+        multi_rows = numpy.flatnonzero(is_multi)[multi_rows]
+
+        # order the targets by row and then by part, numbering the parts of each row from 0
+        rows = numpy.concatenate([single_rows, multi_rows])
+        order = numpy.argsort(rows, kind="stable")
+        rows = rows[order]
+        targets = numpy.concatenate([geometries[single_rows], parts])[order]
+        row_starts = numpy.searchsorted(rows, rows)
+        feature_ids = numpy.arange(len(rows)) - row_starts
+
+        # every sample distance along every target as one ragged array (excluding the end of each target)
+        lengths = shapely.length(targets)
+        counts = numpy.maximum(numpy.ceil(lengths / self.spacing).astype(int) - 1, 0)
+        target_index = numpy.repeat(numpy.arange(len(targets)), counts)
+        offsets = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        distances = (numpy.arange(len(target_index)) - offsets) * self.spacing
+        points = shapely.line_interpolate_point(targets[target_index], distances)
+
         df = pandas.DataFrame(columns=schema.keys()).astype(schema)
-        for _, row in spatial_data.iterrows():
-            if type(row.geometry) is shapely.geometry.multipolygon.MultiPolygon:
-                targets = row.geometry.boundary.geoms
-            elif type(row.geometry) is shapely.geometry.polygon.Polygon:
-                targets = [row.geometry.boundary]
-            elif type(row.geometry) is shapely.geometry.multilinestring.MultiLineString:
-                targets = row.geometry.geoms
-            elif type(row.geometry) is shapely.geometry.linestring.LineString:
-                targets = [row.geometry]
+        if len(targets) > 0:
+            df["X"] = shapely.get_x(points)
+            df["Y"] = shapely.get_y(points)
+            df["featureId"] = feature_ids[target_index].astype(str)
+            if "ID" in spatial_data.columns:
+                df["ID"] = spatial_data["ID"].iloc[rows[target_index]].reset_index(drop=True)
             else:
-                targets = []
-
-            # For the main cases Polygon and LineString the list 'targets' has one element
-            for a, target in enumerate(targets):
-                df2 = pandas.DataFrame(columns=schema.keys()).astype(schema)
-                distances = numpy.arange(0, target.length, self.spacing)[:-1]
-                points = [target.interpolate(distance) for distance in distances]
-                df2["X"] = [point.x for point in points]
-                df2["Y"] = [point.y for point in points]
-
-                # # account for holes//rings in polygons
-                df2["featureId"] = str(a)
-                # 1. check if line is "closed"
-                if target.is_ring:
-                    target_polygon = shapely.geometry.Polygon(target)
-                    if target_polygon.exterior.is_ccw:  # if counterclockwise --> hole
-                        for j, target2 in enumerate(targets):
-                            # skip if line or point
-                            if len(target2.coords) >= 2:
-                                continue
-                            # which poly is the hole in? assign featureId of the same poly
-                            t2_polygon = shapely.geometry.Polygon(target2)
-                            if target.within(t2_polygon):  #
-                                df2['featureId'] = str(j)
-
-                if "ID" in spatial_data.columns:
-                    df2["ID"] = row["ID"]
-                else:
-                    df2["ID"] = 0
-
-                if len(df) == 0:
-                    df = df2
-                else:
-                    df = pandas.concat([df, df2])
-
+                df["ID"] = 0
         df.reset_index(drop=True, inplace=True)
         return df
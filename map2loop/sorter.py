@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 import beartype
 import pandas
-import math
+import numpy
+import shapely
+import geopandas
 from .mapdata import MapData
+from .m2l_enums import Datatype
 
 
 class Sorter(ABC):
@@ -28,6 +31,15 @@ class Sorter(ABC):
         """
         return self.sorter_label
 
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the parameters of the sorter
+        """
+        return dict(vars(self))
+
     @beartype.beartype
     @abstractmethod
     def sort(
@@ -359,6 +371,91 @@ class SorterObservationProjections(Sorter):
         """
         self.sorter_label = "SorterObservationProjections"
 
+    @staticmethod
+    def observe_unit_order(
+        geology: geopandas.GeoDataFrame, orientations: geopandas.GeoDataFrame, map_data: MapData
+    ) -> list:
+        """
+        Cast a ray from each orientation along its dip direction and find which of the containing
+        unit and the first other unit the ray hits is younger from the dip and the heights of the
+        DTM at the start and hit points. All the orientations are processed together: the
+        containing units and the units each ray crosses are found with bulk STRtree queries and
+        the heights with one DTM lookup
+
+        Args:
+            geology (geopandas.GeoDataFrame): the geology polygons (without intrusions)
+            orientations (geopandas.GeoDataFrame): the structure points with DIPDIR and DIP
+            map_data (map2loop.MapData): the map data holding the DTM
+
+        Returns:
+            list: the (younger, older) unit name pairs in orientation order
+        """
+        # TODO: question (how far should the projection go)
+        #       1km, 10km ???
+        length = 10000
+        polygons = numpy.asarray(geology.geometry.values)
+        names = geology["UNITNAME"].to_numpy(dtype=object)
+        points = numpy.asarray(orientations.geometry.values)
+
+        # The first unit (in map order) containing each orientation is the starting unit. The
+        # trees hold the orientations and rays so that each polygon is only prepared once
+        containing, point = shapely.STRtree(points).query(polygons, predicate="contains")
+        order = numpy.lexsort((containing, point))
+        point, containing = point[order], containing[order]
+        starts, first = numpy.unique(point, return_index=True)
+        start_unit = containing[first]
+
+        # A ray of the projection length from each orientation along its dip direction
+        dip_direction = numpy.radians(orientations["DIPDIR"].to_numpy(dtype=numpy.float64)[starts])
+        dip = numpy.radians(orientations["DIP"].to_numpy(dtype=numpy.float64)[starts])
+        start_xy = shapely.get_coordinates(points[starts])
+        end_xy = start_xy + length * numpy.column_stack(
+            [numpy.cos(dip_direction), numpy.sin(dip_direction)]
+        )
+        finite = numpy.isfinite(end_xy).all(axis=1)
+        starts, start_unit, dip = starts[finite], start_unit[finite], dip[finite]
+        start_xy, end_xy = start_xy[finite], end_xy[finite]
+        rays = shapely.linestrings(numpy.stack([start_xy, end_xy], axis=1))
+
+        # Rays that cross more than one unit hit the nearest unit (to the start) that does not
+        # contain the orientation
+        unit, ray = shapely.STRtree(rays).query(polygons, predicate="intersects")
+        crossing = numpy.bincount(ray, minlength=len(rays))[ray] > 1
+        ray, unit = ray[crossing], unit[crossing]
+        candidate = ~numpy.isin(
+            starts[ray] * len(polygons) + unit, point * len(polygons) + containing
+        )
+        ray, unit = ray[candidate], unit[candidate]
+        distance = shapely.distance(polygons[unit], shapely.points(start_xy[ray]))
+        order = numpy.lexsort((unit, distance, ray))
+        ray, unit = ray[order], unit[order]
+        ray, first = numpy.unique(ray, return_index=True)
+        hit_unit = unit[first]
+
+        # The first point where the ray meets the boundary of the unit hit
+        hits = shapely.intersection(rays[ray], shapely.boundary(polygons)[hit_unit])
+        single = numpy.isin(shapely.get_type_id(hits), [0, 4]) & ~shapely.is_empty(hits)
+        ray, hit_unit = ray[single], hit_unit[single]
+        hit_xy = shapely.get_coordinates(shapely.get_geometry(hits[single], 0))
+
+        # Compare the height of the hit point to the height projected down dip from the start
+        heights = map_data.get_values_from_raster(
+            Datatype.DTM,
+            numpy.concatenate([hit_xy[:, 0], start_xy[ray, 0]]),
+            numpy.concatenate([hit_xy[:, 1], start_xy[ray, 1]]),
+            interpolation="nearest",
+        )
+        if heights is None:
+            heights = numpy.full(2 * len(ray), numpy.nan)
+        hit_height, start_height = numpy.split(heights, 2)
+        horizontal_dist = numpy.abs(end_xy[ray, 1] - start_xy[ray, 1])
+        projected_height = start_height + horizontal_dist * numpy.cos(dip[ray])
+        below = hit_height < projected_height
+
+        younger = numpy.where(below, names[start_unit[ray]], names[hit_unit])
+        older = numpy.where(below, names[hit_unit], names[start_unit[ray]])
+        return list(zip(younger.tolist(), older.tolist()))
+
     def sort(
         self,
         units: pandas.DataFrame,
@@ -383,8 +480,6 @@ class SorterObservationProjections(Sorter):
         try:
             import networkx as nx
             import networkx.algorithms.approximation as nx_app
-            from shapely.geometry import LineString, Point
-            from map2loop.m2l_enums import Datatype
         except Exception:
             print("Cannot import networkx module, defaulting to SorterUseHint")
             return stratigraphic_order_hint
@@ -394,77 +489,7 @@ class SorterObservationProjections(Sorter):
         geol = geol[~geol["SILL"]]
         orientations = map_data.get_map_data(Datatype.STRUCTURE).copy()
 
-        verbose = False
-
-        # Create a map of maps to store younger/older observations
-        ordered_unit_observations = []
-        for _, row in orientations.iterrows():
-            # get containing unit
-            containing_unit = geol[geol.contains(row.geometry)]
-            if len(containing_unit) > 1:
-                if verbose:
-                    print(f"Orientation {row.ID} is within multiple units")
-                    print(f"Check geology map around coordinates {row.geometry}")
-            if len(containing_unit) < 1:
-                if verbose:
-                    print(f"Orientation {row.ID} is not in a unit")
-                    print(f"Check geology map around coordinates {row.geometry}")
-            else:
-                starting_unit_name = containing_unit.iloc[0]['UNITNAME']
-
-                # Get units that a projected line passes through
-                # TODO: question (how far should the projection go)
-                #       1km, 10km ???
-                length = 10000
-                dipDirRadians = row.DIPDIR * math.pi / 180.0
-                dipRadians = row.DIP * math.pi / 180.0
-                start = row.geometry
-                end = Point(
-                    start.x + math.cos(dipDirRadians) * length,
-                    start.y + math.sin(dipDirRadians) * length,
-                )
-                line = LineString([start, end])
-
-                inter = geol[line.intersects(geol.geometry)]
-                if len(inter) > 1:
-                    intersect = line.intersection(inter.geometry.boundary)
-
-                    # Remove containing unit
-                    intersect.drop(containing_unit.index, inplace=True)
-
-                    # sort by distance from start point
-                    sub = geol.iloc[list(intersect.index)].copy()
-                    sub["distance"] = geol.distance(start)
-                    sub.sort_values(by="distance", inplace=True)
-
-                    # Get first unit it hits and the point of intersection
-                    closest_unit_name = sub.iloc[0].UNITNAME
-
-                    # Get intersection point
-                    if intersect[sub.index[0]].geom_type == "MultiPoint":
-                        intersect_point = intersect[sub.index[0]].geoms[0]
-                    elif intersect[sub.index[0]].geom_type == "Point":
-                        intersect_point = intersect[sub.index[0]]
-                    else:
-                        continue
-
-                    # Get heights for intersection point and start of ray
-                    height = map_data.get_value_from_raster(
-                        Datatype.DTM, intersect_point.x, intersect_point.y
-                    )
-                    intersect_point = Point(intersect_point.x, intersect_point.y, height)
-                    height = map_data.get_value_from_raster(Datatype.DTM, start.x, start.y)
-                    start = Point(start.x, start.y, height)
-
-                    # Check vertical difference between points and compare to projected dip angle
-                    horizontal_dist = (intersect_point.x - intersect_point.x, end.y - start.y)
-                    horizontal_dist = math.sqrt(horizontal_dist[0] ** 2 + horizontal_dist[1] ** 2)
-                    projected_height = start.z + horizontal_dist * math.cos(dipRadians)
-
-                    if intersect_point.z < projected_height:
-                        ordered_unit_observations += [(starting_unit_name, closest_unit_name)]
-                    else:
-                        ordered_unit_observations += [(closest_unit_name, starting_unit_name)]
+        ordered_unit_observations = self.observe_unit_order(geol, orientations, map_data)
 
         # Create a matrix of older versus younger frequency from observations
         unit_names = geol.UNITNAME.unique()
@@ -1,9 +1,7 @@
 # internal imports
 import scipy.interpolate
 from .utils import (
-    create_points,
     rebuild_sampled_basal_contacts,
-    calculate_endpoints,
     multiline_to_line,
     find_segment_strike_from_pt,
 )
@@ -21,6 +19,9 @@ import geopandas
 from statistics import mean
 import shapely
 import math
+import os
+from typing import Any, Optional
+import concurrent.futures
 
 
 class ThicknessCalculator(ABC):
@@ -46,6 +47,15 @@ class ThicknessCalculator(ABC):
         """
         return self.thickness_calculator_label
 
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the parameters of the thickness calculator
+        """
+        return dict(vars(self))
+
     @beartype.beartype
     @abstractmethod
     def compute(
@@ -183,19 +193,136 @@ class InterpolatedStructure(ThicknessCalculator):
     Attributes:
         thickness_calculator_label (str): A string that stores the label of the thickness calculator.
         For this class, it is "InterpolatedStructure".
+        interpolator (Any): The interpolation backend used to interpolate the dip of the structural data.
+        cell_size (float): The spacing of the dip interpolation grid, None for square cells of 1% of the
+        longest side of the bounding box.
+        tile_size (int): The number of grid points interpolated at once.
+        lines (list): The arrays of shortest lines of each unit from the latest compute().
 
     Methods:
         compute(units: pandas.DataFrame, stratigraphic_order: list, basal_contacts: pandas.DataFrame, map_data: MapData)
         -> pandas.DataFrame: Calculates a thickness map for the overall map area.
     """
 
-    def __init__(self):
+    def __init__(
+        self, interpolator: Any = "rbf", cell_size: Optional[float] = None, tile_size: int = 1000000
+    ):
         """
         Initialiser for interpolated structure version of the thickness calculator
+
+        Args:
+            interpolator (Any, optional): the interpolation backend used for the dip, either a name in
+            interpolators.INTERPOLATION_BACKENDS ("rbf", "linear", "rbf_neighbors", "idw", "nearest") or an
+            InterpolationBackend instance. Defaults to "rbf".
+            cell_size (float, optional): the spacing of the dip interpolation grid. Defaults to None
+            (generate_grid's default grid).
+            tile_size (int, optional): the number of grid points interpolated at once. Defaults to 1000000.
         """
         self.thickness_calculator_label = "InterpolatedStructure"
+        self.interpolator = interpolator
+        self.cell_size = cell_size
+        self.tile_size = tile_size
         self.lines = []
 
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the interpolator and grid cell size, without the tile size or the shortest lines of the last run
+        """
+        return {
+            "thickness_calculator_label": self.thickness_calculator_label,
+            "interpolator": self.interpolator,
+            "cell_size": self.cell_size,
+        }
+
+    def _setup_lines(self, basal_points: numpy.ndarray, top_contact, map_data: MapData) -> dict:
+        """
+        Calculate the shortest line from each basal contact point to the top contact
+
+        Args:
+            basal_points (numpy.ndarray): the sampled basal contact points of the unit
+            top_contact (shapely.Geometry): the (buffered) top contact of the unit
+            map_data (map2loop.MapData): a catchall so that access to all map data is available
+
+        Returns:
+            dict: the shortest lines, their lengths and search radii, and the running thickness totals
+        """
+        # find the shortest lines between all the basal contact points and the top contact
+        short_lines = shapely.shortest_line(basal_points, top_contact)
+        self.lines.append(short_lines)
+        # extract the end points of the shortest lines and get their elevation Z in one lookup
+        p1 = shapely.get_coordinates(shapely.get_point(short_lines, 0))
+        p2 = shapely.get_coordinates(shapely.get_point(short_lines, -1))
+        z = map_data.get_values_from_raster(
+            Datatype.DTM, numpy.concatenate([p1[:, 0], p2[:, 0]]), numpy.concatenate([p1[:, 1], p2[:, 1]])
+        )
+        p1 = numpy.column_stack([p1, z[: len(p1)]])
+        p2 = numpy.column_stack([p2, z[len(p1) :]])
+        # calculate the length of the shortest lines
+        line_lengths = numpy.linalg.norm(p2 - p1, axis=1)
+        radius = line_lengths * 0.25
+        half_lengths = numpy.hypot(*(p2[:, :2] - p1[:, :2]).T) / 2
+        return {
+            "lines": short_lines,
+            "lengths": line_lengths,
+            "radius": radius,
+            "midpoints": (p1[:, :2] + p2[:, :2]) / 2,
+            "search_radius": numpy.nan_to_num(half_lengths + radius, nan=0.0) * (1 + 1e-9) + 1e-9,
+            "total": numpy.zeros(len(short_lines)),
+            "valid": numpy.zeros(len(short_lines), dtype=int),
+        }
+
+    def _accumulate_thicknesses(self, lines: dict, interp_points: numpy.ndarray, dip: numpy.ndarray):
+        """
+        Add the thicknesses from a set of interpolated points to the running totals of each shortest line
+
+        Args:
+            lines (dict): the shortest lines from _setup_lines
+            interp_points (numpy.ndarray): the interpolated orientation points within the unit
+            dip (numpy.ndarray): the interpolated dip at each of the interp_points
+        """
+        if len(interp_points) == 0 or len(lines["lines"]) == 0:
+            return
+        # find the interpolated points that are within 25% of the length of each shortest line,
+        # using a KD-tree radius query around the line midpoints to select the candidates
+        tree = scipy.spatial.cKDTree(shapely.get_coordinates(interp_points))
+        candidates = tree.query_ball_point(lines["midpoints"], lines["search_radius"])
+        line_idx = numpy.repeat(numpy.arange(len(lines["lines"])), [len(c) for c in candidates])
+        point_idx = numpy.array([p for c in candidates for p in sorted(c)], dtype=int)
+        within = shapely.dwithin(
+            lines["lines"][line_idx], interp_points[point_idx], lines["radius"][line_idx]
+        )
+        line_idx = line_idx[within]
+        point_idx = point_idx[within]
+
+        # calculate the true thickness t = L . sin dip
+        thickness = lines["lengths"][line_idx] * numpy.sin(numpy.deg2rad(dip[point_idx]))
+        # Sum the thickness along each shortest line, grouping the lines with the same number
+        # of points so the nan-sum of each group is a single row-wise reduction
+        starts = numpy.searchsorted(line_idx, numpy.arange(len(lines["lines"]) + 1))
+        counts = numpy.diff(starts)
+        for count in numpy.unique(counts[counts > 0]):
+            lines_with_count = numpy.flatnonzero(counts == count)
+            line_thickness = thickness[starts[lines_with_count][:, None] + numpy.arange(count)]
+            is_nan = numpy.isnan(line_thickness)
+            lines["valid"][lines_with_count] += numpy.sum(~is_nan, axis=1)
+            lines["total"][lines_with_count] += numpy.sum(numpy.where(is_nan, 0, line_thickness), axis=1)
+
+    def _line_thicknesses(self, lines: dict) -> list:
+        """
+        Get the average thickness along each shortest line
+
+        Args:
+            lines (dict): the shortest lines from _setup_lines, with their thickness totals
+
+        Returns:
+            list: the thickness along each shortest line that has at least one valid dip
+        """
+        valid = lines["valid"] > 0
+        return (lines["total"][valid] / lines["valid"][valid]).tolist()
+
     @beartype.beartype
     def compute(
         self,
@@ -230,6 +357,8 @@ class InterpolatedStructure(ThicknessCalculator):
             "ThicknessStdDev" is the standard deviation of the thickness of the unit
         """
 
+        # only keep the shortest lines of this run
+        self.lines = []
         basal_contacts = basal_contacts[basal_contacts["type"] == "BASAL"].copy()
 
         thicknesses = units.copy()
@@ -254,43 +383,11 @@ class InterpolatedStructure(ThicknessCalculator):
         # get the elevation Z of the contacts
         contacts = map_data.get_value_from_raster_df(Datatype.DTM, contacts)
         # update the geometry of the contact points to include the Z value
-        contacts["geometry"] = contacts.apply(
-            lambda row: shapely.Point(row.geometry.x, row.geometry.y, row["Z"]), axis=1
-        )
+        contacts["geometry"] = geopandas.points_from_xy(contacts["X"], contacts["Y"], contacts["Z"])
         # spatial join the contact points with the basal contacts to get the unit for each contact point
         contacts = contacts.sjoin(basal_contacts, how="inner", predicate="intersects")
         contacts = contacts[["X", "Y", "Z", "geometry", "basal_unit"]].copy()
         bounding_box = map_data.get_bounding_box()
-        # Interpolate the dip of the contacts
-        interpolator = DipDipDirectionInterpolator(data_type="dip")
-        dip = interpolator(bounding_box, structure_data, interpolator=scipy.interpolate.Rbf)
-        # create a GeoDataFrame of the interpolated orientations
-        interpolated_orientations = geopandas.GeoDataFrame()
-        # add the dip and dip direction to the GeoDataFrame
-        interpolated_orientations["dip"] = dip
-        # interpolated_orientations["dip_direction"] = dip_direction
-        # get the x and y coordinates of the interpolated points
-        interpolated_orientations["X"] = interpolator.xi
-        interpolated_orientations["Y"] = interpolator.yi
-        xy = numpy.array([interpolator.xi, interpolator.yi]).T
-        # create Point objects from the x and y coordinates
-        interpolated_orientations.set_geometry(create_points(xy), inplace=True)
-        # set the crs of the interpolated orientations to the crs of the units
-        interpolated_orientations = interpolated_orientations.set_crs(crs=basal_contacts.crs)
-        # get the elevation Z of the interpolated points
-        interpolated = map_data.get_value_from_raster_df(Datatype.DTM, interpolated_orientations)
-        # update the geometry of the interpolated points to include the Z value
-        interpolated["geometry"] = interpolated.apply(
-            lambda row: shapely.Point(row.geometry.x, row.geometry.y, row["Z"]), axis=1
-        )
-        # for each interpolated point, assign name of unit using spatial join
-        units = map_data.get_map_data(Datatype.GEOLOGY)
-        interpolated_orientations = interpolated_orientations.sjoin(
-            units, how="inner", predicate="within"
-        )
-        interpolated_orientations = interpolated_orientations[
-            ["geometry", "dip", "UNITNAME"]
-        ].copy()
 
         if len(stratigraphic_order) < 3:
             print(
@@ -298,75 +395,60 @@ class InterpolatedStructure(ThicknessCalculator):
             )
             return thicknesses
 
+        # find the shortest lines from the basal to the top contact of each unit
+        unit_lines = {}
         for i in range(0, len(stratigraphic_order) - 1):
             if (
                 stratigraphic_order[i] in basal_unit_list
                 and stratigraphic_order[i + 1] in basal_unit_list
             ):
-                basal_contact = contacts.loc[
-                    contacts["basal_unit"] == stratigraphic_order[i]
-                ].copy()
+                basal_contact = contacts.loc[contacts["basal_unit"] == stratigraphic_order[i]]
                 top_contact = basal_contacts.loc[
                     basal_contacts["basal_unit"] == stratigraphic_order[i + 1]
-                ].copy()
-                top_contact_geometry = [
-                    shapely.geometry.shape(geom.__geo_interface__) for geom in top_contact.geometry
                 ]
-                if basal_contact is not None and top_contact is not None:
-                    interp_points = interpolated_orientations.loc[
-                        interpolated_orientations["UNITNAME"] == stratigraphic_order[i], "geometry"
-                    ].copy()
-                    dip = interpolated_orientations.loc[
-                        interpolated_orientations["UNITNAME"] == stratigraphic_order[i], "dip"
-                    ].to_numpy()
-                    _thickness = []
-                    for _, row in basal_contact.iterrows():
-                        # find the shortest line between the basal contact points and top contact points
-                        short_line = shapely.shortest_line(row.geometry, top_contact_geometry)
-                        self.lines.append(short_line)
-                        # extract the end points of the shortest line
-                        p1 = numpy.zeros(3)
-                        p1[0] = numpy.asarray(short_line[0].coords[0][0])
-                        p1[1] = numpy.asarray(short_line[0].coords[0][1])
-                        # get the elevation Z of the end point p1
-                        p1[2] = map_data.get_value_from_raster(Datatype.DTM, p1[0], p1[1])
-                        # create array to store xyz coordinates of the end point p2
-                        p2 = numpy.zeros(3)
-                        p2[0] = numpy.asarray(short_line[0].coords[-1][0])
-                        p2[1] = numpy.asarray(short_line[0].coords[-1][1])
-                        # get the elevation Z of the end point p2
-                        p2[2] = map_data.get_value_from_raster(Datatype.DTM, p2[0], p2[1])
-                        # get the elevation Z of the end point p2
-                        p2[2] = map_data.get_value_from_raster(Datatype.DTM, p2[0], p2[1])
-                        # calculate the length of the shortest line
-                        line_length = scipy.spatial.distance.euclidean(p1, p2)
-                        # find the indices of the points that are within 5% of the length of the shortest line
-                        indices = shapely.dwithin(short_line, interp_points, line_length * 0.25)
-                        # get the dip of the points that are within
-                        # 10% of the length of the shortest line
-                        _dip = numpy.deg2rad(dip[indices])
-                        # get the end points of the shortest line
-                        # calculate the true thickness t = L . sin dip
-                        thickness = line_length * numpy.sin(_dip)
-                        # Average thickness along the shortest line
-                        if all(numpy.isnan(thickness)):
-                            pass
-                        else:
-                            _thickness.append(numpy.nanmean(thickness))
-
-                    # calculate the median thickness and standard deviation for the unit
-                    _thickness = numpy.asarray(_thickness, dtype=numpy.float64)
-
-                    median = numpy.nanmedian(_thickness)
-                    mean = numpy.nanmean(_thickness)
-                    std_dev = numpy.nanstd(_thickness, dtype=numpy.float64)
-
-                    idx = thicknesses.index[
-                        thicknesses["name"] == stratigraphic_order[i + 1]
-                    ].tolist()[0]
-                    thicknesses.loc[idx, "ThicknessMean"] = mean
-                    thicknesses.loc[idx, "ThicknessMedian"] = median
-                    thicknesses.loc[idx, "ThicknessStdDev"] = std_dev
+                unit_lines[i] = self._setup_lines(
+                    basal_contact.geometry.to_numpy(), top_contact.geometry.iloc[0], map_data
+                )
+
+        # Interpolate the dip of the contacts, evaluating the grid one tile at a time
+        interpolator = DipDipDirectionInterpolator(
+            data_type="dip", cell_size=self.cell_size, tile_size=self.tile_size
+        )
+        interpolator.fit(bounding_box, structure_data, interpolator=self.interpolator)
+        geology = map_data.get_map_data(Datatype.GEOLOGY)
+        for xi, yi, dip in interpolator.tiles():
+            # create a GeoDataFrame of the interpolated orientations
+            interpolated_orientations = geopandas.GeoDataFrame(
+                {"dip": dip}, geometry=geopandas.points_from_xy(xi, yi), crs=basal_contacts.crs
+            )
+            # for each interpolated point, assign name of unit using spatial join
+            interpolated_orientations = interpolated_orientations.sjoin(
+                geology, how="inner", predicate="within"
+            )
+            interpolated_orientations = interpolated_orientations[["geometry", "dip", "UNITNAME"]]
+            for i, lines in unit_lines.items():
+                in_unit = (interpolated_orientations["UNITNAME"] == stratigraphic_order[i]).to_numpy()
+                self._accumulate_thicknesses(
+                    lines,
+                    interpolated_orientations.geometry.to_numpy()[in_unit],
+                    interpolated_orientations["dip"].to_numpy()[in_unit],
+                )
+
+        for i in range(0, len(stratigraphic_order) - 1):
+            if i in unit_lines:
+                # calculate the median thickness and standard deviation for the unit
+                _thickness = numpy.asarray(self._line_thicknesses(unit_lines[i]), dtype=numpy.float64)
+
+                median = numpy.nanmedian(_thickness)
+                mean = numpy.nanmean(_thickness)
+                std_dev = numpy.nanstd(_thickness, dtype=numpy.float64)
+
+                idx = thicknesses.index[
+                    thicknesses["name"] == stratigraphic_order[i + 1]
+                ].tolist()[0]
+                thicknesses.loc[idx, "ThicknessMean"] = mean
+                thicknesses.loc[idx, "ThicknessMedian"] = median
+                thicknesses.loc[idx, "ThicknessStdDev"] = std_dev
 
             else:
                 print(
@@ -383,6 +465,8 @@ class StructuralPoint(ThicknessCalculator):
     Attributes:
         thickness_calculator_label (str): A string that stores the label of the thickness calculator.
         For this class, it is "StrucuturalPoint".
+        n_jobs (int): The number of worker processes the structural measurements are split across,
+        or -1 to use all available cores.
 
     Methods:
         compute(units: pandas.DataFrame, stratigraphic_order: list, basal_contacts: pandas.DataFrame, map_data: MapData)
@@ -390,10 +474,179 @@ class StructuralPoint(ThicknessCalculator):
 
     '''
 
-    def __init__(self):
+    def __init__(self, n_jobs: int = 1):
+        """
+        Initialiser for StructuralPoint
+
+        Args:
+            n_jobs (int, optional): the number of worker processes the measurements are split across.
+            -1 uses all available cores. Defaults to 1 (no worker processes).
+
+        Raises:
+            ValueError: if n_jobs is less than 1 and not -1
+        """
+        if n_jobs < 1 and n_jobs != -1:
+            raise ValueError(f"n_jobs must be a positive number of workers or -1 for all cores, not {n_jobs}")
         self.sorter_label = "StructuralPoint"
         self.line_length = 10000
         self.strike_allowance = 30
+        self.n_jobs = n_jobs
+
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the line length and strike allowance, without n_jobs as the output does not depend on it
+        """
+        return {
+            "sorter_label": self.sorter_label,
+            "line_length": self.line_length,
+            "strike_allowance": self.strike_allowance,
+        }
+
+    def _calculate_transects(
+        self, x: numpy.ndarray, y: numpy.ndarray, strikes: list, units: numpy.ndarray, bounds: dict
+    ) -> numpy.ndarray:
+        """
+        Calculate the lines perpendicular to the strike of many measurements at once, each clipped by a bounding box.
+        This is the batched equivalent of utils.calculate_endpoints
+
+        Args:
+            x (numpy.ndarray): the eastings of the measurements
+            y (numpy.ndarray): the northings of the measurements
+            strikes (list): the strike of each measurement in degrees
+            units (numpy.ndarray): the unit name of each measurement
+            bounds (dict): the (minx, miny, maxx, maxy) bounding box of each unit
+
+        Returns:
+            numpy.ndarray: array of shapely LineStrings (empty where the line misses the bounding box)
+        """
+        azimuths = [math.radians(90 - strike) for strike in strikes]
+        right = [(azimuth + math.pi / 2) % (2 * math.pi) for azimuth in azimuths]
+        left = [(azimuth - math.pi / 2) % (2 * math.pi) for azimuth in azimuths]
+        coords = numpy.empty((len(x), 2, 2))
+        coords[:, 0, 0] = x + numpy.array([self.line_length * math.cos(a) for a in left])
+        coords[:, 0, 1] = y + numpy.array([self.line_length * math.sin(a) for a in left])
+        coords[:, 1, 0] = x + numpy.array([self.line_length * math.cos(a) for a in right])
+        coords[:, 1, 1] = y + numpy.array([self.line_length * math.sin(a) for a in right])
+        lines = shapely.linestrings(coords)
+        for unit in numpy.unique(units):
+            in_unit = units == unit
+            lines[in_unit] = shapely.clip_by_rect(lines[in_unit], *bounds[unit])
+        return lines
+
+    def _compute_thicknesses(self, shared: dict, start: int, stop: int) -> tuple:
+        """
+        Calculate the thicknesses for a contiguous chunk of the structural measurements
+
+        Args:
+            shared (dict): the read-only inputs built by compute (measurements, unit bounds, neighbours,
+            sampled basal contacts and map dimensions)
+            start (int): the index of the first measurement to process
+            stop (int): the index after the last measurement to process
+
+        Returns:
+            tuple: the list of thicknesses and the list of the units they were calculated in
+        """
+        measurements = shared['measurements'].iloc[start:stop]
+        unit_bounds = shared['unit_bounds']
+        neighbors = shared['neighbors']
+        sampled_basal_contacts = shared['sampled_basal_contacts']
+        map_dx = shared['map_dx']
+        map_dy = shared['map_dy']
+
+        # create empty lists to store thicknesses and lithologies
+        thicknesses = []
+        lis = []
+        strikes = [(dipdir - 90) % 360 for dipdir in measurements['DIPDIR']]
+
+        # draw all the orthogonal lines to the strike (default value 10Km), clipped by the bounding box of the lithology
+        transects = self._calculate_transects(
+            measurements['X'].to_numpy(),
+            measurements['Y'].to_numpy(),
+            strikes,
+            measurements['unit_name'].to_numpy(),
+            unit_bounds,
+        )
+
+        # find all intersections of the lines with the sampled basal contacts in one query
+        contact_geometries = sampled_basal_contacts.geometry.values
+        transect_idx, contact_idx = shapely.STRtree(contact_geometries).query(
+            transects, predicate='intersects'
+        )
+        order = numpy.lexsort((contact_idx, transect_idx))
+        transect_idx, contact_idx = transect_idx[order], contact_idx[order]
+        intersections = shapely.intersection(transects[transect_idx], contact_geometries[contact_idx])
+        is_point = shapely.get_type_id(intersections) == 0
+        transect_idx = transect_idx[is_point]
+        contact_idx = contact_idx[is_point]
+        intersections = intersections[is_point]
+        starts = numpy.searchsorted(transect_idx, numpy.arange(len(measurements) + 1))
+
+        sampled_basal_units = sampled_basal_contacts['basal_unit'].to_numpy()
+        segments = {}
+
+        # check the intersections of each sampled structural measurement
+        for s in range(0, len(measurements)):
+            litho_in = measurements['unit_name'].iloc[s]
+            strike = strikes[s]
+            neighbor_list = neighbors[litho_in]
+
+            # clip intersections by the neighbouring geology polygons
+            final_intersections = [
+                (intersections[k], sampled_basal_units[contact_idx[k]])
+                for k in range(starts[s], starts[s + 1])
+                if sampled_basal_units[contact_idx[k]] in neighbor_list
+            ]
+
+            # check to see if there's less than 2 intersections
+            if len(final_intersections) < 2:
+                continue
+
+            # check to see if the intersections cross two lithologies"
+            if len({unit for _, unit in final_intersections}) == 1:
+                continue
+
+            # declare the two intersection points
+            (int_pt1, unit1), (int_pt2, unit2) = final_intersections[0], final_intersections[1]
+
+            # if the intersections are too far apart, skip
+            if (
+                math.sqrt(((int_pt1.x - int_pt2.x) ** 2) + ((int_pt1.y - int_pt2.y) ** 2))
+                > map_dx / 2
+                or math.sqrt(((int_pt1.x - int_pt2.x) ** 2) + ((int_pt1.y - int_pt2.y) ** 2))
+                > map_dy / 2
+            ):
+                continue
+
+            # find the segments that the intersections belong to, simplified to LineString
+            for unit in (unit1, unit2):
+                if unit not in segments:
+                    seg = sampled_basal_contacts[sampled_basal_contacts['basal_unit'] == unit].geometry.iloc[0]
+                    if seg.geom_type == 'MultiLineString':
+                        seg = multiline_to_line(seg)
+                    segments[unit] = seg
+
+            # find the strike of the segments
+            measurement = measurements.iloc[s]
+            strike1 = find_segment_strike_from_pt(segments[unit1], int_pt1, measurement)
+            strike2 = find_segment_strike_from_pt(segments[unit2], int_pt2, measurement)
+
+            # check to see if the strike of the stratigraphic measurement is within the strike allowance of the strike of the geological contact
+            b_s = strike - self.strike_allowance, strike + self.strike_allowance
+            if not (b_s[0] < strike1 < b_s[1] and b_s[0] < strike2 < b_s[1]):
+                continue
+
+            # find the lenght of the segment
+            L = math.sqrt(((int_pt1.x - int_pt2.x) ** 2) + ((int_pt1.y - int_pt2.y) ** 2))
+            # calculate thickness
+            thickness = L * math.sin(math.radians(measurement['DIP']))
+
+            thicknesses.append(thickness)
+            lis.append(litho_in)
+
+        return thicknesses, lis
 
     @beartype.beartype
     def compute(
@@ -470,116 +723,59 @@ class StructuralPoint(ThicknessCalculator):
         map_dx = geology.total_bounds[2] - geology.total_bounds[0]
         map_dy = geology.total_bounds[3] - geology.total_bounds[1]
 
-        # create empty lists to store thicknesses and lithologies
-        thicknesses = []
-        lis = []
-
-        # loop over each sampled structural measurement
-        for s in range(0, len(sampled_structures)):
-
-            # make a shapely point from the measurement
-            measurement = sampled_structures.iloc[s]
-            measurement_pt = shapely.Point(measurement.X, measurement.Y)
-
-            # find unit and strike
-            litho_in = measurement['unit_name']
-            strike = (measurement['DIPDIR'] - 90) % 360
-
-            # find bounding box of the lithology
-            bbox_poly = geology[geology['UNITNAME'] == litho_in][['minx', 'miny', 'maxx', 'maxy']]
-
-            # check if litho_in is in geology
-            # for a special case when the litho_in is not in the geology
-            if len(geology[geology['UNITNAME'] == litho_in]) == 0: 
-                print(f"There are structural measurements in unit - {litho_in} - that are not in the geology shapefile. Skipping this structural measurement")
-                continue
-            else:          
-                # make a subset of the geology polygon & find neighbour units
-                GEO_SUB = geology[geology['UNITNAME'] == litho_in]['geometry'].values[0]
-
-            neighbor_list = list(
-                basal_contacts[GEO_SUB.intersects(basal_contacts.geometry)]['basal_unit']
-            )
-            # draw orthogonal line to the strike (default value 10Km), and clip it by the bounding box of the lithology
-            B = calculate_endpoints(measurement_pt, strike, self.line_length, bbox_poly)
-            b = geopandas.GeoDataFrame({'geometry': [B]}).set_crs(basal_contacts.crs)
-
-            # find all intersections
-            all_intersections = sampled_basal_contacts.overlay(
-                b, how='intersection', keep_geom_type=False
-            )
-            all_intersections = all_intersections[
-                all_intersections['geometry'].geom_type == 'Point'
-            ]
-
-            # clip intersections by the neighbouring geology polygons
-            final_intersections = all_intersections[
-                all_intersections['basal_unit'].isin(neighbor_list)
-            ]
-
-            # sometimes the intersections will return as MultiPoint, so we need to convert them to nearest point
-            if 'MultiPoint' in final_intersections['geometry'].geom_type.values:
-                multi = final_intersections[
-                    final_intersections['geometry'].geom_type == 'MultiPoint'
-                ].index
-                for m in multi:
-                    nearest_ = shapely.ops.nearest_points(
-                        final_intersections.loc[m, :].geometry, measurement_pt
-                    )[0]
-                    final_intersections.at[m, 'geometry'] = nearest_
-                    final_intersections.at[m, 'geometry'] = nearest_
-
-            # check to see if there's less than 2 intersections
-            if len(final_intersections) < 2:
-                continue
-
-            # check to see if the intersections cross two lithologies"
-            if len(final_intersections['basal_unit'].unique()) == 1:
-                continue
-
-            # declare the two intersection points
-            int_pt1 = final_intersections.iloc[0].geometry
-            int_pt2 = final_intersections.iloc[1].geometry
-
-            # if the intersections are too far apart, skip
-            if (
-                math.sqrt(((int_pt1.x - int_pt2.x) ** 2) + ((int_pt1.y - int_pt2.y) ** 2))
-                > map_dx / 2
-                or math.sqrt(((int_pt1.x - int_pt2.x) ** 2) + ((int_pt1.y - int_pt2.y) ** 2))
-                > map_dy / 2
-            ):
-                continue
-
-            # find the segments that the intersections belong to
-            seg1 = sampled_basal_contacts[
-                sampled_basal_contacts['basal_unit'] == final_intersections.iloc[0]['basal_unit']
-            ].geometry.iloc[0]
-            seg2 = sampled_basal_contacts[
-                sampled_basal_contacts['basal_unit'] == final_intersections.iloc[1]['basal_unit']
-            ].geometry.iloc[0]
-
-            # simplify the geometries to LineString
-            if seg1.geom_type == 'MultiLineString':
-                seg1 = multiline_to_line(seg1)
-            if seg2.geom_type == 'MultiLineString':
-                seg2 = multiline_to_line(seg2)
-
-            # find the strike of the segments
-            strike1 = find_segment_strike_from_pt(seg1, int_pt1, measurement)
-            strike2 = find_segment_strike_from_pt(seg2, int_pt2, measurement)
-
-            # check to see if the strike of the stratigraphic measurement is within the strike allowance of the strike of the geological contact
-            b_s = strike - self.strike_allowance, strike + self.strike_allowance
-            if not (b_s[0] < strike1 < b_s[1] and b_s[0] < strike2 < b_s[1]):
-                continue
-
-            # find the lenght of the segment
-            L = math.sqrt(((int_pt1.x - int_pt2.x) ** 2) + ((int_pt1.y - int_pt2.y) ** 2))
-            # calculate thickness
-            thickness = L * math.sin(math.radians(measurement['DIP']))
+        # lookup the first geology polygon and its bounding box for each lithology
+        first_units = geology.drop_duplicates(subset='UNITNAME')
+        unit_geometries = dict(zip(first_units['UNITNAME'], first_units.geometry))
+        unit_bounds = dict(
+            zip(first_units['UNITNAME'], first_units[['minx', 'miny', 'maxx', 'maxy']].to_numpy())
+        )
 
-            thicknesses.append(thickness)
-            lis.append(litho_in)
+        # find the neighbour units of each lithology from the basal contacts that touch it
+        contacts_tree = shapely.STRtree(basal_contacts.geometry.values)
+        unit_idx, contact_idx = contacts_tree.query(
+            first_units.geometry.values, predicate='intersects'
+        )
+        basal_units = basal_contacts['basal_unit'].to_numpy()
+        neighbors = {name: set() for name in unit_geometries}
+        for u, c in zip(unit_idx, contact_idx):
+            neighbors[first_units['UNITNAME'].iloc[u]].add(basal_units[c])
+
+        # skip measurements in units that are not in the geology
+        in_geology = sampled_structures['unit_name'].isin(unit_geometries).to_numpy()
+        for litho_in in sampled_structures['unit_name'][~in_geology]:
+            print(f"There are structural measurements in unit - {litho_in} - that are not in the geology shapefile. Skipping this structural measurement")
+        measurements = sampled_structures[in_geology]
+
+        # the read-only inputs shared by every measurement
+        shared = {
+            'measurements': pandas.DataFrame(measurements.drop(columns='geometry')),
+            'unit_bounds': unit_bounds,
+            'neighbors': neighbors,
+            'sampled_basal_contacts': sampled_basal_contacts,
+            'map_dx': map_dx,
+            'map_dy': map_dy,
+        }
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else self.n_jobs
+        if n_jobs == 1 or len(measurements) < 2:
+            thicknesses, lis = self._compute_thicknesses(shared, 0, len(measurements))
+        else:
+            # partition the measurements into a fixed number of contiguous chunks and send the
+            # shared inputs once per worker, so results do not depend on the number of workers
+            bounds = numpy.linspace(0, len(measurements), min(len(measurements), 4 * n_jobs) + 1)
+            bounds = bounds.astype(int)
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=n_jobs, initializer=_set_shared_inputs, initargs=(shared,)
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _compute_thicknesses_chunk,
+                        [self] * (len(bounds) - 1),
+                        bounds[:-1],
+                        bounds[1:],
+                    )
+                )
+            thicknesses = [t for chunk_t, _ in results for t in chunk_t]
+            lis = [unit for _, chunk_lis in results for unit in chunk_lis]
 
         # create a DataFrame of the thicknesses median and standard deviation by lithology
         result = pandas.DataFrame({'unit': lis, 'thickness': thicknesses})
@@ -630,3 +826,16 @@ class StructuralPoint(ThicknessCalculator):
                 output_units.loc[output_units["name"] == unit, "ThicknessStdDev"] = -1
 
         return output_units
+
+
+# inputs shared by the StructuralPoint worker processes, set once per worker
+_shared_inputs = None
+
+
+def _set_shared_inputs(shared: dict):
+    global _shared_inputs
+    _shared_inputs = shared
+
+
+def _compute_thicknesses_chunk(calculator: StructuralPoint, start: int, stop: int) -> tuple:
+    return calculator._compute_thicknesses(_shared_inputs, start, stop)
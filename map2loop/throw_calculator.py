@@ -28,6 +28,15 @@ class ThrowCalculator(ABC):
         """
         return self.throw_calculator_label
 
+    def checkpoint_params(self) -> dict:
+        """
+        Getter for the parameters that change the output, used to key the run_all checkpoints
+
+        Returns:
+            dict: the parameters of the throw calculator
+        """
+        return dict(vars(self))
+
     @beartype.beartype
     @abstractmethod
     def compute(
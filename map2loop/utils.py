@@ -7,8 +7,140 @@ from typing import Union, Optional
 import pandas
 
 
+class Grid:
+    """
+    A regular 2D grid described compactly by its origin, spacing and shape. Coordinates are only
+    generated when asked for, either all at once or lazily in tiles, so very large grids can be
+    evaluated in a streaming fashion.
+
+    Attributes:
+        origin (tuple): the (x, y) coordinates of the first (lower left) grid point
+        spacing (tuple): the (dx, dy) distance between grid points
+        shape (tuple): the (ny, nx) number of grid points along each axis
+    """
+
+    @beartype.beartype
+    def __init__(self, origin: tuple, spacing: tuple, shape: tuple):
+        """
+        Initialiser for Grid
+
+        Args:
+            origin (tuple): the (x, y) coordinates of the first (lower left) grid point
+            spacing (tuple): the (dx, dy) distance between grid points
+            shape (tuple): the (ny, nx) number of grid points along each axis
+        """
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.spacing = (float(spacing[0]), float(spacing[1]))
+        self.shape = (int(shape[0]), int(shape[1]))
+
+    @classmethod
+    @beartype.beartype
+    def from_bounding_box(
+        cls,
+        bounding_box: dict,
+        cell_size: Optional[Union[int, float]] = None,
+        resolution: Optional[int] = None,
+    ) -> "Grid":
+        """
+        Create a grid covering a bounding box with square cells, respecting the extent of both axes
+
+        Args:
+            bounding_box (dict): a dictionary containing the bounding box of the map data.
+                The bounding box dictionary should comply with the following format: {
+                    "minx": value,
+                    "maxx": value,
+                    "miny": value,
+                    "maxy": value,
+                }
+            cell_size (int or float, optional): The distance between grid points. Defaults to None.
+            resolution (int, optional): The number of grid points along the longest axis, used when cell_size
+                is not given. Defaults to None (100 points).
+
+        Returns:
+            Grid: the grid
+        """
+        width = bounding_box["maxx"] - bounding_box["minx"]
+        height = bounding_box["maxy"] - bounding_box["miny"]
+        if cell_size is None:
+            if resolution is None:
+                resolution = 100
+            cell_size = max(width, height) / max(resolution - 1, 1)
+        if cell_size <= 0:
+            raise ValueError("Grid cell size must be positive")
+        # Add a small tolerance so an extent that is an exact multiple of the cell size includes its far edge
+        nx = int(math.floor(width / cell_size + 1e-9)) + 1
+        ny = int(math.floor(height / cell_size + 1e-9)) + 1
+        return cls((bounding_box["minx"], bounding_box["miny"]), (cell_size, cell_size), (ny, nx))
+
+    @property
+    def size(self) -> int:
+        """
+        The total number of grid points
+        """
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def x(self) -> numpy.ndarray:
+        """
+        The x coordinates of the grid columns
+        """
+        return self.origin[0] + numpy.arange(self.shape[1]) * self.spacing[0]
+
+    @property
+    def y(self) -> numpy.ndarray:
+        """
+        The y coordinates of the grid rows
+        """
+        return self.origin[1] + numpy.arange(self.shape[0]) * self.spacing[1]
+
+    def descriptor(self) -> tuple:
+        """
+        Get the compact description of the grid
+
+        Returns:
+            tuple: the (origin, spacing, shape) of the grid
+        """
+        return self.origin, self.spacing, self.shape
+
+    def coordinates(self, start: int = 0, stop: Optional[int] = None) -> tuple:
+        """
+        Get the coordinates of a range of grid points, numbered row by row (the same order as
+        flattening a numpy.meshgrid of the x and y axes)
+
+        Args:
+            start (int, optional): the index of the first grid point. Defaults to 0.
+            stop (int, optional): the index after the last grid point. Defaults to None (the end of the grid).
+
+        Returns:
+            xi, yi (numpy.ndarray, numpy.ndarray): The x and y coordinates of the grid points.
+        """
+        if stop is None or stop > self.size:
+            stop = self.size
+        index = numpy.arange(start, stop)
+        xi = self.origin[0] + (index % self.shape[1]) * self.spacing[0]
+        yi = self.origin[1] + (index // self.shape[1]) * self.spacing[1]
+        return xi, yi
+
+    def tiles(self, tile_size: int = 1000000):
+        """
+        Lazily generate the grid coordinates in tiles of at most tile_size points
+
+        Args:
+            tile_size (int, optional): the maximum number of grid points in each tile. Defaults to 1000000.
+
+        Yields:
+            xi, yi (numpy.ndarray, numpy.ndarray): The x and y coordinates of the grid points in the tile.
+        """
+        for start in range(0, self.size, tile_size):
+            yield self.coordinates(start, start + tile_size)
+
+
 @beartype.beartype
-def generate_grid(bounding_box: dict, grid_resolution: Optional[int] = None) -> tuple:
+def generate_grid(
+    bounding_box: dict,
+    grid_resolution: Optional[int] = None,
+    cell_size: Optional[Union[int, float]] = None,
+) -> tuple:
     """
     Setup the grid for interpolation
 
@@ -20,21 +152,28 @@ def generate_grid(bounding_box: dict, grid_resolution: Optional[int] = None) ->
                 "miny": value,
                 "maxy": value,
             }
-        grid_resolution (int, optional): The number of grid points in the x and y directions. Defaults to None.
+        grid_resolution (int, optional): The number of grid points in the x and y directions. Defaults to None
+            (square cells covering both axes, 1% of the longest side of the bounding box).
+        cell_size (int or float, optional): The distance between grid points. When given, the grid has square
+            cells covering both axes of the bounding box (see Grid.from_bounding_box). Defaults to None.
 
     Returns:
         xi, yi (numpy.ndarray, numpy.ndarray): The x and y coordinates of the grid points.
-        grid_resolution (int): The number of grid points in the x and y directions.
+        cell_size (float): The distance between grid points.
     """
-
-    # Define the desired cell size
-    cell_size = 0.01 * (bounding_box["maxx"] - bounding_box["minx"])
-
-    if grid_resolution is None:
-        # Calculate the grid resolution
-        grid_resolution = round((bounding_box["maxx"] - bounding_box["minx"]) / cell_size)
-
-    # Generate the grid
+    if cell_size is None and grid_resolution is None:
+        # Define the desired cell size from the longest side so tall maps are covered as well as wide ones
+        cell_size = 0.01 * max(
+            bounding_box["maxx"] - bounding_box["minx"], bounding_box["maxy"] - bounding_box["miny"]
+        )
+    if cell_size is not None:
+        xi, yi = Grid.from_bounding_box(bounding_box, cell_size=cell_size).coordinates()
+        return xi, yi, cell_size
+
+    # Generate the grid, the cell size is the spacing along the longest side
+    cell_size = max(
+        bounding_box["maxx"] - bounding_box["minx"], bounding_box["maxy"] - bounding_box["miny"]
+    ) / max(grid_resolution - 1, 1)
     x = numpy.linspace(bounding_box["minx"], bounding_box["maxx"], grid_resolution)
     y = numpy.linspace(bounding_box["miny"], bounding_box["maxy"], grid_resolution)
     xi, yi = numpy.meshgrid(x, y)
@@ -147,11 +286,10 @@ def find_segment_strike_from_pt(
     float: The strike of the line segment closer to the point
     """
 
-    lines = []
-    for c1, c2 in zip(line.coords, line.coords[1:]):
-        lines.append(shapely.LineString([c1, c2]))
-    distances = [segment.distance(point) for segment in lines]
-    nearest_line = lines[distances.index(min(distances))]
+    coords = shapely.get_coordinates(line)
+    lines = shapely.linestrings(numpy.stack([coords[:-1], coords[1:]], axis=1))
+    distances = shapely.distance(lines, point)
+    nearest_line = lines[numpy.argmin(distances)]
 
     if 0 <= measurement['DIPDIR'] <= 180:
         # 1 is the upper point
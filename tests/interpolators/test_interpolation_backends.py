@@ -0,0 +1,135 @@
+### This file tests the interpolation backends in map2loop/interpolators.py
+
+import numpy
+import pandas
+import pytest
+from scipy.interpolate import Rbf, LinearNDInterpolator
+from map2loop.utils import Grid
+from map2loop.interpolators import (
+    DipDipDirectionInterpolator,
+    NormalVectorInterpolator,
+    INTERPOLATION_BACKENDS,
+    IDWBackend,
+    RbfBackend,
+    get_interpolation_backend,
+)
+
+
+def sample_points(n=200, seed=0):
+    rng = numpy.random.default_rng(seed)
+    x = rng.uniform(0, 1000, n)
+    y = rng.uniform(0, 1000, n)
+    values = 30 + 10 * numpy.sin(x / 200) + 5 * numpy.cos(y / 150)
+    return x, y, values
+
+
+@pytest.mark.parametrize("name", list(INTERPOLATION_BACKENDS.keys()))
+def test_backends_honour_data_points(name):
+    x, y, values = sample_points()
+    result = get_interpolation_backend(name)(x, y, values, x, y)
+    assert result.shape == values.shape, f"{name} backend returned the wrong shape"
+    assert numpy.allclose(result, values), f"{name} backend does not honour the data points"
+
+
+@pytest.mark.parametrize("name", list(INTERPOLATION_BACKENDS.keys()))
+def test_backends_chunked_evaluation(name):
+    x, y, values = sample_points()
+    xi, yi = numpy.meshgrid(numpy.linspace(100, 900, 37), numpy.linspace(100, 900, 23))
+    xi, yi = xi.ravel(), yi.ravel()
+    backend = get_interpolation_backend(name)
+    full = backend(x, y, values, xi, yi)
+    backend.chunk_size = 50
+    chunked = backend(x, y, values, xi, yi)
+    assert numpy.allclose(full, chunked, equal_nan=True), f"{name} backend depends on the chunk size"
+
+
+def test_get_interpolation_backend():
+    assert isinstance(get_interpolation_backend(None), RbfBackend), "default backend should be Rbf"
+    assert get_interpolation_backend(Rbf).type() == "rbf", "scipy Rbf class not mapped to rbf backend"
+    assert (
+        get_interpolation_backend(LinearNDInterpolator).type() == "linear"
+    ), "scipy LinearNDInterpolator class not mapped to linear backend"
+    backend = IDWBackend(neighbors=4)
+    assert get_interpolation_backend(backend) is backend, "backend instances should be used as is"
+    with pytest.raises(ValueError):
+        get_interpolation_backend("kriging")
+
+
+def test_dip_interpolator_with_backend():
+    x, y, values = sample_points()
+    structure_data = pandas.DataFrame({"X": x, "Y": y, "DIP": values, "DIPDIR": values * 3})
+    bounding_box = {"minx": 0, "maxx": 1000, "miny": 0, "maxy": 1000}
+    rbf = DipDipDirectionInterpolator(data_type="dip")(bounding_box, structure_data, interpolator=Rbf)
+    rbf_named = DipDipDirectionInterpolator(data_type="dip")(
+        bounding_box, structure_data, interpolator="rbf"
+    )
+    idw = DipDipDirectionInterpolator(data_type="dip")(
+        bounding_box, structure_data, interpolator="idw"
+    )
+    assert numpy.allclose(rbf, rbf_named), "rbf backend differs from the scipy Rbf interpolator"
+    assert idw.shape == rbf.shape, "idw backend returned the wrong shape"
+    assert numpy.all(
+        (idw >= values.min()) & (idw <= values.max())
+    ), "idw values should be bounded by the data"
+
+
+@pytest.mark.parametrize("name", list(INTERPOLATION_BACKENDS.keys()))
+def test_backends_multiple_fields(name):
+    x, y, values = sample_points()
+    fields = numpy.column_stack([values, values * 2 - 10, numpy.sqrt(values)])
+    xi, yi = numpy.meshgrid(numpy.linspace(100, 900, 20), numpy.linspace(100, 900, 20))
+    xi, yi = xi.ravel(), yi.ravel()
+    together = get_interpolation_backend(name)(x, y, fields, xi, yi)
+    assert together.shape == (len(xi), 3), f"{name} backend returned the wrong shape"
+    for column in range(3):
+        separate = get_interpolation_backend(name)(x, y, fields[:, column], xi, yi)
+        assert numpy.allclose(
+            together[:, column], separate, equal_nan=True
+        ), f"{name} backend multi-field result differs from the single field result"
+
+
+def test_interpolator_exposes_backend():
+    x, y, values = sample_points()
+    structure_data = pandas.DataFrame({"X": x, "Y": y, "DIP": values, "DIPDIR": values * 3})
+    bounding_box = {"minx": 0, "maxx": 1000, "miny": 0, "maxy": 1000}
+    interpolator = DipDipDirectionInterpolator()
+    interpolated = interpolator(bounding_box, structure_data)
+    assert interpolated.shape == (len(interpolator.xi), 2), "dip and dipdir should be interpolated together"
+    reused = interpolator.backend.predict(interpolator.xi[:10], interpolator.yi[:10])
+    assert numpy.allclose(reused, interpolated[:10]), "fitted backend cannot be reused"
+
+
+def test_interpolator_refit_without_data():
+    x, y, values = sample_points()
+    structure_data = pandas.DataFrame({"X": x, "Y": y, "DIP": values, "DIPDIR": values * 3})
+    bounding_box = {"minx": 0, "maxx": 1000, "miny": 0, "maxy": 1000}
+    interpolator = DipDipDirectionInterpolator(data_type="dip")
+    assert interpolator(bounding_box, structure_data) is not None
+    interpolator.data_type = []
+    assert interpolator(bounding_box, structure_data) is None, "previous fit should not be reused"
+    assert interpolator.backend is None
+
+
+def test_normal_vector_interpolator_tiles(monkeypatch):
+    x, y, values = sample_points()
+    structure_data = pandas.DataFrame({"X": x, "Y": y, "Z": 0, "DIP": values, "DIPDIR": values * 3})
+    bounding_box = {"minx": 0, "maxx": 1000, "miny": 0, "maxy": 1000}
+    full = NormalVectorInterpolator(cell_size=25.0)(bounding_box, structure_data.copy(), interpolator="idw")
+
+    # record how many grid coordinates are generated at once
+    generated = []
+    coordinates = Grid.coordinates
+
+    def record_coordinates(grid, start=0, stop=None):
+        xi, yi = coordinates(grid, start, stop)
+        generated.append(len(xi))
+        return xi, yi
+
+    monkeypatch.setattr(Grid, "coordinates", record_coordinates)
+    tiled = NormalVectorInterpolator(cell_size=25.0, tile_size=97)(
+        bounding_box, structure_data.copy(), interpolator="idw"
+    )
+    assert full.shape == (41 * 41, 3), "normal vectors not evaluated on every grid point"
+    assert numpy.allclose(full, tiled), "normal vectors depend on the tile size"
+    assert numpy.allclose(numpy.linalg.norm(tiled, axis=1), 1), "normal vectors are not normalised"
+    assert max(generated) <= 97, "the whole grid was generated at once"
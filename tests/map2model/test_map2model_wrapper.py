@@ -0,0 +1,259 @@
+### This file tests the exchange of files with map2model in map2loop/map2model_wrapper.py
+
+import os
+import pytest
+import numpy
+import pandas
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.map2model_wrapper import Map2ModelWrapper
+from map2loop.topology import calculate_fault_relationships, calculate_unit_relationships
+from map2loop.m2l_enums import Datatype, Datastate, VerboseLevel
+
+
+def create_mapdata(tmp_path):
+    # three stacked units cut by two crossing faults
+    geology = geopandas.GeoDataFrame(
+        {
+            "UNITNAME": ["A", "B", "C"],
+            "CODE": ["A", "B", "C"],
+            "GROUP": ["G", "G", "G"],
+            "DESCRIPTION": ["", "", ""],
+            "ROCKTYPE1": ["sandstone"] * 3,
+            "ROCKTYPE2": ["None"] * 3,
+            "MIN_AGE": [1.0, 2.0, 3.0],
+            "MAX_AGE": [1.5, 2.5, 3.5],
+            "ID": [0, 1, 2],
+        },
+        geometry=[shapely.box(0, 1000 * i, 3000, 1000 * (i + 1)) for i in range(3)],
+        crs=28350,
+    )
+    faults = geopandas.GeoDataFrame(
+        {"FEATURE": ["Fault"] * 2, "NAME": ["Fault_0", "Fault_1"], "ID": [0, 1]},
+        geometry=[
+            shapely.LineString([(100, 100), (2900, 2900)]),
+            shapely.LineString([(100, 2900), (2900, 100)]),
+        ],
+        crs=28350,
+    )
+    md = MapData(tmp_path=str(tmp_path), verbose_level=VerboseLevel.NONE)
+    md.set_working_projection(28350)
+    md.set_bounding_box({"minx": 0, "maxx": 3000, "miny": 0, "maxy": 3000})
+    for datatype, data in [(Datatype.GEOLOGY, geology), (Datatype.FAULT, faults)]:
+        md.filenames[datatype] = "memory"
+        md.data[datatype] = data
+        md.data_states[datatype] = Datastate.COMPLETE
+        md.dirtyflags[datatype] = False
+    return md
+
+
+def test_map2model_in_memory(tmp_path):
+    md = create_mapdata(tmp_path)
+    on_disk = Map2ModelWrapper(md, in_memory=False)
+    on_disk.run()
+    assert os.path.isfile(tmp_path / "map2model_data" / "geology_wkt.csv")
+    assert sorted(on_disk.sorted_units) == ["A", "B", "C"]
+
+    in_memory = Map2ModelWrapper(create_mapdata(tmp_path / "memory"), in_memory=True)
+    in_memory.run()
+    # the exchange directory is removed after the run
+    assert not os.path.exists(tmp_path / "memory" / "map2model_data")
+    assert in_memory.sorted_units == on_disk.sorted_units
+    for name in [
+        "fault_fault_relationships",
+        "unit_fault_relationships",
+        "unit_unit_relationships",
+    ]:
+        pandas.testing.assert_frame_equal(getattr(in_memory, name), getattr(on_disk, name))
+
+
+def test_export_wkt_format_files(tmp_path):
+    md = create_mapdata(tmp_path)
+    path = md.export_wkt_format_files(str(tmp_path / "exchange"))
+    geology = pandas.read_csv(os.path.join(path, "geology_wkt.csv"), sep="\t")
+    assert list(geology["CODE"]) == ["A", "B", "C"]
+    numpy.testing.assert_array_equal(
+        shapely.from_wkt(geology["WKT"]), md.get_map_data(Datatype.GEOLOGY).geometry.values
+    )
+
+
+def test_parse_map2model_output(tmp_path):
+    (tmp_path / "ff.txt").write_text("0, 0, {(1, X, 88.6)}\n1, 1, {(0, X, 88.6), (2, T, 45.0)}\n")
+    (tmp_path / "uf.txt").write_text("0, unit_a, {1, 2}\n1, unit_b, {0}\n")
+    (tmp_path / "graph.txt").write_text("0 unit_a\n1 unit_b\n2 unit_c\n\n0 1 0\n1 2 0\n")
+    (tmp_path / "empty.txt").write_text("")
+
+    fault_faults = Map2ModelWrapper.parse_fault_fault_intersections(str(tmp_path / "ff.txt"))
+    assert fault_faults.values.tolist() == [
+        ["Fault_0", "Fault_1", "X", 88.6],
+        ["Fault_1", "Fault_0", "X", 88.6],
+        ["Fault_1", "Fault_2", "T", 45.0],
+    ]
+    unit_faults = Map2ModelWrapper.parse_unit_fault_intersections(str(tmp_path / "uf.txt"))
+    assert unit_faults.values.tolist() == [
+        ["unit_a", "Fault_1"],
+        ["unit_a", "Fault_2"],
+        ["unit_b", "Fault_0"],
+    ]
+    unit_units = Map2ModelWrapper.parse_unit_graph(str(tmp_path / "graph.txt"))
+    assert unit_units.values.tolist() == [[0, "unit_a", 1, "unit_b"], [1, "unit_b", 2, "unit_c"]]
+
+    empty = Map2ModelWrapper.parse_fault_fault_intersections(str(tmp_path / "empty.txt"))
+    assert list(empty.columns) == ["Fault1", "Fault2", "Type", "Angle"] and len(empty) == 0
+    assert Map2ModelWrapper.parse_units_sorted(str(tmp_path / "missing.txt")) == []
+
+
+def test_native_unit_relationships(tmp_path):
+    md = create_mapdata(tmp_path)
+    binary = Map2ModelWrapper(md, in_memory=False)
+    binary.run()
+    native = Map2ModelWrapper(md, engine="native")
+    native.run()
+    assert native.sorted_units == binary.sorted_units
+    for name in [
+        "fault_fault_relationships",
+        "unit_fault_relationships",
+        "unit_unit_relationships",
+    ]:
+        pandas.testing.assert_frame_equal(getattr(native, name), getattr(binary, name))
+
+
+def test_native_unit_relationships_split_units(tmp_path):
+    # unit A is split into two polygons either side of B, with C above the second one
+    md = create_mapdata(tmp_path)
+    geology = md.data[Datatype.GEOLOGY]
+    md.data[Datatype.GEOLOGY] = pandas.concat(
+        [geology.iloc[[0, 1]], geology.iloc[[0]], geology.iloc[[2]]], ignore_index=True
+    ).set_geometry(
+        [
+            shapely.box(0, 0, 1000, 3000),
+            shapely.Polygon([(1000, 0), (2000, 0), (2100, 1500), (2000, 3000), (1000, 3000)]),
+            shapely.Polygon([(2000, 0), (3000, 0), (3000, 1500), (2100, 1500)]),
+            shapely.Polygon([(2100, 1500), (3000, 1500), (3000, 3000), (2000, 3000)]),
+        ]
+    )
+    binary = Map2ModelWrapper(md, use_cache=False)
+    binary.run()
+    native = Map2ModelWrapper(md, use_cache=False, engine="native")
+    native.run()
+    assert native.sorted_units == binary.sorted_units
+    assert native.unit_unit_relationships.values.tolist() == [
+        [0, "A", 1, "B"],
+        [1, "B", 2, "C"],
+        [0, "A", 2, "C"],
+    ]
+    pandas.testing.assert_frame_equal(
+        native.unit_unit_relationships, binary.unit_unit_relationships
+    )
+
+
+def test_native_unit_relationships_contacts():
+    # units only touching at a point are not in contact and equal ages link by position
+    geology = geopandas.GeoDataFrame(
+        {"UNITNAME": ["D", "C", "B", "A"], "MIN_AGE": [2.0, 2.0, 1.0, 3.0], "MAX_AGE": 3.0},
+        geometry=[
+            shapely.box(0, 0, 500, 500),
+            shapely.box(500, 0, 1000, 500),
+            shapely.box(0, 500, 500, 1000),
+            shapely.box(600, 600, 900, 900),
+        ],
+    )
+    sorted_units, unit_unit = calculate_unit_relationships(geology)
+    assert sorted_units == ["A", "B", "C", "D"]
+    assert unit_unit.values.tolist() == [[0, "D", 1, "C"], [2, "B", 0, "D"]]
+
+
+def test_native_fault_relationships():
+    # fault 3 ends 10m short of fault 7 and crosses it while fault 5 crosses both
+    geology = geopandas.GeoDataFrame(
+        {"UNITNAME": ["top", "bottom"]},
+        geometry=[shapely.box(0, 500, 1000, 1000), shapely.box(0, 0, 1000, 500)],
+    )
+    faults = geopandas.GeoDataFrame(
+        {"ID": [7, 3, 5]},
+        geometry=[
+            shapely.LineString([(100, 600), (900, 600), (900, 700)]),
+            shapely.LineString([(200, 400), (300, 900), (500, 610)]),
+            shapely.LineString([(700, 100), (700, 900)]),
+        ],
+    )
+    fault_faults, unit_faults = calculate_fault_relationships(geology, faults)
+    assert fault_faults.values.tolist() == [
+        ["Fault_5", "Fault_7", "X", 90.0],
+        ["Fault_7", "Fault_3", "T", 55.4],
+        ["Fault_7", "Fault_5", "X", 90.0],
+    ]
+    # faults only cut units they run into for more than 5m
+    assert unit_faults.values.tolist() == [
+        ["bottom", "Fault_3"],
+        ["bottom", "Fault_5"],
+        ["top", "Fault_3"],
+        ["top", "Fault_5"],
+        ["top", "Fault_7"],
+    ]
+
+
+def test_native_self_intersecting_faults(tmp_path, monkeypatch):
+    # the native engine leaves self intersecting faults to map2model
+    md = create_mapdata(tmp_path)
+    md.data[Datatype.FAULT].geometry.values[1] = shapely.LineString(
+        [(100, 2900), (2900, 100), (2900, 1500), (100, 1500)]
+    )
+    binary = Map2ModelWrapper(md, use_cache=False)
+    binary.run()
+    native = Map2ModelWrapper(md, use_cache=False, engine="native")
+    native.run()
+    pandas.testing.assert_frame_equal(
+        native.fault_fault_relationships, binary.fault_fault_relationships
+    )
+
+    def fail(*args):
+        raise AssertionError("map2model was run")
+
+    monkeypatch.setattr("map2model.run", fail)
+    with pytest.raises(AssertionError, match="map2model was run"):
+        Map2ModelWrapper(md, use_cache=False, engine="native").run()
+    Map2ModelWrapper(create_mapdata(tmp_path), use_cache=False, engine="native").run()
+
+
+def test_map2model_cache(tmp_path, monkeypatch):
+    md = create_mapdata(tmp_path)
+    first = Map2ModelWrapper(md, cache_path=str(tmp_path / "cache"))
+    first.run()
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+    # the same map data is not sent to map2model again
+    def fail(*args):
+        raise AssertionError("map2model was run")
+
+    monkeypatch.setattr("map2model.run", fail)
+    second = Map2ModelWrapper(create_mapdata(tmp_path), cache_path=str(tmp_path / "cache"))
+    second.run()
+    assert second.sorted_units == first.sorted_units
+    for name in [
+        "fault_fault_relationships",
+        "unit_fault_relationships",
+        "unit_unit_relationships",
+    ]:
+        pandas.testing.assert_frame_equal(getattr(second, name), getattr(first, name))
+
+    # changing the map data misses the cache
+    md = create_mapdata(tmp_path)
+    md.data[Datatype.FAULT] = md.data[Datatype.FAULT].iloc[:1]
+    with pytest.raises(AssertionError, match="map2model was run"):
+        Map2ModelWrapper(md, cache_path=str(tmp_path / "cache")).run()
+
+
+def test_map2model_cache_eviction(tmp_path):
+    cache_path = tmp_path / "cache"
+    Map2ModelWrapper(create_mapdata(tmp_path), cache_path=str(cache_path)).run()
+    (first,) = os.listdir(cache_path)
+    first_size = sum(file.stat().st_size for file in (cache_path / first).iterdir())
+
+    # a second result that does not fit alongside the first evicts it
+    md = create_mapdata(tmp_path)
+    md.data[Datatype.FAULT] = md.data[Datatype.FAULT].iloc[:1]
+    Map2ModelWrapper(md, cache_path=str(cache_path), cache_max_size=first_size + 1024).run()
+    (second,) = os.listdir(cache_path)
+    assert second != first
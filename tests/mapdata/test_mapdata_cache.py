@@ -0,0 +1,103 @@
+### This file tests the map data cache (MapData.set_map_data_cache) in map2loop/mapdata.py
+
+import os
+import pandas
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def write_structure_file(path):
+    data = geopandas.GeoDataFrame(
+        {"DIPDIR": [45.0, 120.0, 300.0], "DIP": [30.0, 60.0, 50.0], "ID": [1, 2, 3]},
+        geometry=[shapely.Point(10, 10), shapely.Point(20, 20), shapely.Point(200, 200)],
+        crs=28350,
+    )
+    filename = str(path / "structure.gpkg")
+    data.to_file(filename)
+    return filename
+
+
+def create_mapdata(tmp_path, filename):
+    md = MapData(tmp_path=str(tmp_path))
+    md.set_working_projection(28350)
+    md.set_bounding_box({"minx": 0, "maxx": 100, "miny": 0, "maxy": 100})
+    md.config.structure_config["dipdir_column"] = "DIPDIR"
+    md.config.structure_config["dip_column"] = "DIP"
+    md.config.structure_config["orientation_type"] = "dip direction"
+    md.set_filename(Datatype.STRUCTURE, filename)
+    md.set_map_data_cache()
+    return md
+
+
+def test_map_data_cache_hit(tmp_path):
+    filename = write_structure_file(tmp_path)
+    md = create_mapdata(tmp_path, filename)
+    md.load_map_data(Datatype.STRUCTURE)
+    assert md.map_data_cache.misses == 1 and md.map_data_cache.hits == 0
+    assert len(os.listdir(md.map_data_cache.path)) == 1
+
+    cached = create_mapdata(tmp_path, filename)
+    cached.load_map_data(Datatype.STRUCTURE)
+    assert cached.map_data_cache.hits == 1 and cached.map_data_cache.misses == 0
+    assert cached.data_states[Datatype.STRUCTURE] == Datastate.COMPLETE
+    assert cached.raw_data[Datatype.STRUCTURE] is None
+    pandas.testing.assert_frame_equal(
+        cached.get_map_data(Datatype.STRUCTURE), md.get_map_data(Datatype.STRUCTURE)
+    )
+    assert cached.get_map_data(Datatype.STRUCTURE).crs == md.get_map_data(Datatype.STRUCTURE).crs
+
+
+def test_map_data_cache_miss_on_changes(tmp_path):
+    filename = write_structure_file(tmp_path)
+    create_mapdata(tmp_path, filename).load_map_data(Datatype.STRUCTURE)
+
+    # changing the config section, the bounding box or the source file misses the cache
+    md = create_mapdata(tmp_path, filename)
+    md.config.structure_config["orientation_type"] = "strike"
+    md.load_map_data(Datatype.STRUCTURE)
+    assert md.map_data_cache.misses == 1
+
+    md = create_mapdata(tmp_path, filename)
+    md.set_bounding_box({"minx": 0, "maxx": 15, "miny": 0, "maxy": 15})
+    md.load_map_data(Datatype.STRUCTURE)
+    assert md.map_data_cache.misses == 1
+    assert len(md.get_map_data(Datatype.STRUCTURE)) == 1
+
+    os.utime(filename, ns=(0, 0))
+    md = create_mapdata(tmp_path, filename)
+    md.load_map_data(Datatype.STRUCTURE)
+    assert md.map_data_cache.misses == 1
+
+
+def test_map_data_cache_eviction(tmp_path):
+    filename = write_structure_file(tmp_path)
+    md = create_mapdata(tmp_path, filename)
+    md.load_map_data(Datatype.STRUCTURE)
+    first = os.listdir(md.map_data_cache.path)[0]
+    os.utime(os.path.join(md.map_data_cache.path, first), ns=(0, 0))
+
+    # a cache only large enough for one file keeps the most recently used file
+    md = create_mapdata(tmp_path, filename)
+    md.map_data_cache.max_size = os.path.getsize(os.path.join(md.map_data_cache.path, first))
+    md.set_bounding_box({"minx": 0, "maxx": 15, "miny": 0, "maxy": 15})
+    md.load_map_data(Datatype.STRUCTURE)
+    files = os.listdir(md.map_data_cache.path)
+    assert len(files) == 1 and files[0] != first
+
+
+def test_map_data_cache_eviction_race(tmp_path, monkeypatch):
+    filename = write_structure_file(tmp_path)
+    md = create_mapdata(tmp_path, filename)
+    md.load_map_data(Datatype.STRUCTURE)
+    cache = md.map_data_cache
+    cached = os.path.join(cache.path, os.listdir(cache.path)[0])
+
+    # files another save evicts between listing and removing them are skipped
+    vanished = os.path.join(cache.path, "vanished.parquet")
+    monkeypatch.setattr("glob.glob", lambda pattern: [vanished, cached])
+    cache.max_size = 0
+    cache.evict()
+    assert not os.path.exists(cached)
+    cache.evict()
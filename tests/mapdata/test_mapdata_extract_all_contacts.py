@@ -0,0 +1,51 @@
+### This file tests the function extract_all_contacts() in map2loop/mapdata.py
+
+import pytest
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def create_mapdata():
+    md = MapData()
+    md.data[Datatype.GEOLOGY] = geopandas.GeoDataFrame(
+        {
+            "UNITNAME": ["B", "A", "C", "I", "A"],
+            "INTRUSIVE": [False, False, False, True, False],
+            "SILL": [False, False, False, False, False],
+        },
+        geometry=[
+            shapely.box(10, 0, 20, 10),
+            shapely.box(0, 0, 10, 5),
+            shapely.box(20, 0, 30, 10),
+            shapely.box(0, 10, 30, 20),
+            shapely.box(0, 5, 10, 10),
+        ],
+        crs=28350,
+    )
+    md.data_states[Datatype.GEOLOGY] = Datastate.COMPLETE
+    md.dirtyflags[Datatype.GEOLOGY] = False
+    return md
+
+
+def test_extract_all_contacts():
+    md = create_mapdata()
+    contacts = md.extract_all_contacts()
+
+    assert list(contacts.columns) == ["UNITNAME_1", "UNITNAME_2", "geometry", "length"]
+    # units are dissolved, intrusions removed and the pairs follow the order of the units
+    assert list(zip(contacts["UNITNAME_1"], contacts["UNITNAME_2"])) == [("A", "B"), ("B", "C")]
+    # the contact is the boundary of the second unit within 1m of the shared edge
+    assert contacts["length"].tolist() == pytest.approx([12.0, 12.0])
+    assert contacts.crs == md.data[Datatype.GEOLOGY].crs
+    assert md.contacts is contacts
+
+
+def test_extract_all_contacts_no_contacts():
+    md = create_mapdata()
+    md.data[Datatype.GEOLOGY] = md.data[Datatype.GEOLOGY].iloc[[1, 2]]
+    contacts = md.extract_all_contacts(save_contacts=False)
+
+    assert len(contacts) == 0
+    assert "length" in contacts.columns
@@ -0,0 +1,44 @@
+### This file tests the function extract_basal_contacts() in map2loop/mapdata.py
+
+import pytest
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+
+
+def create_mapdata():
+    md = MapData()
+    md.contacts = geopandas.GeoDataFrame(
+        {
+            "UNITNAME_1": ["A", "B", "A", "C"],
+            "UNITNAME_2": ["B", "C", "C", "D"],
+            "length": [1.0, 2.0, 3.0, 4.0],
+        },
+        geometry=[shapely.LineString([(i, 0), (i, 1)]) for i in range(4)],
+    )
+    return md
+
+
+def test_extract_basal_contacts():
+    md = create_mapdata()
+    basal_contacts = md.extract_basal_contacts(["D", "C", "B", "A"])
+
+    assert list(basal_contacts.columns) == ["ID", "basal_unit", "type", "geometry"]
+    assert basal_contacts["ID"].tolist() == [2, 1, 1, 0]
+    assert basal_contacts["basal_unit"].tolist() == ["B", "C", "C", "D"]
+    assert basal_contacts["type"].tolist() == ["BASAL", "BASAL", "ABNORMAL", "BASAL"]
+    assert md.basal_contacts is basal_contacts
+
+
+def test_extract_basal_contacts_missing_unit():
+    md = create_mapdata()
+    with pytest.raises(ValueError):
+        md.extract_basal_contacts(["C", "B", "A"])
+
+
+def test_calculate_basal_contact_lengths():
+    md = create_mapdata()
+    columns = [["D", "C", "B", "A"], ["A", "C", "B", "D"]]
+    assert md.calculate_basal_contact_lengths(columns) == [7.0, 5.0]
+    with pytest.raises(ValueError):
+        md.calculate_basal_contact_lengths([["C", "B", "A"]])
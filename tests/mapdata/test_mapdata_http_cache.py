@@ -0,0 +1,122 @@
+### This file tests the http cache (MapData.set_http_cache) against a local http server
+
+import hashlib
+import json
+import threading
+import time
+import http.server
+import pytest
+import geopandas
+import shapely
+from map2loop.http_cache import HttpCache
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append(self.path)
+        path = self.path.split("?")[0]
+        if path not in Handler.files:
+            self.send_error(404)
+            return
+        body = Handler.files[path]
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.files = {}
+    Handler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_http_cache_conditional_requests(server, tmp_path):
+    Handler.files["/data.txt"] = b"first"
+    cache = HttpCache(str(tmp_path))
+    assert cache.fetch(server + "/data.txt") == b"first"
+    assert cache.misses == 1 and cache.hits == 0
+
+    # unchanged on the server so the cached copy is revalidated (304) rather than downloaded
+    assert cache.fetch(server + "/data.txt") == b"first"
+    assert cache.misses == 1 and cache.hits == 1
+
+    Handler.files["/data.txt"] = b"second"
+    assert cache.fetch(server + "/data.txt") == b"second"
+    assert cache.misses == 2
+
+
+def test_http_cache_offline(server, tmp_path):
+    Handler.files["/data.txt"] = b"content"
+    HttpCache(str(tmp_path)).fetch(server + "/data.txt")
+    requests = len(Handler.requests)
+
+    offline = HttpCache(str(tmp_path), offline=True)
+    assert offline.fetch(server + "/data.txt") == b"content"
+    assert len(Handler.requests) == requests, "offline mode should not access the network"
+    with pytest.raises(ConnectionError):
+        offline.fetch(server + "/other.txt")
+
+
+def test_mapdata_http_cache_expanded_urls(server, tmp_path):
+    Handler.files["/wfs"] = (
+        geopandas.GeoDataFrame(
+            {"DIPDIR": [45.0, 90.0], "DIP": [30.0, 60.0]},
+            geometry=[shapely.Point(10, 10), shapely.Point(20, 20)],
+            crs=28350,
+        )
+        .to_json()
+        .encode()
+    )
+    Handler.files["/config.json"] = json.dumps(
+        {"structure": {"dipdir_column": "DIPDIR", "dip_column": "DIP"}}
+    ).encode()
+
+    def create_mapdata(offline=False):
+        md = MapData(tmp_path=str(tmp_path))
+        md.set_http_cache(offline=offline)
+        md.set_working_projection(28350)
+        md.set_bounding_box({"minx": 0, "maxx": 100, "miny": 0, "maxy": 100})
+        md.set_config_filename(server + "/config.json")
+        md.set_filename(Datatype.STRUCTURE, server + "/wfs?bbox={BBOX_STR}")
+        md.load_map_data(Datatype.STRUCTURE)
+        return md
+
+    md = create_mapdata()
+    assert len(md.get_map_data(Datatype.STRUCTURE)) == 2
+    assert Handler.requests[-1] == "/wfs?bbox=0,0,100,100,EPSG:28350"
+
+    md = create_mapdata(offline=True)
+    assert md.http_cache.hits == 2 and md.http_cache.misses == 0
+    assert md.config.structure_config["dipdir_column"] == "DIPDIR"
+    assert len(md.get_map_data(Datatype.STRUCTURE)) == 2
+
+
+def test_config_offline_cache_miss(server, tmp_path):
+    md = MapData(tmp_path=str(tmp_path))
+    md.set_http_cache(offline=True)
+    start = time.perf_counter()
+    with pytest.raises(ConnectionError):
+        md.set_config_filename(server + "/config.json")
+    assert time.perf_counter() - start < 0.25, "an offline cache miss should not be retried"
+    assert Handler.requests == []
@@ -0,0 +1,69 @@
+### This file tests the concurrent loading in load_all_map_data() in map2loop/mapdata.py
+
+import pytest
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def create_mapdata(tmp_path):
+    structure = geopandas.GeoDataFrame(
+        {"DIPDIR": [45.0, 120.0], "DIP": [30.0, 60.0]},
+        geometry=[shapely.Point(10, 10), shapely.Point(20, 20)],
+        crs=28350,
+    )
+    structure.to_file(str(tmp_path / "structure.gpkg"))
+    faults = geopandas.GeoDataFrame(
+        {"FEATURE": ["Fault", "Fault"], "NAME": ["F1", "F2"]},
+        geometry=[shapely.LineString([(0, 0), (50, 50)]), shapely.LineString([(0, 50), (50, 0)])],
+        crs=28350,
+    )
+    faults.to_file(str(tmp_path / "faults.gpkg"))
+
+    md = MapData(tmp_path=str(tmp_path))
+    md.set_working_projection(28350)
+    md.set_bounding_box({"minx": 0, "maxx": 100, "miny": 0, "maxy": 100})
+    md.config.structure_config["dipdir_column"] = "DIPDIR"
+    md.config.structure_config["dip_column"] = "DIP"
+    md.config.structure_config["orientation_type"] = "dip direction"
+    md.set_filename(Datatype.STRUCTURE, str(tmp_path / "structure.gpkg"))
+    md.set_filename(Datatype.FAULT, str(tmp_path / "faults.gpkg"))
+    md.set_filename(Datatype.FOLD, str(tmp_path / "missing.gpkg"))
+    return md
+
+
+def test_load_all_map_data_matches_sequential_loading(tmp_path):
+    md = create_mapdata(tmp_path)
+    md.load_all_map_data()
+
+    sequential = create_mapdata(tmp_path)
+    for datatype in [Datatype.STRUCTURE, Datatype.FAULT]:
+        sequential.load_map_data(datatype)
+        assert md.data_states[datatype] == Datastate.COMPLETE
+        assert md.load_errors[datatype] is None
+        assert md.get_map_data(datatype).equals(sequential.get_map_data(datatype))
+
+    # a missing file is reported for its own datatype only
+    assert md.load_errors[Datatype.FOLD] is not None
+    assert md.data_states[Datatype.FOLD] == Datastate.UNLOADED
+
+
+def test_load_all_map_data_keeps_errors_per_datatype(tmp_path, monkeypatch):
+    md = create_mapdata(tmp_path)
+    check_map = md.check_map
+
+    def failing_check_map(datatype):
+        if datatype == Datatype.FAULT:
+            raise ValueError("bad fault map")
+        check_map(datatype)
+
+    monkeypatch.setattr(md, "check_map", failing_check_map)
+    # the error is raised once the other datatypes have finished loading
+    with pytest.raises(ValueError, match="bad fault map"):
+        md.load_all_map_data(max_workers=2)
+
+    assert isinstance(md.load_errors[Datatype.FAULT], ValueError)
+    assert md.data_states[Datatype.FAULT] == Datastate.ERRORED
+    assert md.data_states[Datatype.STRUCTURE] == Datastate.COMPLETE
+    assert len(md.get_map_data(Datatype.STRUCTURE)) == 2
@@ -0,0 +1,36 @@
+### This file tests the function parse_fault_map() in map2loop/mapdata.py
+
+import numpy
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype
+
+
+def create_faults():
+    return geopandas.GeoDataFrame(
+        {
+            "FEATURE": ["fault", "fault", "fault", "shear", "fault"],
+            "NAME": ["Main fault", "nan", "None", "Shear", None],
+            "DIP": [60.0, 0.0, 45.0, 80.0, 0.0],
+            "DIPDIR": ["NORTH_EAST", "south", "120", "east", "Not accessed"],
+            "ID": [10, 11, 12, 13, 14],
+        },
+        geometry=[shapely.LineString([(i, 0), (i, 10)]) for i in range(5)],
+    )
+
+
+def test_parse_fault_map():
+    md = MapData()
+    md.raw_data[Datatype.FAULT] = create_faults()
+    md.config.fault_config["dipdir_flag"] = "alpha"
+    md.parse_fault_map()
+    faults = md.data[Datatype.FAULT]
+
+    # the shear zone is removed and the missing names come from the ID
+    assert list(faults.index) == [0, 1, 2, 4]
+    assert list(faults["NAME"]) == ["Main fault", "Fault_11", "Fault_12", "Fault_14"]
+    # dip 0 means unknown
+    numpy.testing.assert_array_equal(faults["DIP"], [60.0, numpy.nan, 45.0, numpy.nan])
+    # text dip directions map to the first matching direction, anything else is nan
+    numpy.testing.assert_array_equal(faults["DIPDIR"], [45.0, 180.0, 120.0, numpy.nan])
@@ -0,0 +1,97 @@
+### This file tests reading only the bounding box and configured columns of vector maps in map2loop/mapdata.py
+
+import pytest
+import sqlite3
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def write_fault_file(path, extension):
+    # faults stored in lat/long so the bounding box is transformed before reading
+    data = geopandas.GeoDataFrame(
+        {
+            "FEATURE": ["fault"] * 4,
+            "NAME": ["a", "b", "c", "d"],
+            "ID": [1, 2, 3, 4],
+            "UNUSED": [1.0, 2.0, 3.0, 4.0],
+        },
+        geometry=[
+            shapely.LineString([(5000, 5000), (5000, 8000)]),
+            shapely.LineString([(50000, 50000), (50000, 53000)]),
+            shapely.LineString([(6000, 2000), (6000, 8000)]),
+            shapely.LineString([(2000, 8000), (9000, 9000)]),
+        ],
+        crs=28350,
+    ).to_crs(4326)
+    filename = str(path / f"faults.{extension}")
+    data.to_file(filename)
+    return filename
+
+
+@pytest.mark.parametrize("extension", ["shp", "gpkg"])
+def test_read_pushdown(tmp_path, extension):
+    md = MapData(tmp_path=str(tmp_path))
+    md.set_io_engine("pyogrio")
+    md.set_working_projection(28350)
+    md.set_bounding_box({"minx": 0, "maxx": 10000, "miny": 0, "maxy": 10000})
+    md.set_filename(Datatype.FAULT, write_fault_file(tmp_path, extension))
+    md.load_map_data(Datatype.FAULT)
+
+    # only the features within the bounding box and the configured columns are read,
+    # keeping the positions of the features in the file as the index
+    raw = md.raw_data[Datatype.FAULT]
+    assert list(raw.index) == [0, 2, 3]
+    assert "UNUSED" not in raw.columns
+    assert {"FEATURE", "NAME", "ID"} <= set(raw.columns)
+    assert list(md.get_map_data(Datatype.FAULT)["NAME"]) == ["a", "c", "d"]
+
+
+@pytest.mark.parametrize("engine", [None, "fiona", "pyogrio", "arrow"])
+def test_io_engines(tmp_path, engine):
+    if engine == "fiona":
+        pytest.importorskip("fiona")
+    md = MapData(tmp_path=str(tmp_path))
+    md.set_io_engine(engine)
+    assert md.get_io_engine() == engine
+    md.set_working_projection(28350)
+    md.set_bounding_box({"minx": 0, "maxx": 10000, "miny": 0, "maxy": 10000})
+    md.set_filename(Datatype.FAULT, write_fault_file(tmp_path, "gpkg"))
+    md.load_map_data(Datatype.FAULT)
+    assert list(md.get_map_data(Datatype.FAULT)["NAME"]) == ["a", "c", "d"]
+    # only the pyogrio and arrow engines leave the unused columns out of the raw data
+    assert list(md.raw_data[Datatype.FAULT].index) == [0, 2, 3]
+    assert ("UNUSED" in md.raw_data[Datatype.FAULT].columns) == (engine in [None, "fiona"])
+
+    md.save_raw_map_data(str(tmp_path), Datatype.FAULT, ".parquet")
+    saved = geopandas.read_parquet(tmp_path / "FAULT.parquet")
+    assert list(saved["NAME"]) == ["a", "c", "d"]
+    assert saved.crs == md.raw_data[Datatype.FAULT].crs
+    md.save_raw_map_data(str(tmp_path), Datatype.FAULT, ".gpkg")
+    assert list(geopandas.read_file(tmp_path / "FAULT.gpkg")["NAME"]) == ["a", "c", "d"]
+
+
+def test_io_engine_unknown():
+    with pytest.raises(ValueError):
+        MapData().set_io_engine("unknown")
+
+
+def test_read_pushdown_feature_id_gaps(tmp_path):
+    filename = write_fault_file(tmp_path, "gpkg")
+    with sqlite3.connect(filename) as connection:
+        connection.execute("DELETE FROM faults WHERE NAME = 'b'")
+
+    # without consecutive feature ids the ids of the whole file are read once
+    md = MapData(tmp_path=str(tmp_path))
+    md.set_io_engine("arrow")
+    md.set_working_projection(28350)
+    md.set_bounding_box({"minx": 0, "maxx": 10000, "miny": 0, "maxy": 10000})
+    md.set_filename(Datatype.FAULT, filename)
+    for _ in range(2):
+        md.data_states[Datatype.FAULT] = Datastate.UNLOADED
+        md.dirtyflags[Datatype.FAULT] = True
+        md.load_map_data(Datatype.FAULT)
+        assert list(md.raw_data[Datatype.FAULT].index) == [0, 1, 2]
+        assert list(md.get_map_data(Datatype.FAULT)["NAME"]) == ["a", "c", "d"]
+    assert len(md.feature_ids) == 1
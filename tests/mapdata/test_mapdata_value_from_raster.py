@@ -0,0 +1,101 @@
+### This file tests the functions get_values_from_raster() and get_value_from_raster_df() in map2loop/mapdata.py
+### The batched lookups are compared against the single point get_value_from_raster()
+
+import numpy
+import pandas
+import pytest
+from osgeo import gdal
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def create_dtm(nodata=None):
+    # 30 columns x 20 rows with 10m pixels and top left corner at (100, 500)
+    data = numpy.arange(20 * 30, dtype=numpy.float32).reshape(20, 30)
+    dtm = gdal.GetDriverByName("MEM").Create("", 30, 20, 1, gdal.GDT_Float32)
+    dtm.SetGeoTransform((100.0, 10.0, 0.0, 500.0, 0.0, -10.0))
+    band = dtm.GetRasterBand(1)
+    if nodata is not None:
+        data[0, 0] = nodata
+        band.SetNoDataValue(nodata)
+    band.WriteArray(data)
+    return dtm
+
+
+def create_mapdata(dtm):
+    md = MapData()
+    md.data[Datatype.DTM] = dtm
+    md.data_states[Datatype.DTM] = Datastate.COMPLETE
+    md.dirtyflags[Datatype.DTM] = False
+    return md
+
+
+def test_get_value_from_raster_df_matches_point_lookup():
+    md = create_mapdata(create_dtm())
+    rng = numpy.random.default_rng(1)
+    # include points outside the raster so the clamping to the edges is tested too
+    df = pandas.DataFrame({"X": rng.uniform(50, 450, 500), "Y": rng.uniform(250, 550, 500)})
+
+    result = md.get_value_from_raster_df(Datatype.DTM, df.copy())
+    expected = [md.get_value_from_raster(Datatype.DTM, x, y) for x, y in zip(df["X"], df["Y"])]
+
+    assert len(result) == len(df), "get_value_from_raster_df() changed the number of rows"
+    assert numpy.allclose(
+        result["Z"].to_numpy(), numpy.array(expected, dtype=float)
+    ), "get_value_from_raster_df() does not match get_value_from_raster()"
+
+
+def test_get_values_from_raster_bilinear():
+    md = create_mapdata(create_dtm())
+    # halfway between the centres of the pixels at rows 1-2 and columns 2-3
+    values = md.get_values_from_raster(Datatype.DTM, [130.0], [480.0], interpolation="bilinear")
+    assert values[0] == pytest.approx((32 + 33 + 62 + 63) / 4), "bilinear interpolation is incorrect"
+
+    md.set_raster_interpolation("bilinear")
+    df = md.get_value_from_raster_df(Datatype.DTM, pandas.DataFrame({"X": [130.0], "Y": [480.0]}))
+    assert df["Z"].iloc[0] == pytest.approx(values[0]), "raster_interpolation default not used"
+
+
+def test_get_values_from_raster_nodata():
+    md = create_mapdata(create_dtm(nodata=-9999.0))
+    values = md.get_values_from_raster(Datatype.DTM, [105.0, 115.0], [495.0, 495.0])
+    assert numpy.isnan(values[0]), "nodata pixels should be returned as nan"
+    assert values[1] == 1, "valid pixel value is incorrect"
+
+    # the single point lookup masks nodata the same way
+    assert numpy.isnan(md.get_value_from_raster(Datatype.DTM, 105.0, 495.0))
+    assert md.get_value_from_raster(Datatype.DTM, 115.0, 495.0) == 1
+
+
+def test_get_values_from_raster_unknown_interpolation():
+    md = create_mapdata(create_dtm())
+    with pytest.raises(ValueError):
+        md.get_values_from_raster(Datatype.DTM, [130.0], [480.0], interpolation="cubic")
+
+
+def test_raster_array_is_cached():
+    dtm = create_dtm()
+    md = create_mapdata(dtm)
+    md.get_values_from_raster(Datatype.DTM, [130.0], [480.0])
+    cache = md.raster_arrays[Datatype.DTM]
+    md.get_value_from_raster(Datatype.DTM, 130.0, 480.0)
+    assert md.raster_arrays[Datatype.DTM] is cache, "raster array should be read only once"
+
+    # replacing the dataset (as load_raster_map_data does) invalidates the cache
+    md.data[Datatype.DTM] = create_dtm()
+    md.get_values_from_raster(Datatype.DTM, [130.0], [480.0])
+    assert md.raster_arrays[Datatype.DTM] is not cache, "raster array cache not invalidated"
+
+
+def test_raster_array_memory_mapped(tmp_path):
+    md = create_mapdata(create_dtm())
+    md.tmp_path = str(tmp_path)
+    md.raster_memmap_threshold = 0
+    values = md.get_values_from_raster(Datatype.DTM, [105.0, 395.0], [495.0, 305.0])
+    cache = md.raster_arrays[Datatype.DTM]
+    assert isinstance(cache["array"], numpy.memmap), "large rasters should be memory-mapped"
+    assert list(values) == [0, 599], "memory-mapped raster values are incorrect"
+
+    filename = cache["filename"]
+    md.clear_raster_array(Datatype.DTM)
+    assert not (tmp_path / filename).exists(), "memory-mapped raster file not removed"
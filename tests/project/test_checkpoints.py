@@ -0,0 +1,192 @@
+### This file tests the StageCheckpoints store used by Project.run_all(resume=True)
+
+import os
+import numpy
+import pandas
+import geopandas
+import shapely
+from map2loop.checkpoint import StageCheckpoints
+from map2loop.sampler import SamplerSpacing
+from map2loop.thickness_calculator import InterpolatedStructure, StructuralPoint
+from map2loop.project import Project
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate, VerboseLevel
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoints = StageCheckpoints(str(tmp_path / "checkpoints"))
+    contacts = geopandas.GeoDataFrame(
+        {"UNITNAME_1": ["A", "B"], "UNITNAME_2": ["B", "C"], "length": [1.0, 2.0]},
+        geometry=[shapely.LineString([(0, 0), (1, 0)]), shapely.LineString([(0, 0), (0, 2)])],
+        crs=28350,
+    )
+    samples = pandas.DataFrame({"ID": ["1", "2"], "X": [0.0, 1.0], "featureId": ["0", "0"]})
+    outputs = {"contacts": contacts, "samples": samples, "column": ["C", "B", "A"], "none": None}
+    key = StageCheckpoints.key(contacts, SamplerSpacing(10.0))
+    checkpoints.save("stage", key, outputs)
+
+    loaded = checkpoints.load("stage", key)
+    assert isinstance(loaded["contacts"], geopandas.GeoDataFrame)
+    pandas.testing.assert_frame_equal(loaded["contacts"], contacts)
+    pandas.testing.assert_frame_equal(loaded["samples"], samples)
+    assert loaded["column"] == ["C", "B", "A"]
+    assert loaded["none"] is None
+
+    # a change in any input or parameter changes the key and misses the checkpoint
+    assert checkpoints.load("stage", StageCheckpoints.key(contacts, SamplerSpacing(20.0))) is None
+    assert checkpoints.load("stage", StageCheckpoints.key(contacts.iloc[:1], SamplerSpacing(10.0))) is None
+    assert checkpoints.load("other_stage", key) is None
+
+    checkpoints.clear()
+    assert not os.path.exists(tmp_path / "checkpoints")
+    assert checkpoints.load("stage", key) is None
+
+
+def test_checkpoint_key_is_content_based():
+    frame = pandas.DataFrame({"a": [1, 2, 3]})
+    assert StageCheckpoints.key(frame) == StageCheckpoints.key(frame.copy())
+    assert StageCheckpoints.key(frame) != StageCheckpoints.key(frame.astype(float))
+    assert StageCheckpoints.key([1, "a"]) != StageCheckpoints.key(["1", "a"])
+    assert StageCheckpoints.key(SamplerSpacing(10.0)) == StageCheckpoints.key(SamplerSpacing(10.0))
+    assert StageCheckpoints.key(b"ab", b"c") != StageCheckpoints.key(b"a", b"bc")
+    assert StageCheckpoints.key(b"abc") != StageCheckpoints.key("abc")
+
+
+def test_interrupted_checkpoint_is_ignored(tmp_path):
+    checkpoints = StageCheckpoints(str(tmp_path))
+    checkpoints.save("stage", "key", {"column": ["A"]})
+    os.remove(tmp_path / "stage" / "manifest.json")
+    assert checkpoints.load("stage", "key") is None
+
+
+def test_checkpoint_eviction(tmp_path):
+    checkpoints = StageCheckpoints(str(tmp_path))
+    for i, stage in enumerate(["a", "b", "c"]):
+        checkpoints.save(stage, "key", {"column": ["A"] * 100})
+        os.utime(tmp_path / stage / "manifest.json", ns=(i, i))
+    stage_size = sum(file.stat().st_size for file in (tmp_path / "a").iterdir())
+
+    # loading a stage marks it as recently used so the oldest other stage is evicted
+    assert checkpoints.load("a", "key") is not None
+    checkpoints.evict(2 * stage_size)
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+
+
+def load_map_data(map_data):
+    geology = geopandas.GeoDataFrame(
+        {
+            "UNITNAME": ["A", "B"],
+            "GROUP": "G",
+            "SUPERGROUP": "S",
+            "MIN_AGE": [1.0, 2.0],
+            "MAX_AGE": [1.5, 2.5],
+            "ID": [0, 1],
+        },
+        geometry=[shapely.box(0, 0, 100, 50), shapely.box(0, 50, 100, 100)],
+        crs=28350,
+    )
+    faults = geopandas.GeoDataFrame(
+        {"NAME": ["Fault_0"], "ID": [0]},
+        geometry=[shapely.LineString([(10, 10), (90, 90)])],
+        crs=28350,
+    )
+    for datatype, data in [(Datatype.GEOLOGY, geology), (Datatype.FAULT, faults)]:
+        map_data.filenames[datatype] = "memory"
+        map_data.data[datatype] = data
+        map_data.data_states[datatype] = Datastate.COMPLETE
+        map_data.dirtyflags[datatype] = False
+
+
+def create_project(tmp_path, monkeypatch):
+    monkeypatch.setattr(MapData, "load_all_map_data", load_map_data)
+    return Project(
+        verbose_level=VerboseLevel.NONE,
+        tmp_path=str(tmp_path),
+        working_projection=28350,
+        bounding_box={"minx": 0, "maxx": 100, "miny": 0, "maxy": 100},
+    )
+
+
+def stand_in_stages(project, monkeypatch, thickness_stage=True):
+    """Replace the run_all stages with stand ins that overwrite the units and faults like the real ones"""
+    calls = []
+
+    def stage(name, function=None):
+        def run(*args):
+            calls.append(name)
+            if function is not None:
+                function()
+
+        return run
+
+    def thicknesses():
+        units = project.stratigraphic_column.stratigraphicUnits.copy()
+        units["ThicknessMedian"] = 10.0
+        project.stratigraphic_column.stratigraphicUnits = units
+
+    def fault_summary():
+        project.deformation_history.faults = project.deformation_history.faults.assign(
+            avgDisplacement=5.0
+        )
+
+    def column():
+        project.stratigraphic_column.column = ["A", "B"]
+
+    def samples():
+        project.structure_samples = pandas.DataFrame(columns=["ID", "X", "Y", "Z", "featureId"])
+
+    monkeypatch.setattr(project.map_data, "extract_all_contacts", stage("contacts"))
+    monkeypatch.setattr(project, "calculate_stratigraphic_order", stage("column", column))
+    monkeypatch.setattr(project, "extract_geology_contacts", stage("geology_contacts"))
+    monkeypatch.setattr(project, "sample_map_data", stage("samples", samples))
+    if thickness_stage:
+        monkeypatch.setattr(project, "calculate_unit_thicknesses", stage("thicknesses", thicknesses))
+    monkeypatch.setattr(project, "calculate_fault_orientations", stage("fault_orientations"))
+    monkeypatch.setattr(project, "summarise_fault_data", stage("fault_summary", fault_summary))
+    monkeypatch.setattr(project, "apply_colour_to_units", stage("colour"))
+    monkeypatch.setattr(project, "save_into_projectfile", stage("save"))
+    return calls
+
+
+def test_run_all_resumes_on_the_same_project(tmp_path, monkeypatch):
+    project = create_project(tmp_path, monkeypatch)
+    calls = stand_in_stages(project, monkeypatch)
+
+    project.run_all(resume=True)
+    assert "thicknesses" in calls and "fault_summary" in calls
+    calls.clear()
+    # a second run on the same project restores every stage from its checkpoint
+    project.run_all(resume=True)
+    assert calls == ["colour", "save"]
+    assert list(project.stratigraphic_column.stratigraphicUnits["ThicknessMedian"]) == [10.0, 10.0]
+
+
+def test_checkpoint_key_ignores_runtime_state():
+    calculator = InterpolatedStructure()
+    key = StageCheckpoints.key(calculator)
+    calculator.lines.append(numpy.array([shapely.LineString([(0, 0), (1, 1)])]))
+    assert StageCheckpoints.key(calculator) == key
+    assert StageCheckpoints.key(InterpolatedStructure(cell_size=10.0)) != key
+    assert StageCheckpoints.key(StructuralPoint(n_jobs=1)) == StageCheckpoints.key(StructuralPoint(n_jobs=4))
+
+
+def test_run_all_resumes_with_interpolated_structure(tmp_path, monkeypatch):
+    project = create_project(tmp_path, monkeypatch)
+    project.set_thickness_calculator(InterpolatedStructure())
+    calls = stand_in_stages(project, monkeypatch, thickness_stage=False)
+
+    # a stand in for the thickness calculation that keeps its shortest lines like the real one
+    def compute(units, stratigraphic_order, basal_contacts, structure_data, map_data):
+        calls.append("thicknesses")
+        project.thickness_calculator.lines.append(numpy.array([shapely.LineString([(0, 0), (1, 1)])]))
+        return units.assign(ThicknessMedian=10.0)
+
+    monkeypatch.setattr(project.thickness_calculator, "compute", compute)
+
+    project.run_all(resume=True)
+    assert "thicknesses" in calls
+    calls.clear()
+    # the state left on the calculator by the first run does not invalidate its checkpoint
+    project.run_all(resume=True)
+    assert calls == ["colour", "save"]
+    assert list(project.stratigraphic_column.stratigraphicUnits["ThicknessMedian"]) == [10.0, 10.0]
@@ -85,3 +85,26 @@ def test_sample_function_extracted_points(sampler_spacing, correct_geodata):
     ]
 
     assert numpy.absolute(distances).all() == 0.0
+
+
+# Test the order of the samples, featureId and ID for mixed geometry types
+def test_sample_function_mixed_geometries():
+    sampler_spacing = SamplerSpacing(spacing=10.0)
+    data = {
+        'geometry': [
+            shapely.MultiLineString([[(0, 0), (30, 0)], [(0, 10), (5, 10)], [(0, 20), (25, 20)]]),
+            shapely.Point(0, 0),
+            shapely.LineString([(0, 0), (0, 20)]),
+        ],
+        'ID': ['a', 'b', 'c'],
+    }
+    gdf = geopandas.GeoDataFrame(data, geometry='geometry')
+    result = sampler_spacing.sample(spatial_data=gdf)
+
+    assert list(result.columns) == ['ID', 'X', 'Y', 'featureId']
+    # the end of each line is not sampled, so the 5m long part gives no samples
+    assert list(result['ID']) == ['a', 'a', 'a', 'a', 'c']
+    assert list(result['featureId']) == ['0', '0', '2', '2', '0']
+    assert list(result['X']) == [0.0, 10.0, 0.0, 10.0, 0.0]
+    assert list(result['Y']) == [0.0, 0.0, 20.0, 20.0, 0.0]
+    assert list(result.index) == list(range(5))
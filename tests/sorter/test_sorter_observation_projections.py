@@ -0,0 +1,27 @@
+### This file tests the ray casting of orientations in map2loop/sorter.py
+
+import numpy
+import geopandas
+import shapely
+from map2loop.mapdata import MapData
+from map2loop.sorter import SorterObservationProjections
+from map2loop.m2l_enums import VerboseLevel
+
+
+def test_observe_unit_order(tmp_path, monkeypatch):
+    # three stacked units with the ground rising to the north
+    geology = geopandas.GeoDataFrame(
+        {"UNITNAME": ["A", "B", "C"]},
+        geometry=[shapely.box(0, 1000 * i, 3000, 1000 * (i + 1)) for i in range(3)],
+    )
+    orientations = geopandas.GeoDataFrame(
+        {"DIPDIR": [90.0, 270.0, 90.0, 90.0, 90.0], "DIP": [30.0, 30.0, 90.0, 30.0, 30.0]},
+        geometry=shapely.points([(500, 500), (1500, 1500), (500, 500), (2500, 2500), (-10, 500)]),
+    )
+    md = MapData(tmp_path=str(tmp_path), verbose_level=VerboseLevel.NONE)
+    monkeypatch.setattr(
+        md, "get_values_from_raster", lambda datatype, x, y, interpolation=None: numpy.asarray(y)
+    )
+    observations = SorterObservationProjections.observe_unit_order(geology, orientations, md)
+    # the last two rays only cross their own unit or start outside the map
+    assert observations == [("A", "B"), ("B", "A"), ("B", "A")]
@@ -0,0 +1,88 @@
+# This test runs InterpolatedStructure on a synthetic map of four stacked units with wavy basal contacts
+# over a sloping DTM, and checks the thicknesses against the table calculated by the original
+# implementation that measured each shortest line separately
+
+import numpy
+import pandas
+import geopandas
+import shapely
+from osgeo import gdal
+from map2loop.thickness_calculator import InterpolatedStructure
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def create_inputs():
+    x = numpy.linspace(0, 1000, 41)
+    contacts = [numpy.column_stack([x, y + 8 * numpy.sin(x / 90.0 + y)]) for y in [100, 250, 330]]
+    edges = [numpy.array([[0, 0], [1000, 0]])] + contacts + [numpy.array([[0, 500], [1000, 500]])]
+    geology = geopandas.GeoDataFrame(
+        {"UNITNAME": ["D", "C", "B", "A"], "GROUP": "G", "ID": range(4)},
+        geometry=[shapely.Polygon(numpy.vstack([edges[i], edges[i + 1][::-1]])) for i in range(4)],
+        crs=28350,
+    )
+    basal_contacts = geopandas.GeoDataFrame(
+        {"ID": range(3), "basal_unit": ["C", "B", "A"], "type": "BASAL"},
+        geometry=[shapely.LineString(contact) for contact in contacts],
+        crs=28350,
+    )
+    # sample the contacts every 10 m
+    sampled_contacts = []
+    for i, contact in enumerate(basal_contacts.geometry):
+        points = shapely.line_interpolate_point(contact, numpy.arange(0, contact.length, 10.0))
+        sampled_contacts.append(
+            pandas.DataFrame(
+                {"ID": i, "X": shapely.get_x(points), "Y": shapely.get_y(points), "featureId": "0"}
+            )
+        )
+
+    rng = numpy.random.default_rng(1)
+    n = 80
+    structures = pandas.DataFrame(
+        {
+            "ID": range(n),
+            "X": rng.uniform(100, 900, n),
+            "Y": numpy.where(numpy.arange(n) % 2 == 0, rng.uniform(150, 200, n), rng.uniform(270, 310, n)),
+            "Z": 0.0,
+            "DIPDIR": rng.uniform(170, 190, n),
+            "DIP": rng.uniform(20, 70, n),
+            "OVERTURNED": False,
+            "BEDDING": True,
+        }
+    )
+
+    # a DTM sloping up to the north east in 10 m cells
+    y, x = numpy.mgrid[495:0:-10, 5:1000:10]
+    dtm = gdal.GetDriverByName("MEM").Create("", 100, 50, 1, gdal.GDT_Float32)
+    dtm.SetGeoTransform([0, 10, 0, 500, 0, -10])
+    dtm.GetRasterBand(1).WriteArray(100 + 0.05 * x + 0.02 * y)
+
+    map_data = MapData()
+    map_data.set_working_projection(28350)
+    map_data.set_bounding_box({"minx": 0, "maxx": 1000, "miny": 0, "maxy": 500})
+    for datatype, data in [(Datatype.GEOLOGY, geology), (Datatype.DTM, dtm)]:
+        map_data.filenames[datatype] = "memory"
+        map_data.data[datatype] = data
+        map_data.data_states[datatype] = Datastate.COMPLETE
+        map_data.dirtyflags[datatype] = False
+    map_data.sampled_contacts = pandas.concat(sampled_contacts, ignore_index=True)
+
+    units = pandas.DataFrame({"name": ["A", "B", "C", "D"]})
+    return units, ["A", "B", "C", "D"], basal_contacts, structures, map_data
+
+
+def test_interpolated_structure_thicknesses():
+    calculator = InterpolatedStructure()
+    expected = pandas.DataFrame(
+        {
+            "name": ["A", "B", "C", "D"],
+            "ThicknessMedian": [-1.0, 61.636291337861, 106.730935979066, -1.0],
+            "ThicknessMean": [-1.0, 61.669868353505, 104.400543663407, -1.0],
+            "ThicknessStdDev": [0.0, 11.602352831210, 15.013357581948, 0.0],
+        }
+    )
+    for _ in range(2):
+        result = calculator.compute(*create_inputs())
+        pandas.testing.assert_frame_equal(result, expected, rtol=1e-9)
+        # only the shortest lines of the latest run are kept, one array per unit
+        assert len(calculator.lines) == 2
@@ -0,0 +1,14 @@
+# this tests the validation of the number of worker processes of the thickness calculator Structural Point
+
+import pytest
+from map2loop.thickness_calculator import StructuralPoint
+
+
+def test_n_jobs():
+    assert StructuralPoint().n_jobs == 1
+    assert StructuralPoint(n_jobs=4).n_jobs == 4
+    # -1 is the only sentinel, meaning all available cores
+    assert StructuralPoint(n_jobs=-1).n_jobs == -1
+    for n_jobs in [0, -2]:
+        with pytest.raises(ValueError):
+            StructuralPoint(n_jobs=n_jobs)
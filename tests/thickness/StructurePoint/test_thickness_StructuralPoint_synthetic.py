@@ -0,0 +1,82 @@
+# This test runs StructuralPoint on a synthetic map of four stacked units with wavy basal contacts,
+# with structural measurements in the two middle units, and checks the thicknesses against the
+# table calculated by the original, unbatched implementation
+
+import numpy
+import pandas
+import geopandas
+import shapely
+from map2loop.thickness_calculator import StructuralPoint
+from map2loop.mapdata import MapData
+from map2loop.m2l_enums import Datatype, Datastate
+
+
+def create_inputs():
+    x = numpy.linspace(0, 1000, 41)
+    contacts = [numpy.column_stack([x, y + 8 * numpy.sin(x / 90.0 + y)]) for y in [100, 250, 330]]
+    edges = [numpy.array([[0, 0], [1000, 0]])] + contacts + [numpy.array([[0, 500], [1000, 500]])]
+    geology = geopandas.GeoDataFrame(
+        {"UNITNAME": ["D", "C", "B", "A"], "GROUP": "G", "ID": range(4)},
+        geometry=[shapely.Polygon(numpy.vstack([edges[i], edges[i + 1][::-1]])) for i in range(4)],
+        crs=28350,
+    )
+    basal_contacts = geopandas.GeoDataFrame(
+        {"ID": range(3), "basal_unit": ["C", "B", "A"], "type": "BASAL"},
+        geometry=[shapely.LineString(contact) for contact in contacts],
+        crs=28350,
+    )
+    # sample the contacts every 10 m
+    sampled_contacts = []
+    for i, contact in enumerate(basal_contacts.geometry):
+        points = shapely.line_interpolate_point(contact, numpy.arange(0, contact.length, 10.0))
+        sampled_contacts.append(
+            pandas.DataFrame(
+                {"ID": i, "X": shapely.get_x(points), "Y": shapely.get_y(points), "featureId": "0"}
+            )
+        )
+
+    rng = numpy.random.default_rng(1)
+    n = 80
+    structures = pandas.DataFrame(
+        {
+            "ID": range(n),
+            "X": rng.uniform(100, 900, n),
+            "Y": numpy.where(numpy.arange(n) % 2 == 0, rng.uniform(150, 200, n), rng.uniform(270, 310, n)),
+            "Z": 0.0,
+            "DIPDIR": rng.uniform(170, 190, n),
+            "DIP": rng.uniform(20, 70, n),
+            "OVERTURNED": False,
+            "BEDDING": True,
+        }
+    )
+
+    map_data = MapData()
+    map_data.set_working_projection(28350)
+    map_data.set_bounding_box({"minx": 0, "maxx": 1000, "miny": 0, "maxy": 500})
+    map_data.filenames[Datatype.GEOLOGY] = "memory"
+    map_data.data[Datatype.GEOLOGY] = geology
+    map_data.data_states[Datatype.GEOLOGY] = Datastate.COMPLETE
+    map_data.dirtyflags[Datatype.GEOLOGY] = False
+    map_data.sampled_contacts = pandas.concat(sampled_contacts, ignore_index=True)
+
+    units = pandas.DataFrame({"name": ["A", "B", "C", "D"], "ThicknessMedian": 0.0})
+    return units, ["A", "B", "C", "D"], basal_contacts, structures, map_data
+
+
+def test_structural_point_thicknesses():
+    result = StructuralPoint().compute(*create_inputs())
+    expected = pandas.DataFrame(
+        {
+            "name": ["A", "B", "C", "D"],
+            "ThicknessMedian": [-1.0, 58.857268566642, 97.639786590706, -1.0],
+            "ThicknessMean": [-1.0, 53.132837304769, 96.935766527530, -1.0],
+            "ThicknessStdDev": [-1.0, 19.937756192102, 18.760699197123, -1.0],
+        }
+    )
+    pandas.testing.assert_frame_equal(result, expected, rtol=1e-9)
+
+
+def test_structural_point_n_jobs():
+    # the measurements are split into the same chunks for any number of workers
+    result = StructuralPoint(n_jobs=1).compute(*create_inputs())
+    pandas.testing.assert_frame_equal(StructuralPoint(n_jobs=2).compute(*create_inputs()), result)
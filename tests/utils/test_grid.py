@@ -0,0 +1,64 @@
+### This file tests the Grid class and generate_grid() in map2loop/utils.py
+
+import numpy
+import pytest
+from map2loop.utils import Grid, generate_grid
+
+bounding_box = {"minx": 1000, "maxx": 5000, "miny": 2000, "maxy": 3000}
+
+
+def test_grid_respects_both_axes():
+    grid = Grid.from_bounding_box(bounding_box, cell_size=100)
+    assert grid.shape == (11, 41), "grid shape does not cover the bounding box"
+    assert grid.descriptor() == ((1000.0, 2000.0), (100.0, 100.0), (11, 41)), "grid descriptor is wrong"
+    xi, yi = grid.coordinates()
+    assert xi.min() == 1000 and xi.max() == 5000, "grid does not cover the x extent"
+    assert yi.min() == 2000 and yi.max() == 3000, "grid does not cover the y extent"
+
+    # the resolution is the number of points along the longest axis
+    grid = Grid.from_bounding_box(bounding_box, resolution=41)
+    assert grid.shape == (11, 41), "grid resolution does not respect the aspect ratio"
+
+
+def test_grid_matches_meshgrid_order():
+    grid = Grid.from_bounding_box(bounding_box, cell_size=250)
+    xx, yy = numpy.meshgrid(grid.x, grid.y)
+    xi, yi = grid.coordinates()
+    assert numpy.allclose(xi, xx.flatten()) and numpy.allclose(
+        yi, yy.flatten()
+    ), "grid points are not in meshgrid order"
+
+
+def test_grid_tiles():
+    grid = Grid.from_bounding_box(bounding_box, cell_size=100)
+    tiles = list(grid.tiles(tile_size=100))
+    assert len(tiles) == 5, "wrong number of tiles"
+    assert all(len(xi) <= 100 for xi, _ in tiles), "tiles are larger than tile_size"
+    xi = numpy.concatenate([xi for xi, _ in tiles])
+    yi = numpy.concatenate([yi for _, yi in tiles])
+    all_xi, all_yi = grid.coordinates()
+    assert numpy.array_equal(xi, all_xi) and numpy.array_equal(yi, all_yi), "tiles do not cover the grid"
+
+
+def test_large_grid_is_lazy():
+    # 10m cells over 100km is 10^8 points, the grid description and tiles must not allocate them all
+    grid = Grid.from_bounding_box({"minx": 0, "maxx": 100000, "miny": 0, "maxy": 100000}, cell_size=10)
+    assert grid.size == 10001 * 10001, "wrong number of grid points"
+    xi, yi = next(grid.tiles(tile_size=1000))
+    assert len(xi) == 1000 and yi[0] == 0, "first tile is wrong"
+
+
+def test_generate_grid():
+    xi, yi, cell_size = generate_grid(bounding_box)
+    assert len(xi) == 101 * 26 and cell_size == 40, "default grid has changed"
+    # a tall map is sized on its longest side and covers the whole Y extent
+    tall_bounding_box = {"minx": 1000, "maxx": 2000, "miny": 2000, "maxy": 6000}
+    xi, yi, cell_size = generate_grid(tall_bounding_box)
+    assert cell_size == 40 and len(xi) == 26 * 101, "default grid ignores the Y extent"
+    assert yi.max() == 6000 and xi.max() == 2000, "default grid does not cover the bounding box"
+    xi, yi, cell_size = generate_grid(bounding_box, grid_resolution=5)
+    assert len(xi) == 5 * 5 and cell_size == 1000, "grid resolution is not respected"
+    xi, yi, cell_size = generate_grid(bounding_box, cell_size=100)
+    assert len(xi) == 11 * 41 and cell_size == 100, "cell size grid does not respect both axes"
+    with pytest.raises(ValueError):
+        Grid.from_bounding_box(bounding_box, cell_size=0)